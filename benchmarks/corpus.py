@@ -0,0 +1,262 @@
+"""
+corpus.py
+
+Deterministic benchmark corpus.
+
+generate_corpus() writes JPEG, PNG, BMP and WAV files at several sizes,
+with and without EXIF, with LSB payloads, with ZIP archives appended and,
+when steghide is installed, with steghide-embedded data. Every byte comes
+from a seeded NumPy generator, so two runs with the same seed and library
+versions produce identical files and comparable timings.
+
+A manifest.json next to the files describes each entry; the corpus is
+only regenerated when the seed or CORPUS_VERSION changes.
+"""
+
+import io
+import json
+import wave
+import shutil
+import zipfile
+import subprocess
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+CORPUS_VERSION = 1
+DEFAULT_SEED = 1234
+
+IMAGE_SIZES = {
+    "small": (64, 64),
+    "medium": (512, 512),
+    "large": (1600, 1200),
+}
+AUDIO_SECONDS = {
+    "small": 0.5,
+    "medium": 5.0,
+}
+STEGHIDE_PASSPHRASE = "benchmark"
+
+# EXIF tag ids (Pillow writes them into the IFD0 / GPS IFD)
+_EXIF_TAGS = {
+    0x010E: "ImageDescription",
+    0x010F: "Make",
+    0x0110: "Model",
+    0x0131: "Software",
+    0x0132: "DateTime",
+    0x013B: "Artist",
+}
+_GPS_IFD = 0x8825
+
+
+def _pixels(rng, width: int, height: int) -> np.ndarray:
+    """Photo-like RGB content: smooth gradients, noise and some text."""
+    y, x = np.mgrid[0:height, 0:width].astype(np.float32)
+    base = np.stack([
+        128 + 100 * np.sin(x / max(width, 1) * 6.28 + rng.uniform(0, 6.28)),
+        128 + 100 * np.cos(y / max(height, 1) * 6.28 + rng.uniform(0, 6.28)),
+        (x + y) / max(width + height, 1) * 255,
+    ], axis=-1)
+    base += rng.normal(0, 12, base.shape)
+    img = Image.fromarray(np.clip(base, 0, 255).astype(np.uint8), "RGB")
+
+    # A little printed text so OCR preprocessing sees real edges
+    draw = ImageDraw.Draw(img)
+    for row in range(0, height, 24):
+        draw.text((4, row), f"BIG SISTER {row:04d} {rng.integers(1e6):06d}", fill=(0, 0, 0))
+    return np.asarray(img)
+
+
+def _exif_fields(rng, index: int) -> dict:
+    return {
+        "ImageDescription": f"benchmark image {index}",
+        "Make": ["Canon", "NIKON CORPORATION", "Apple", "SONY"][index % 4],
+        "Model": ["EOS 5D Mark IV", "D850", "iPhone 14 Pro", "ILCE-7M3"][index % 4],
+        "Software": "BigSister corpus",
+        "DateTime": f"20{10 + index % 14:02d}:0{1 + index % 9}:1{index % 10} 12:34:56",
+        "Artist": f"photographer{int(rng.integers(1000)):03d}",
+        "GPSLatitude": round(float(rng.uniform(-80, 80)), 6),
+        "GPSLongitude": round(float(rng.uniform(-179, 179)), 6),
+    }
+
+
+def _exif_block(fields: dict) -> Image.Exif:
+    exif = Image.Exif()
+    for tag, name in _EXIF_TAGS.items():
+        exif[tag] = fields[name]
+
+    def dms(value):
+        value = abs(value)
+        degrees = int(value)
+        minutes = int((value - degrees) * 60)
+        seconds = round(((value - degrees) * 60 - minutes) * 60, 4)
+        return (float(degrees), float(minutes), float(seconds))
+
+    gps = exif.get_ifd(_GPS_IFD)
+    gps[1] = "N" if fields["GPSLatitude"] >= 0 else "S"
+    gps[2] = dms(fields["GPSLatitude"])
+    gps[3] = "E" if fields["GPSLongitude"] >= 0 else "W"
+    gps[4] = dms(fields["GPSLongitude"])
+    return exif
+
+
+def embed_lsb(pixels: np.ndarray, payload: bytes) -> np.ndarray:
+    """Hide payload in the b1,rgb,lsb,xy plane (zsteg's default walk)."""
+    out = pixels.copy()
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+    flat = out.reshape(-1)
+    if len(bits) > len(flat):
+        raise ValueError("payload does not fit")
+    flat[:len(bits)] = (flat[:len(bits)] & 0xFE) | bits
+    return out
+
+
+def _zip_bytes(index: int) -> bytes:
+    buf = io.BytesIO()
+    with zipfile.ZipFile(buf, "w", zipfile.ZIP_DEFLATED) as zf:
+        # Fixed timestamp keeps the archive bytes deterministic
+        info = zipfile.ZipInfo("flag.txt", date_time=(2024, 1, 1, 0, 0, 0))
+        zf.writestr(info, f"flag{{appended-zip-{index}}}\n" * 8)
+    return buf.getvalue()
+
+
+def _write_wav(path: Path, rng, seconds: float, payload: bytes = None):
+    rate = 44100
+    t = np.arange(int(rate * seconds)) / rate
+    signal = 8000 * np.sin(2 * np.pi * 440 * t) + rng.normal(0, 300, t.shape)
+    samples = np.clip(signal, -32768, 32767).astype("<i2")
+    if payload:
+        bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8)).astype("<i2")
+        samples[:len(bits)] = (samples[:len(bits)] & ~1) | bits
+    with wave.open(str(path), "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes(samples.tobytes())
+
+
+def _steghide_embed(cover: Path, out: Path, index: int) -> bool:
+    """Embed a secret with steghide; False when steghide is unavailable."""
+    steghide = shutil.which("steghide")
+    if steghide is None:
+        return False
+    secret = out.with_suffix(".secret.txt")
+    secret.write_text(f"flag{{steghide-{index}}}\n")
+    try:
+        result = subprocess.run(
+            [steghide, "embed", "-cf", str(cover), "-ef", str(secret), "-sf", str(out),
+             "-p", STEGHIDE_PASSPHRASE, "-f", "-q"],
+            capture_output=True, timeout=120,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return False
+    finally:
+        secret.unlink(missing_ok=True)
+    return result.returncode == 0 and out.exists()
+
+
+def generate_corpus(out_dir, seed: int = DEFAULT_SEED, force: bool = False) -> list:
+    """
+    Create (or reuse) the corpus in out_dir.
+
+    Args:
+        out_dir: Target directory.
+        seed (int): Seed for all generated content.
+        force (bool): Regenerate even if a matching manifest exists.
+
+    Returns:
+        list: Manifest entries: {"path", "format", "size", "bytes",
+        "exif" (dict or None), "lsb_payload", "appended_zip", "steghide"}.
+    """
+    out_dir = Path(out_dir)
+    manifest_path = out_dir / "manifest.json"
+    if not force and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text())
+        if manifest.get("seed") == seed and manifest.get("version") == CORPUS_VERSION:
+            return manifest["entries"]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    rng = np.random.default_rng(seed)
+    entries = []
+    index = 0
+
+    def add(path, fmt, size, **features):
+        entry = {
+            "path": str(path),
+            "format": fmt,
+            "size": size,
+            "exif": None,
+            "lsb_payload": None,
+            "appended_zip": False,
+            "steghide": False,
+        }
+        entry.update(features)
+        entry["bytes"] = Path(path).stat().st_size
+        entries.append(entry)
+
+    for size, (width, height) in IMAGE_SIZES.items():
+        pixels = _pixels(rng, width, height)
+
+        for with_exif in (False, True):
+            index += 1
+            fields = _exif_fields(rng, index) if with_exif else None
+            kwargs = {"exif": _exif_block(fields)} if with_exif else {}
+            path = out_dir / f"{size}_{'exif' if with_exif else 'plain'}.jpg"
+            Image.fromarray(pixels).save(path, "JPEG", quality=90, **kwargs)
+            add(path, "jpeg", size, exif=fields)
+
+            path = out_dir / f"{size}_{'exif' if with_exif else 'plain'}.png"
+            Image.fromarray(pixels).save(path, "PNG", **kwargs)
+            add(path, "png", size, exif=fields)
+
+        path = out_dir / f"{size}_plain.bmp"
+        Image.fromarray(pixels).save(path, "BMP")
+        add(path, "bmp", size)
+
+        # LSB payloads (lossless formats only)
+        index += 1
+        payload = f"flag{{lsb-{size}-{index}}}".encode()
+        stego = embed_lsb(pixels, payload + b"\x00")
+        for fmt, ext in (("png", "png"), ("bmp", "bmp")):
+            path = out_dir / f"{size}_lsb.{ext}"
+            Image.fromarray(stego).save(path, fmt.upper())
+            add(path, fmt, size, lsb_payload=payload.decode())
+
+        # Appended ZIP archives
+        index += 1
+        for fmt, ext in (("jpeg", "jpg"), ("png", "png")):
+            path = out_dir / f"{size}_zip.{ext}"
+            buf = io.BytesIO()
+            Image.fromarray(pixels).save(buf, fmt.upper())
+            path.write_bytes(buf.getvalue() + _zip_bytes(index))
+            add(path, fmt, size, appended_zip=True)
+
+        # steghide (JPEG/BMP covers), when the tool is installed
+        index += 1
+        for ext in ("jpg", "bmp"):
+            cover = out_dir / f"{size}_plain.{ext}"
+            path = out_dir / f"{size}_steghide.{ext}"
+            if _steghide_embed(cover, path, index):
+                add(path, "jpeg" if ext == "jpg" else "bmp", size, steghide=True)
+
+    for size, seconds in AUDIO_SECONDS.items():
+        index += 1
+        path = out_dir / f"{size}_plain.wav"
+        _write_wav(path, rng, seconds)
+        add(path, "wav", size)
+
+        path = out_dir / f"{size}_lsb.wav"
+        payload = f"flag{{wav-lsb-{index}}}"
+        _write_wav(path, rng, seconds, payload.encode() + b"\x00")
+        add(path, "wav", size, lsb_payload=payload)
+
+        cover = out_dir / f"{size}_plain.wav"
+        path = out_dir / f"{size}_steghide.wav"
+        if _steghide_embed(cover, path, index):
+            add(path, "wav", size, steghide=True)
+
+    manifest_path.write_text(json.dumps(
+        {"version": CORPUS_VERSION, "seed": seed, "entries": entries}, indent=2
+    ))
+    return entries
@@ -0,0 +1,556 @@
+#!/usr/bin/env python3
+"""
+e2e_harness.py
+
+End-to-end load harness for the CLI and GUI entry points.
+
+The external tools are replaced by stand-ins (standins/standin.py) that
+replay recorded outputs with configurable start-up cost, per-request
+latency and failure/hang rates. The harness copies N files from the
+benchmark corpus, runs
+
+    python src/main.py --files-from <list> --format ndjson -j <workers>
+
+with the stand-ins first on PATH, and reports:
+
+    files/s              N / wall-clock time of the run
+    per-stage p50/p99    from the "elapsed" field of each NDJSON record
+    process spawns       per tool, from the stand-ins' spawn log
+    peak RSS             whole process tree (sampled from /proc) and the
+                         largest single process (RUSAGE_CHILDREN)
+
+With --gui the same files are pushed through BigSisterGUI's handlers in
+a separate process (skipped when no display is available).
+
+Recordings are synthesized from the corpus (fixtures.py) unless --record
+is given and the real tools are installed, in which case their actual
+output is captured first.
+
+Examples:
+
+    python benchmarks/e2e_harness.py -n 200 -j 4
+    python benchmarks/e2e_harness.py -n 200 --latency exiftool=20 --startup exiftool=300
+    python benchmarks/e2e_harness.py -n 100 --fail-rate steghide=0.1 --engines cli
+    python benchmarks/e2e_harness.py -n 200 -o run.json --compare previous.json
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import resource
+import tempfile
+import threading
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from corpus import DEFAULT_SEED, generate_corpus
+import fixtures
+
+STANDIN = Path(__file__).resolve().parent / "standins" / "standin.py"
+TOOLS = ("exiftool", "steghide", "binwalk", "zsteg")
+DEFAULT_WORKDIR = Path(tempfile.gettempdir()) / "bigsister-e2e"
+
+# Rough costs of the real tools on a desktop machine
+DEFAULT_TOOL_SETTINGS = {
+    "exiftool": {"startup_ms": 150, "latency_ms": 5, "jitter_ms": 2},
+    "steghide": {"startup_ms": 5, "latency_ms": 20, "jitter_ms": 5},
+    "binwalk": {"startup_ms": 300, "latency_ms": 30, "jitter_ms": 10},
+    "zsteg": {"startup_ms": 400, "latency_ms": 150, "jitter_ms": 30},
+}
+GUI_STAGES = {
+    "exif": "_show_metadata",
+    "steghide": "_show_steghide",
+    "binwalk": "_show_binwalk",
+    "zsteg": "_show_zsteg",
+}
+
+
+# --- recordings ---------------------------------------------------------
+
+def synthesize_recordings(entries: list) -> dict:
+    """Tool outputs for every corpus entry, built by fixtures.py."""
+    recordings = {}
+    for entry in entries:
+        info = fixtures.steghide_info(entry)
+        ok = bool(entry["steghide"])
+        stdout, _, stderr = info.partition("steghide: ")
+        recordings[os.path.basename(entry["path"])] = {
+            "exiftool": fixtures.exiftool_record(entry),
+            "steghide": {
+                "stdout": stdout if not ok else info,
+                "stderr": "" if ok else "steghide: " + stderr,
+                "returncode": 0 if ok else 1,
+            },
+            "binwalk": fixtures.binwalk_output(entry),
+            "zsteg": fixtures.zsteg_output(entry, filler_lines=40),
+        }
+    return recordings
+
+
+def record_real_tools(entries: list, recordings: dict) -> list:
+    """
+    Replace synthesized recordings with real tool output where installed.
+
+    Returns:
+        list: Tools that were recorded.
+    """
+    def run(cmd):
+        return subprocess.run(cmd, capture_output=True, text=True, timeout=300)
+
+    recorded = [t for t in TOOLS if shutil.which(t)]
+    for entry in entries:
+        path = entry["path"]
+        rec = recordings[os.path.basename(path)]
+        if "exiftool" in recorded:
+            out = run(["exiftool", "-j", "-n", path]).stdout
+            try:
+                rec["exiftool"] = json.loads(out)[0]
+            except (ValueError, IndexError):
+                pass
+        if "steghide" in recorded:
+            res = run(["steghide", "info", "-p", "", path])
+            rec["steghide"] = {"stdout": res.stdout, "stderr": res.stderr,
+                               "returncode": res.returncode}
+        if "binwalk" in recorded:
+            rec["binwalk"] = run(["binwalk", path]).stdout
+        if "zsteg" in recorded and entry["format"] in ("png", "bmp"):
+            rec["zsteg"] = run(["zsteg", path]).stdout
+    return recorded
+
+
+# --- setup ----------------------------------------------------------------
+
+def _parse_settings(specs: list, key: str, cast, settings: dict, ap):
+    for spec in specs:
+        tool, _, value = spec.partition("=")
+        tool = tool.strip()
+        if tool not in TOOLS and tool != "all":
+            ap.error(f"unknown tool in {spec!r}")
+        try:
+            value = cast(value)
+        except ValueError:
+            ap.error(f"invalid value in {spec!r}")
+        for name in (TOOLS if tool == "all" else (tool,)):
+            settings[name][key] = value
+
+
+def prepare(workdir: Path, entries: list, count: int, sizes: set) -> list:
+    """Link (or copy) count corpus files into workdir under unique names."""
+    pool = [e for e in entries if e["size"] in sizes]
+    if not pool:
+        raise SystemExit(f"no corpus entries for sizes {sorted(sizes)}")
+    files_dir = workdir / "files"
+    shutil.rmtree(files_dir, ignore_errors=True)
+    files_dir.mkdir(parents=True)
+    files = []
+    for i in range(count):
+        src = Path(pool[i % len(pool)]["path"])
+        dst = files_dir / f"{i:05d}_{src.name}"
+        try:
+            os.link(src, dst)
+        except OSError:
+            shutil.copyfile(src, dst)
+        files.append(str(dst))
+    return files
+
+
+def install_standins(workdir: Path, settings: dict, recordings_path: Path,
+                     seed: int) -> tuple:
+    """
+    Create the bin directory of stand-ins and their config.
+
+    Returns:
+        tuple: (bin_dir, standin_config_path, spawn_log_path)
+    """
+    bin_dir = workdir / "bin"
+    shutil.rmtree(bin_dir, ignore_errors=True)
+    bin_dir.mkdir(parents=True)
+    for tool in TOOLS:
+        (bin_dir / tool).symlink_to(STANDIN)
+    log_path = workdir / "spawns.ndjson"
+    log_path.unlink(missing_ok=True)
+    config_path = workdir / "standin.json"
+    config_path.write_text(json.dumps({
+        "recordings": str(recordings_path),
+        "log": str(log_path),
+        "seed": seed,
+        "tools": settings,
+    }, indent=2))
+    return bin_dir, config_path, log_path
+
+
+def app_config(workdir: Path, engines: str, timeouts: dict) -> Path:
+    """config.json for the run: the project's, with engines/timeouts overridden."""
+    with open(ROOT / "config.json", encoding="utf-8") as fh:
+        config = json.load(fh)
+    if engines == "cli":
+        config["tool_engines"] = {"binwalk": "binwalk", "zsteg": "zsteg"}
+    else:
+        config["tool_engines"] = {"binwalk": "native", "zsteg": "native"}
+    config.setdefault("tool_timeouts", {}).update(timeouts)
+    path = workdir / "config.json"
+    path.write_text(json.dumps(config, indent=2))
+    return path
+
+
+def run_env(workdir: Path, bin_dir: Path, standin_config: Path, config_path: Path) -> dict:
+    env = dict(os.environ)
+    env["PATH"] = f"{bin_dir}{os.pathsep}{env.get('PATH', '')}"
+    env["STANDIN_CONFIG"] = str(standin_config)
+    env["BIGSISTER_CONFIG"] = str(config_path)
+    env["BIGSISTER_CACHE_DIR"] = str(workdir / "cache")
+    env["BIGSISTER_NO_CACHE"] = "1"
+    env["PYTHONUNBUFFERED"] = "1"
+    return env
+
+
+# --- measurement ----------------------------------------------------------
+
+def _tree_rss(root_pid: int) -> int:
+    """Resident set size, in bytes, of root_pid and all its descendants."""
+    children = {}
+    rss = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as fh:
+                stat = fh.read()
+            fields = stat[stat.rindex(")") + 2:].split()
+            children.setdefault(int(fields[1]), []).append(int(entry))
+            rss[int(entry)] = int(fields[21]) * resource.getpagesize()
+        except (OSError, ValueError, IndexError):
+            continue
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+
+class RSSSampler(threading.Thread):
+    """Poll the RSS of a process tree and remember the peak."""
+
+    def __init__(self, pid: int, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.pid = pid
+        self.interval = interval
+        self.peak = 0
+        self._done = threading.Event()
+
+    def run(self):
+        if not os.path.isdir("/proc"):
+            return
+        while not self._done.is_set():
+            self.peak = max(self.peak, _tree_rss(self.pid))
+            self._done.wait(self.interval)
+
+    def stop(self):
+        self._done.set()
+        self.join()
+
+
+def percentile(values: list, pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = (len(ordered) - 1) * pct / 100
+    lo = int(k)
+    hi = min(lo + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def stage_stats(records: list) -> dict:
+    """p50/p99 (ms) of the "elapsed" field, grouped by stage."""
+    by_stage = {}
+    for record in records:
+        if "elapsed" in record:
+            by_stage.setdefault(record["stage"], []).append(record["elapsed"] * 1000)
+    return {
+        stage: {"count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p99_ms": round(percentile(values, 99), 2)}
+        for stage, values in by_stage.items()
+    }
+
+
+def spawn_stats(log_path: Path) -> dict:
+    """
+    Per-tool spawn, request and failure counts from the stand-in log.
+    A spawn without an exit line was killed (e.g. a hang hit its timeout).
+    """
+    stats = {}
+    if not log_path.exists():
+        return stats
+    with open(log_path, encoding="utf-8") as fh:
+        for line in fh:
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            tool = stats.setdefault(
+                event["tool"], {"spawns": 0, "requests": 0, "failures": 0, "killed": 0}
+            )
+            if event["event"] == "spawn":
+                tool["spawns"] += 1
+                tool["killed"] += 1
+            else:
+                tool["killed"] -= 1
+                tool["requests"] += event.get("requests", 0)
+                tool["failures"] += event.get("failures", 0)
+    return stats
+
+
+def drive(cmd: list, env: dict, files: int) -> dict:
+    """
+    Run one entry point, collecting its NDJSON records and resource use.
+    """
+    start = time.perf_counter()
+    proc = subprocess.Popen(cmd, env=env, cwd=str(ROOT), stdout=subprocess.PIPE,
+                            stderr=subprocess.PIPE, text=True)
+    sampler = RSSSampler(proc.pid)
+    sampler.start()
+
+    stderr_lines = []
+    drain = threading.Thread(target=lambda: stderr_lines.extend(proc.stderr), daemon=True)
+    drain.start()
+
+    records = []
+    first_record = None
+    for line in proc.stdout:
+        try:
+            records.append(json.loads(line))
+        except ValueError:
+            continue
+        if first_record is None:
+            first_record = time.perf_counter() - start
+    proc.wait()
+    wall = time.perf_counter() - start
+    sampler.stop()
+    drain.join()
+
+    summaries = [r for r in records if r.get("stage") == "summary"]
+    errors = [r for r in records if r.get("stage") == "error"]
+    return {
+        "command": cmd,
+        "returncode": proc.returncode,
+        "files": files,
+        "completed": len(summaries),
+        "errors": len(errors),
+        "wall_s": round(wall, 3),
+        "files_per_s": round(files / wall, 2) if wall > 0 else 0.0,
+        "first_record_s": round(first_record, 3) if first_record is not None else None,
+        "stages": stage_stats(records),
+        "peak_rss_tree_mb": round(sampler.peak / 2**20, 1),
+        "stderr_tail": [l.rstrip() for l in stderr_lines[-5:]],
+    }
+
+
+# --- GUI driver -----------------------------------------------------------
+
+def gui_driver(list_path: str):
+    """
+    Push every file through BigSisterGUI's handlers, printing one NDJSON
+    record per handler (stage = tool, elapsed = handler wall time).
+    """
+    import tkinter as tk
+    from utils.gui import BigSisterGUI
+
+    try:
+        app = BigSisterGUI()
+    except tk.TclError as e:
+        print(f"GUI unavailable: {e}", file=sys.stderr)
+        sys.exit(3)
+    app.withdraw()
+
+    with open(list_path, encoding="utf-8") as fh:
+        files = [line.strip() for line in fh if line.strip()]
+    for path in files:
+        app.current_file = path
+        file_start = time.perf_counter()
+        for stage, handler in GUI_STAGES.items():
+            started = time.perf_counter()
+            getattr(app, handler)()
+            # Handlers hand work to the GUI's pool; done when the result is shown
+            while app.has_pending_jobs():
+                app.update()
+                time.sleep(0.001)
+            app.update()
+            print(json.dumps({"file": path, "stage": stage,
+                              "elapsed": time.perf_counter() - started}), flush=True)
+        print(json.dumps({"file": path, "stage": "summary",
+                          "elapsed": time.perf_counter() - file_start}), flush=True)
+    app.destroy()
+
+
+# --- reporting ------------------------------------------------------------
+
+def print_report(name: str, result: dict, baseline: dict = None):
+    print("\n" + "=" * 60)
+    print(f"{name} entry point".center(60))
+    print("=" * 60)
+    if result.get("skipped"):
+        print(f"Skipped: {result['skipped']}")
+        print("=" * 60)
+        return
+
+    def delta(key, value, higher_is_better=False):
+        old = (baseline or {}).get(key)
+        if not old:
+            return ""
+        pct = (value - old) / old * 100
+        worse = pct < 0 if higher_is_better else pct > 0
+        return f"  ({pct:+.1f}%{' worse' if worse else ''})"
+
+    print(f"{'Files':25}: {result['completed']}/{result['files']} ({result['errors']} errors)")
+    print(f"{'Wall time (s)':25}: {result['wall_s']}")
+    print(f"{'Throughput (files/s)':25}: {result['files_per_s']}"
+          f"{delta('files_per_s', result['files_per_s'], True)}")
+    print(f"{'First record (s)':25}: {result['first_record_s']}")
+    print(f"{'Peak RSS, tree (MB)':25}: {result['peak_rss_tree_mb']}"
+          f"{delta('peak_rss_tree_mb', result['peak_rss_tree_mb'])}")
+    if "peak_rss_single_mb" in result:
+        print(f"{'Peak RSS, process (MB)':25}: {result['peak_rss_single_mb']}")
+    print("-" * 60)
+    print(f"{'stage':12}{'count':>8}{'p50 ms':>12}{'p99 ms':>12}{'Δp99':>12}")
+    base_stages = (baseline or {}).get("stages", {})
+    for stage, s in sorted(result["stages"].items()):
+        old = base_stages.get(stage, {}).get("p99_ms")
+        d = f"{(s['p99_ms'] - old) / old * 100:+.1f}%" if old else "-"
+        print(f"{stage:12}{s['count']:>8}{s['p50_ms']:>12.1f}{s['p99_ms']:>12.1f}{d:>12}")
+    if result.get("spawns"):
+        print("-" * 60)
+        print(f"{'tool':12}{'spawns':>8}{'requests':>12}{'failures':>12}{'killed':>12}")
+        for tool, s in sorted(result["spawns"].items()):
+            print(f"{tool:12}{s['spawns']:>8}{s['requests']:>12}{s['failures']:>12}"
+                  f"{s['killed']:>12}")
+    if result["returncode"] not in (0, None):
+        print(f"Exit status {result['returncode']}; last stderr lines:")
+        for line in result["stderr_tail"]:
+            print(f"  {line}")
+    print("=" * 60)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Big Sister end-to-end harness with stand-in tools")
+    ap.add_argument("-n", "--files", type=int, default=100, help="Files to analyze (default: 100)")
+    ap.add_argument("-j", "--workers", type=int, default=None,
+                    help="Worker processes passed to main.py (default: its own)")
+    ap.add_argument("--sizes", default="small,medium",
+                    help="Corpus sizes to draw files from (default: small,medium)")
+    ap.add_argument("--engines", choices=["native", "cli"], default="native",
+                    help="native: in-process binwalk/zsteg engines; cli: their stand-ins")
+    ap.add_argument("--startup", action="append", default=[], metavar="TOOL=MS",
+                    help="Stand-in start-up cost (repeatable; TOOL may be 'all')")
+    ap.add_argument("--latency", action="append", default=[], metavar="TOOL=MS",
+                    help="Stand-in per-request latency (repeatable)")
+    ap.add_argument("--jitter", action="append", default=[], metavar="TOOL=MS",
+                    help="Uniform +/- jitter on the latency (repeatable)")
+    ap.add_argument("--fail-rate", action="append", default=[], metavar="TOOL=P",
+                    help="Fraction of requests that fail (repeatable)")
+    ap.add_argument("--hang-rate", action="append", default=[], metavar="TOOL=P",
+                    help="Fraction of requests that hang until killed (repeatable)")
+    ap.add_argument("--timeout", action="append", default=[], metavar="TOOL=SECONDS",
+                    help="Tool timeouts for the run (default 5s each, so hangs resolve)")
+    ap.add_argument("--gui", action="store_true", help="Also drive the GUI handlers")
+    ap.add_argument("--record", action="store_true",
+                    help="Capture recordings from the real tools where installed")
+    ap.add_argument("--workdir", default=str(DEFAULT_WORKDIR),
+                    help=f"Scratch directory (default: {DEFAULT_WORKDIR})")
+    ap.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    ap.add_argument("-o", "--output", metavar="JSON", help="Write the report to JSON")
+    ap.add_argument("--compare", metavar="JSON", help="Show deltas against a saved report")
+    ap.add_argument("--gui-driver", metavar="LIST", help=argparse.SUPPRESS)
+    args = ap.parse_args()
+
+    if args.gui_driver:
+        gui_driver(args.gui_driver)
+        return
+
+    settings = {tool: dict(DEFAULT_TOOL_SETTINGS[tool]) for tool in TOOLS}
+    _parse_settings(args.startup, "startup_ms", float, settings, ap)
+    _parse_settings(args.latency, "latency_ms", float, settings, ap)
+    _parse_settings(args.jitter, "jitter_ms", float, settings, ap)
+    _parse_settings(args.fail_rate, "fail_rate", float, settings, ap)
+    _parse_settings(args.hang_rate, "hang_rate", float, settings, ap)
+    timeouts = {tool: 5.0 for tool in TOOLS}
+    for spec in args.timeout:
+        tool, _, seconds = spec.partition("=")
+        try:
+            timeouts[tool.strip()] = float(seconds)
+        except ValueError:
+            ap.error(f"invalid --timeout value: {spec!r}")
+
+    workdir = Path(args.workdir)
+    workdir.mkdir(parents=True, exist_ok=True)
+    print(f"Preparing corpus in {workdir} ...", file=sys.stderr)
+    entries = generate_corpus(workdir / "corpus", seed=args.seed)
+    recordings = synthesize_recordings(entries)
+    if args.record:
+        recorded = record_real_tools(entries, recordings)
+        print(f"Recorded real output from: {', '.join(recorded) or 'no installed tools'}",
+              file=sys.stderr)
+    recordings_path = workdir / "recordings.json"
+    recordings_path.write_text(json.dumps(recordings))
+
+    files = prepare(workdir, entries, args.files, set(args.sizes.split(",")))
+    list_path = workdir / "files.txt"
+    list_path.write_text("\n".join(files) + "\n")
+    config_path = app_config(workdir, args.engines, timeouts)
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+
+    report = {
+        "settings": {"files": args.files, "workers": args.workers, "engines": args.engines,
+                     "sizes": args.sizes, "seed": args.seed, "tools": settings,
+                     "timeouts": timeouts},
+    }
+
+    entry_points = {
+        "cli": [sys.executable, str(ROOT / "src" / "main.py"), "--files-from", str(list_path),
+                "--format", "ndjson"] + (["-j", str(args.workers)] if args.workers else []),
+    }
+    if args.gui:
+        entry_points["gui"] = [sys.executable, str(Path(__file__).resolve()),
+                               "--gui-driver", str(list_path)]
+
+    for name, cmd in entry_points.items():
+        if name == "gui" and sys.platform != "win32" and not os.environ.get("DISPLAY"):
+            report[name] = {"skipped": "no DISPLAY; GUI handlers need an X server"}
+            print_report(name.upper(), report[name])
+            continue
+        bin_dir, standin_config, log_path = install_standins(
+            workdir, settings, recordings_path, args.seed
+        )
+        env = run_env(workdir, bin_dir, standin_config, config_path)
+        rusage_before = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        result = drive(cmd, env, len(files))
+        rusage_after = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        if rusage_after > rusage_before:
+            # ru_maxrss is the largest single waited-for process, in KiB on Linux
+            result["peak_rss_single_mb"] = round(rusage_after / 1024, 1)
+        result["spawns"] = spawn_stats(log_path)
+        if name == "gui" and result["returncode"] == 3:
+            result = {"skipped": " ".join(result["stderr_tail"]) or "GUI unavailable"}
+        report[name] = result
+        print_report(name.upper(), result, baseline.get(name))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
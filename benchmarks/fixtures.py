@@ -0,0 +1,124 @@
+"""
+fixtures.py
+
+Tool outputs used as parser inputs, built from the benchmark corpus.
+
+Where the repo has an in-process engine, its real output is used (the
+LSB engine for zsteg lines, the signature scanner for binwalk tables).
+exiftool and steghide output is rendered from what the corpus generator
+wrote into each file, in the exact shapes those tools produce
+(`exiftool -j -n` records and `steghide info` text), so the parsers see
+realistic inputs without the tools being installed.
+"""
+
+import os
+
+import numpy as np
+
+from steganography import lsb_engine, signature_scanner
+
+
+_MIME = {"jpeg": "image/jpeg", "png": "image/png", "bmp": "image/bmp", "wav": "audio/x-wav"}
+
+
+def exiftool_record(entry: dict) -> dict:
+    """The dict `exiftool -j -n` reports for a corpus entry."""
+    path = entry["path"]
+    record = {
+        "SourceFile": path,
+        "ExifToolVersion": 12.76,
+        "FileName": os.path.basename(path),
+        "Directory": os.path.dirname(path),
+        "FileSize": entry["bytes"],
+        "FileModifyDate": "2024:01:01 00:00:00+00:00",
+        "FilePermissions": 100644,
+        "FileType": entry["format"].upper(),
+        "FileTypeExtension": os.path.splitext(path)[1].lstrip("."),
+        "MIMEType": _MIME[entry["format"]],
+    }
+    if entry["format"] == "wav":
+        record.update({"Encoding": 1, "NumChannels": 1, "SampleRate": 44100,
+                       "BitsPerSample": 16})
+    else:
+        width, height = {"small": (64, 64), "medium": (512, 512),
+                         "large": (1600, 1200)}[entry["size"]]
+        record.update({"ImageWidth": width, "ImageHeight": height,
+                       "ImageSize": f"{width} {height}",
+                       "Megapixels": round(width * height / 1e6, 3)})
+    if entry["exif"]:
+        exif = entry["exif"]
+        record.update({
+            "ImageDescription": exif["ImageDescription"],
+            "Make": exif["Make"],
+            "Model": exif["Model"],
+            "Software": exif["Software"],
+            "ModifyDate": exif["DateTime"],
+            "DateTimeOriginal": exif["DateTime"],
+            "Artist": exif["Artist"],
+            "GPSLatitude": exif["GPSLatitude"],
+            "GPSLongitude": exif["GPSLongitude"],
+            "GPSPosition": f"{exif['GPSLatitude']} {exif['GPSLongitude']}",
+            "ISO": 1600,
+            "FocalLength": 35.0,
+            "Flash": 16,
+            "WhiteBalance": 0,
+            "ExposureMode": 0,
+            "ColorSpace": 1,
+        })
+    return record
+
+
+def exif_text(record: dict) -> str:
+    """The same record as `exiftool` plain "Tag : Value" output."""
+    return "\n".join(f"{k:<32}: {v}" for k, v in record.items())
+
+
+def steghide_info(entry: dict) -> str:
+    """`steghide info -p <pass>` output: success for embedded files, else failure."""
+    name = os.path.basename(entry["path"])
+    if not entry["steghide"]:
+        return (
+            f'"{name}":\n  format: {entry["format"]}\n  capacity: 1.2 KB\n'
+            "steghide: could not extract any data with that passphrase!\n"
+        )
+    return (
+        f'"{name}":\n'
+        f'  format: {entry["format"]}\n'
+        "  capacity: 3.1 KB\n"
+        '  embedded file "flag.txt":\n'
+        "    size: 24.0 Byte\n"
+        "    encrypted: rijndael-128, cbc\n"
+        "    compressed: yes\n"
+    )
+
+
+def zsteg_output(entry: dict, filler_lines: int = 400, seed: int = 0) -> str:
+    """
+    runzsteg.sh-style output: the LSB engine's findings for the entry
+    (real, for image entries) plus deterministic noise lines of the kind
+    `zsteg -a` prints for natural images.
+    """
+    lines = ["🧬 Running Zsteg scan on: " + entry["path"], "Please wait...", ""]
+    if entry["format"] in ("png", "bmp"):
+        lines.extend(lsb_engine.scan(entry["path"]))
+    rng = np.random.default_rng(seed)
+    alphabet = np.frombuffer(b"abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 _-", np.uint8)
+    combos = [f"b{b},{c},{o},{p}" for b in range(1, 9) for c in ("r", "g", "b", "rgb", "bgr")
+              for o in ("lsb", "msb") for p in ("xy", "yx")]
+    for i in range(filler_lines):
+        spec = combos[i % len(combos)]
+        text = alphabet[rng.integers(len(alphabet), size=int(rng.integers(4, 24)))].tobytes().decode()
+        lines.append(f'{spec:<20} .. text: "{text}"')
+    lines.extend(["", "✅ Done!"])
+    return "\n".join(lines)
+
+
+def binwalk_output(entry: dict) -> str:
+    """binwalk's DECIMAL/HEXADECIMAL/DESCRIPTION table for the entry."""
+    return signature_scanner.scan(entry["path"], workers=1)["RawOutput"]
+
+
+def binwalk_output_large(lines: int = 5000) -> str:
+    """A long table like binwalk prints for firmware images."""
+    hits = [(i * 4096, "Zlib compressed data, default compression") for i in range(lines)]
+    return signature_scanner.format_raw_output(hits)
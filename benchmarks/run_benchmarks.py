@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+run_benchmarks.py
+
+Micro-benchmarks for the parsing and preprocessing hot paths:
+
+    MetadataParser.parse_exif / parse_steghide / parse_binwalk / parse_zsteg
+    parse_and_group_zsteg
+    BinwalkScraper._parse_output
+    OCREngine.preprocess_image
+    IrisParser.categorize_exif_for_iris / categorize_many
+
+plus the in-process LSB and signature engines. Inputs come from the
+deterministic corpus (corpus.py) and fixtures.py.
+
+Each case reports per-call latency (p50, p95, mean, min) and throughput
+(calls/s, and MB/s where an input size is meaningful). Results can be
+saved as a baseline and later runs compared against it:
+
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --compare            # vs baseline.json
+    python benchmarks/run_benchmarks.py --compare --fail-on-regression
+
+Baselines are machine-specific; compare runs from the same machine.
+"""
+
+import os
+import sys
+import json
+import time
+import logging
+import platform
+import argparse
+import tempfile
+import contextlib
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT / "src"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import numpy as np  # noqa: E402
+
+import corpus  # noqa: E402
+import fixtures  # noqa: E402
+
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+DEFAULT_CORPUS = Path(tempfile.gettempdir()) / "bigsister-bench-corpus"
+
+
+class Case:
+    """One benchmark: a zero-argument callable plus an optional input size."""
+
+    def __init__(self, name: str, fn, nbytes: int = None):
+        self.name = name
+        self.fn = fn
+        self.nbytes = nbytes
+
+
+def measure(case: Case, min_time: float = 0.5, min_samples: int = 5,
+            max_samples: int = 2000, warmup: int = 2, sample_ns: int = 50_000) -> dict:
+    """
+    Time case.fn until both min_time seconds and min_samples samples are reached.
+
+    Calls faster than sample_ns are batched (like timeit's autorange) so
+    each sample spans at least sample_ns and timer overhead stays out of
+    the numbers; latencies are reported per call.
+
+    Returns:
+        dict: calls, p50_us, p95_us, mean_us, min_us, ops_per_s[, mb_per_s]
+    """
+    fn = case.fn
+    clock = time.perf_counter_ns
+    for _ in range(warmup):
+        fn()
+
+    number = 1
+    while True:
+        start = clock()
+        for _ in range(number):
+            fn()
+        if clock() - start >= sample_ns or number >= 1 << 16:
+            break
+        number *= 2
+
+    samples = []
+    deadline = time.perf_counter() + min_time
+    while len(samples) < max_samples and (
+        len(samples) < min_samples or time.perf_counter() < deadline
+    ):
+        start = clock()
+        for _ in range(number):
+            fn()
+        samples.append((clock() - start) / number)
+
+    ns = np.asarray(samples, dtype=np.float64)
+    mean = ns.mean()
+    result = {
+        "calls": len(samples) * number,
+        "p50_us": round(float(np.percentile(ns, 50)) / 1e3, 3),
+        "p95_us": round(float(np.percentile(ns, 95)) / 1e3, 3),
+        "mean_us": round(mean / 1e3, 3),
+        "min_us": round(ns.min() / 1e3, 3),
+        "ops_per_s": round(1e9 / mean, 1) if mean else None,
+    }
+    if case.nbytes:
+        result["mb_per_s"] = round(case.nbytes / (mean / 1e9) / 1e6, 2)
+    return result
+
+
+@contextlib.contextmanager
+def quiet():
+    """Silence the DEBUG prints and INFO logging some targets emit per call."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        logging.disable(logging.INFO)
+        try:
+            yield
+        finally:
+            logging.disable(logging.NOTSET)
+
+
+def build_cases(entries: list) -> list:
+    """Create every benchmark case from the corpus manifest."""
+    from metadata.parser import MetadataParser
+    from metadata.iris_parser import IrisParser
+    from steganography.binwalk_scraper import BinwalkScraper
+    from steganography.zsteg_scraper import parse_and_group_zsteg
+    from steganography import lsb_engine, signature_scanner
+
+    parser = MetadataParser()
+    iris = IrisParser()
+    binwalk = BinwalkScraper()
+    by_name = {Path(e["path"]).stem + Path(e["path"]).suffix: e for e in entries}
+    cases = []
+
+    # EXIF: structured records (the normal path) and plain-text output
+    for name in ("small_plain.jpg", "large_exif.jpg"):
+        record = fixtures.exiftool_record(by_name[name])
+        text = fixtures.exif_text(record)
+        cases.append(Case(f"parse_exif[dict:{name}]", lambda r=record: parser.parse_exif(r)))
+        cases.append(Case(f"parse_exif[text:{name}]", lambda t=text: parser.parse_exif(t),
+                          len(text.encode())))
+
+    # Steghide info: failure and success shapes
+    for name in ("medium_plain.jpg", "medium_steghide.jpg"):
+        entry = by_name.get(name) or dict(by_name["medium_plain.jpg"], steghide=True)
+        text = fixtures.steghide_info(entry)
+        cases.append(Case(f"parse_steghide[{name}]", lambda t=text: parser.parse_steghide(t),
+                          len(text.encode())))
+
+    # zsteg: MetadataParser.parse_zsteg and the GUI/CLI grouping
+    for name, filler in (("small_lsb.png", 50), ("large_lsb.png", 2000)):
+        text = fixtures.zsteg_output(by_name[name], filler_lines=filler)
+        size = len(text.encode())
+        cases.append(Case(f"parse_zsteg[{name}+{filler}]", lambda t=text: parser.parse_zsteg(t), size))
+        cases.append(Case(f"parse_and_group_zsteg[{name}+{filler}]",
+                          lambda t=text: parse_and_group_zsteg(t), size))
+
+    # Binwalk tables: real scanner output for a corpus file and a long table
+    for label, text in (
+        ("large_zip.png", fixtures.binwalk_output(by_name["large_zip.png"])),
+        ("5000-lines", fixtures.binwalk_output_large(5000)),
+    ):
+        size = len(text.encode())
+        cases.append(Case(f"BinwalkScraper._parse_output[{label}]",
+                          lambda t=text: binwalk._parse_output(t), size))
+        structured = binwalk._parse_output(text)
+        cases.append(Case(f"parse_binwalk[dict:{label}]",
+                          lambda d=structured: parser.parse_binwalk(d)))
+
+    # OCR preprocessing: throughput in decoded pixels (RGB bytes)
+    try:
+        from ocr.ocr_engine import OCREngine
+    except ImportError as e:
+        print(f"Skipping OCREngine.preprocess_image: {e}", file=sys.stderr)
+    else:
+        ocr = OCREngine(use_cache=False)
+        for name in ("small_plain.png", "medium_plain.jpg", "large_plain.jpg"):
+            width, height = corpus.IMAGE_SIZES[by_name[name]["size"]]
+            path = by_name[name]["path"]
+            cases.append(Case(f"OCREngine.preprocess_image[{name}]",
+                              lambda p=path: ocr.preprocess_image(p), width * height * 3))
+
+    # IRIS categorisation
+    for name in ("small_plain.jpg", "large_exif.jpg"):
+        record = fixtures.exiftool_record(by_name[name])
+        cases.append(Case(f"IrisParser.categorize_exif_for_iris[{name}]",
+                          lambda r=record: iris.categorize_exif_for_iris(dict(r))))
+    batch = [fixtures.exiftool_record(by_name[name])
+             for name in ("small_plain.jpg", "large_exif.jpg")] * 500
+    cases.append(Case("IrisParser.categorize_many[1000 records]",
+                      lambda b=batch: iris.categorize_many(b)))
+
+    # In-process engines that replaced tool shell-outs
+    for name in ("small_lsb.png", "large_lsb.png"):
+        entry = by_name[name]
+        cases.append(Case(f"lsb_engine.scan[{name}]",
+                          lambda p=entry["path"]: lsb_engine.scan(p), entry["bytes"]))
+    for name in ("large_zip.png", "large_plain.bmp"):
+        entry = by_name[name]
+        cases.append(Case(f"signature_scanner.scan[{name}]",
+                          lambda p=entry["path"]: signature_scanner.scan(p, workers=1),
+                          entry["bytes"]))
+    return cases
+
+
+def environment() -> dict:
+    import PIL
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "numpy": np.__version__,
+        "pillow": PIL.__version__,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Compare p50 latencies with a baseline.
+
+    Returns:
+        list: Names of cases slower than the baseline by more than threshold %.
+    """
+    regressions = []
+    base = baseline.get("results", {})
+    for name, res in results.items():
+        if name not in base:
+            res["delta_pct"] = None
+            continue
+        old = base[name]["p50_us"]
+        delta = (res["p50_us"] - old) / old * 100 if old else 0.0
+        res["delta_pct"] = round(delta, 1)
+        if delta > threshold:
+            regressions.append(name)
+    return regressions
+
+
+def print_table(results: dict, regressions: list):
+    width = max(len(n) for n in results) + 2
+    print("\n" + "=" * (width + 62))
+    print("Benchmark Results".center(width + 62))
+    print("=" * (width + 62))
+    print(f"{'case':{width}}{'calls':>8}{'p50 µs':>12}{'p95 µs':>12}{'ops/s':>12}{'MB/s':>9}{'Δp50':>9}")
+    print("-" * (width + 62))
+    for name, r in results.items():
+        mb = f"{r['mb_per_s']:.1f}" if "mb_per_s" in r else "-"
+        delta = r.get("delta_pct")
+        delta = "-" if delta is None else f"{delta:+.1f}%"
+        flag = "  << regression" if name in regressions else ""
+        print(f"{name:{width}}{r['calls']:>8}{r['p50_us']:>12.1f}{r['p95_us']:>12.1f}"
+              f"{r['ops_per_s']:>12.1f}{mb:>9}{delta:>9}{flag}")
+    print("=" * (width + 62))
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Big Sister micro-benchmarks")
+    ap.add_argument("--corpus-dir", default=str(DEFAULT_CORPUS),
+                    help=f"Where the generated corpus lives (default: {DEFAULT_CORPUS})")
+    ap.add_argument("--seed", type=int, default=corpus.DEFAULT_SEED, help="Corpus seed")
+    ap.add_argument("--regenerate", action="store_true", help="Rebuild the corpus")
+    ap.add_argument("-k", "--filter", default="", help="Only run cases containing this text")
+    ap.add_argument("--min-time", type=float, default=0.5, help="Seconds per case (default: 0.5)")
+    ap.add_argument("--save-baseline", nargs="?", const=str(DEFAULT_BASELINE), metavar="JSON",
+                    help="Store results as the baseline (default: benchmarks/baseline.json)")
+    ap.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE), metavar="JSON",
+                    help="Compare against a saved baseline")
+    ap.add_argument("--threshold", type=float, default=10.0,
+                    help="p50 slowdown in %% counted as a regression (default: 10)")
+    ap.add_argument("--fail-on-regression", action="store_true",
+                    help="Exit with status 1 if any case regressed")
+    ap.add_argument("-o", "--output", metavar="JSON", help="Also write this run's results to JSON")
+    args = ap.parse_args()
+
+    entries = corpus.generate_corpus(args.corpus_dir, seed=args.seed, force=args.regenerate)
+    skipped = [] if any(e["steghide"] for e in entries) else ["steghide-embedded files (steghide not installed)"]
+    print(f"Corpus: {len(entries)} files in {args.corpus_dir}", file=sys.stderr)
+    for note in skipped:
+        print(f"Corpus: skipped {note}", file=sys.stderr)
+
+    results = {}
+    with quiet():
+        cases = [c for c in build_cases(entries) if args.filter in c.name]
+    for case in cases:
+        print(f"  {case.name} ...", file=sys.stderr)
+        with quiet():
+            results[case.name] = measure(case, min_time=args.min_time)
+
+    regressions = []
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fh:
+            baseline = json.load(fh)
+        regressions = compare(results, baseline, args.threshold)
+    print_table(results, regressions)
+
+    report = {"environment": environment(), "seed": args.seed, "results": results}
+    for target in filter(None, (args.save_baseline, args.output)):
+        with open(target, "w", encoding="utf-8") as fh:
+            json.dump(report, fh, indent=2)
+        print(f"Results written to {target}", file=sys.stderr)
+
+    if regressions:
+        print(f"{len(regressions)} case(s) regressed by more than {args.threshold}%",
+              file=sys.stderr)
+        if args.fail_on_regression:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
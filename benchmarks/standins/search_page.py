@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+search_page.py
+
+Local stand-in for the reverse-image search upload flows, for exercising
+ImageSearchIRIS and its browser pool without the network.
+
+The page behaves like the real one as far as the scraper can tell: an
+optional cookie-consent button, a camera button that opens an upload
+dialog after a delay, an "Upload a file" tab that reveals the file
+input, and a results page whose result cards (thumbnail link through a
+/url redirect, title link, "W × H" size) are added by script after
+another delay. All delays are configurable, so waits that depend on
+fixed sleeps (rather than on the page) show up as either failures or
+wasted time.
+
+    python benchmarks/standins/search_page.py --serve
+    python benchmarks/standins/search_page.py --searches 20 --browsers 2 image.png
+    python benchmarks/standins/search_page.py --engines google,bing,yandex,tineye \
+        --browsers 4 image.png
+
+--engines serves one page per engine, each with that engine's camera
+button markup. The last two forms need Chrome and chromedriver; they run
+the searches, fanned out over the engines, through
+ImageSearchIRIS.search_image (bypassing the result cache) and report
+per-search latency, merged result counts and pool stats.
+"""
+
+import sys
+import time
+import json
+import argparse
+import threading
+from pathlib import Path
+from urllib.parse import urlparse, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+_UPLOAD_PAGE = """<!doctype html>
+<html><head><title>Images</title></head>
+<body>
+%(consent)s
+%(camera)s
+<div id="dialog" style="display:none">
+  <span id="upload-tab" style="cursor:pointer">Upload a file</span>
+  <div id="drop"></div>
+</div>
+<script>
+const cfg = %(config)s;
+const consent = document.getElementById("consent");
+if (consent) consent.onclick = () => setTimeout(() => consent.remove(), cfg.consent_ms);
+function addInput() {
+  const input = document.createElement("input");
+  input.type = "file";
+  input.onchange = () => {
+    const name = input.files.length ? input.files[0].name : "";
+    setTimeout(() => { location.href = "/search?img=" + encodeURIComponent(name); },
+               cfg.upload_ms);
+  };
+  document.getElementById("drop").appendChild(input);
+}
+const camera = document.getElementById("camera");
+function openDialog() {
+  document.getElementById("dialog").style.display = "block";
+  if (cfg.direct_input) addInput();
+}
+if (camera) camera.onclick = () => setTimeout(openDialog, cfg.dialog_ms);
+else openDialog();
+document.getElementById("upload-tab").onclick = () => setTimeout(addInput, cfg.dialog_ms);
+</script>
+</body></html>
+"""
+
+# Camera button markup per engine, matching the selectors in iris.engines;
+# None means the file input sits on the page itself
+_CAMERAS = {
+    "google": '<div id="camera" role="button" aria-label="Search by image" tabindex="0">'
+              '&#128247;</div>',
+    "bing": '<div id="sb_sbi" role="button" aria-label="Search using an image">'
+            '&#128247;</div>',
+    "yandex": '<button class="input__cbir-button" aria-label="Image search">&#128247;</button>',
+    "tineye": None,
+}
+
+_RESULTS_PAGE = """<!doctype html>
+<html><head><title>Results for %(name)s</title></head>
+<body data-ved="page-shell">
+<a href="/preferences">Settings</a>
+<a href="/search?start=10">Next</a>
+<div id="results"></div>
+<script>
+const name = "%(name)s";
+setTimeout(() => {
+  const box = document.getElementById("results");
+  for (let i = 0; i < %(count)d; i++) {
+    const card = document.createElement("div");
+    card.className = "card";
+    card.innerHTML =
+      '<a data-ved="t' + i + '" href="/url?q=' + encodeURIComponent("https://example.com/page" + i) + '">' +
+      '<img src="https://encrypted-tbn0.gstatic.com/images?q=tbn:' + i + '"></a>' +
+      '<a data-ved="r' + i + '" href="https://example.com/page' + i + '"><h3>Match ' + i + '</h3></a>' +
+      '<span>' + (640 + i) + ' \u00d7 480</span>';
+    box.appendChild(card);
+  }
+}, %(results_ms)d);
+</script>
+</body></html>
+"""
+
+
+class SearchPageServer:
+    """Threaded HTTP server for the stand-in pages; use as a context manager."""
+
+    def __init__(self, port: int = 0, engine: str = "google", consent: bool = True,
+                 direct_input: bool = False,
+                 consent_ms: int = 200, dialog_ms: int = 300, upload_ms: int = 400,
+                 results_ms: int = 600, result_count: int = 10):
+        """
+        Args:
+            port (int): Port to listen on (0 picks a free one).
+            engine (str): Whose upload page markup to imitate (see _CAMERAS).
+            consent (bool): Show a cookie-consent button first.
+            direct_input (bool): Show the file input when the dialog opens
+                instead of behind the "Upload a file" tab.
+            consent_ms, dialog_ms, upload_ms, results_ms (int): Delays of
+                the consent dismissal, dialog, upload and result rendering.
+            result_count (int): Result links on the results page.
+        """
+        self.engine = engine
+        self.camera = _CAMERAS[engine]
+        self.config = {
+            "consent_ms": consent_ms, "dialog_ms": dialog_ms, "upload_ms": upload_ms,
+            "direct_input": direct_input or self.camera is None,
+        }
+        self.consent = consent
+        self.results_ms = results_ms
+        self.result_count = result_count
+        self.requests = []
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/"
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                server.requests.append(parsed.path)
+                if parsed.path == "/":
+                    consent = ('<button id="consent" class="accept">Accept all</button>'
+                               if server.consent else "")
+                    body = _UPLOAD_PAGE % {"consent": consent, "camera": server.camera or "",
+                                           "config": json.dumps(server.config)}
+                elif parsed.path == "/search":
+                    name = parse_qs(parsed.query).get("img", [""])[0]
+                    body = _RESULTS_PAGE % {
+                        "name": json.dumps(name)[1:-1].replace("<", "\\u003c"),
+                        "count": server.result_count,
+                        "results_ms": server.results_ms,
+                    }
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def run_searches(image: str, searches: int, browsers: int, servers: list) -> dict:
+    """
+    Run searches through ImageSearchIRIS, fanned out over one engine per
+    stand-in server (no rate limit); return timings.
+    """
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+    from concurrent.futures import ThreadPoolExecutor
+    from iris.browser_pool import BrowserPool
+    from iris.engines import ENGINES
+    from iris.image_search import ImageSearchIRIS
+
+    pool = BrowserPool(size=browsers)
+    engines = [ENGINES[server.engine](base_url=server.url, min_interval=0)
+               for server in servers]
+
+    def one(_):
+        start = time.perf_counter()
+        searcher = ImageSearchIRIS(pool=pool, engines=engines, verbose=False)
+        result = searcher.search_image(image, use_cache=False)
+        ok = sum(r["success"] for r in result["engines"].values())
+        return ok, len(result["results"]), time.perf_counter() - start
+
+    try:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=max(1, browsers // len(engines))) as workers:
+            results = list(workers.map(one, range(searches)))
+        wall = time.perf_counter() - start
+    finally:
+        stats = pool.stats()
+        pool.close()
+    times = sorted(t for _, _, t in results)
+    return {
+        "searches": searches,
+        "engines": [server.engine for server in servers],
+        "engine_searches_ok": sum(ok for ok, _, _ in results),
+        "merged_results": sum(n for _, n, _ in results),
+        "wall_s": round(wall, 3),
+        "first_s": round(results[0][2], 3) if results else None,
+        "p50_s": round(times[len(times) // 2], 3) if times else None,
+        "max_s": round(times[-1], 3) if times else None,
+        "pool": stats,
+    }
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Stand-in reverse image search pages")
+    ap.add_argument("image", nargs="?", help="Image to upload (with --searches)")
+    ap.add_argument("--serve", action="store_true", help="Only serve the pages")
+    ap.add_argument("--port", type=int, default=0,
+                    help="Port of the first engine's page; the others follow it")
+    ap.add_argument("--engines", default="google",
+                    help="Comma-separated engines to imitate, one server each")
+    ap.add_argument("--searches", type=int, default=10)
+    ap.add_argument("--browsers", type=int, default=2, help="Browser pool size")
+    ap.add_argument("--direct-input", action="store_true",
+                    help="Expose the file input without the upload tab")
+    ap.add_argument("--no-consent", action="store_true")
+    ap.add_argument("--dialog-ms", type=int, default=300)
+    ap.add_argument("--upload-ms", type=int, default=400)
+    ap.add_argument("--results-ms", type=int, default=600)
+    args = ap.parse_args()
+
+    names = [name.strip() for name in args.engines.split(",") if name.strip()]
+    unknown = [name for name in names if name not in _CAMERAS]
+    if unknown:
+        ap.error(f"unknown engine(s): {', '.join(unknown)}")
+    servers = [
+        SearchPageServer(port=args.port + n if args.port else 0, engine=name,
+                         consent=not args.no_consent, direct_input=args.direct_input,
+                         dialog_ms=args.dialog_ms, upload_ms=args.upload_ms,
+                         results_ms=args.results_ms).start()
+        for n, name in enumerate(names)
+    ]
+    try:
+        if args.serve or not args.image:
+            for server in servers:
+                print(f"Serving stand-in {server.engine} page at {server.url}")
+            print("Ctrl+C to stop")
+            try:
+                threading.Event().wait()
+            except KeyboardInterrupt:
+                return
+        print(json.dumps(run_searches(args.image, args.searches, args.browsers, servers),
+                         indent=2))
+    finally:
+        for server in servers:
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""
+standin.py
+
+Stand-in for the external tools (exiftool, steghide, binwalk, zsteg).
+
+The harness symlinks this script under each tool's name; the name it is
+invoked as selects the tool. Output is replayed from recordings of the
+real tools, with configurable start-up cost, per-request latency and
+failure/hang rates, so the whole pipeline can be load-tested without the
+tools installed and with repeatable timings.
+
+Configuration is a JSON file named by STANDIN_CONFIG:
+
+    {
+      "recordings": "/path/recordings.json",
+      "log": "/path/spawns.ndjson",
+      "seed": 0,
+      "tools": {
+        "exiftool": {"startup_ms": 150, "latency_ms": 5, "jitter_ms": 2,
+                     "fail_rate": 0.0, "hang_rate": 0.0},
+        ...
+      }
+    }
+
+Recordings map a corpus file name to each tool's output:
+
+    {"small_exif.jpg": {"exiftool": {...}, "steghide": {"stdout": ..., "stderr": ...,
+     "returncode": ...}, "binwalk": "...", "zsteg": "..."}}
+
+The harness names its working copies "<NNNNN>_<corpus name>"; the numeric
+prefix is ignored when looking recordings up. Failures and hangs are
+decided per tool and file from the seed, so a rerun fails the same files.
+
+Every process appends a "spawn" and an "exit" line to the log.
+
+Only the standard library is used: this runs once per spawned "tool".
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+
+_PREFIX = re.compile(r"^\d{5}_")
+_VERSIONS = {
+    "exiftool": "12.76",
+    "steghide": "steghide version 0.5.1",
+    "binwalk": "Binwalk v2.3.4",
+    "zsteg": "0.2.13",
+}
+# exiftool options that consume the following argument
+_EXIFTOOL_VALUE_OPTIONS = {"-charset", "-echo", "-echo1", "-echo2", "-echo3", "-echo4",
+                           "-common_args", "-@", "-stay_open", "-d", "-p"}
+
+
+class _Crash(Exception):
+    """Simulated death of a stay_open exiftool process."""
+
+
+def _load_json(path):
+    if not path:
+        return {}
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, ValueError):
+        return {}
+
+
+class StandIn:
+    def __init__(self, tool: str):
+        self.tool = tool
+        self.config = _load_json(os.environ.get("STANDIN_CONFIG"))
+        self.settings = self.config.get("tools", {}).get(tool, {})
+        self.recordings = _load_json(self.config.get("recordings"))
+        self.requests = 0
+        self.failures = 0
+        self.mode = "oneshot"
+        self.start = time.time()
+
+    # --- bookkeeping ----------------------------------------------------
+
+    def log(self, event: str, **fields):
+        path = self.config.get("log")
+        if not path:
+            return
+        line = json.dumps({"event": event, "tool": self.tool, "pid": os.getpid(),
+                           "time": time.time(), **fields}) + "\n"
+        # One short O_APPEND write per line keeps concurrent writers intact
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line.encode("utf-8"))
+        finally:
+            os.close(fd)
+
+    def finish(self, code: int = 0):
+        self.log("exit", mode=self.mode, requests=self.requests, failures=self.failures,
+                 elapsed=round(time.time() - self.start, 6), returncode=code)
+        sys.stdout.flush()
+        sys.stderr.flush()
+        os._exit(code)
+
+    # --- behaviour ------------------------------------------------------
+
+    def recording(self, file_path: str):
+        key = _PREFIX.sub("", os.path.basename(file_path))
+        return self.recordings.get(key, {}).get(self.tool)
+
+    def _rng(self, file_path: str) -> random.Random:
+        return random.Random(f"{self.config.get('seed', 0)}|{self.tool}|{os.path.basename(file_path)}")
+
+    def sleep_ms(self, key: str):
+        ms = self.settings.get(key, 0)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+
+    def request(self, file_path: str) -> str:
+        """
+        Simulate the cost of one request on file_path.
+
+        Returns:
+            str: "ok", "fail" or "hang".
+        """
+        self.requests += 1
+        rng = self._rng(file_path)
+        jitter = self.settings.get("jitter_ms", 0)
+        ms = self.settings.get("latency_ms", 0) + (rng.uniform(-jitter, jitter) if jitter else 0)
+        if ms > 0:
+            time.sleep(ms / 1000.0)
+        roll = rng.random()
+        if roll < self.settings.get("hang_rate", 0.0):
+            time.sleep(self.settings.get("hang_seconds", 3600))
+            return "hang"
+        if roll < self.settings.get("hang_rate", 0.0) + self.settings.get("fail_rate", 0.0):
+            self.failures += 1
+            return "fail"
+        return "ok"
+
+    # --- tools ----------------------------------------------------------
+
+    def exiftool(self, argv: list):
+        if argv == ["-ver"]:
+            print(_VERSIONS["exiftool"])
+            return 0
+        if "-stay_open" in argv:
+            return self._exiftool_stay_open(argv)
+        out, err, code = self._exiftool_request(argv)
+        sys.stdout.write(out)
+        sys.stderr.write(err)
+        return code
+
+    def _exiftool_files(self, args: list) -> list:
+        files, skip = [], False
+        for arg in args:
+            if skip:
+                skip = False
+            elif arg in _EXIFTOOL_VALUE_OPTIONS:
+                skip = True
+            elif not arg.startswith("-"):
+                files.append(arg)
+        return files
+
+    def _exiftool_request(self, args: list) -> tuple:
+        records, errors = [], []
+        for path in self._exiftool_files(args):
+            if self.request(path) == "fail":
+                if self.mode == "stay_open":
+                    # A crashed Perl process: the session has to restart
+                    raise _Crash()
+                return "", f"Error: Simulated failure - {path}\n", 1
+            if not os.path.isfile(path):
+                errors.append(f"Error: File not found - {path}")
+                continue
+            record = dict(self.recording(path) or {"FileType": "Unknown"})
+            record.update({
+                "SourceFile": path,
+                "FileName": os.path.basename(path),
+                "Directory": os.path.dirname(path) or ".",
+                "FileSize": os.path.getsize(path),
+            })
+            records.append(record)
+        out = json.dumps(records, indent=2) + "\n" if records else ""
+        err = "".join(e + "\n" for e in errors)
+        return out, err, 0 if records or not errors else 1
+
+    def _exiftool_stay_open(self, argv: list) -> int:
+        self.mode = "stay_open"
+        common = argv[argv.index("-common_args") + 1:] if "-common_args" in argv else []
+        pending = []
+        for line in sys.stdin:
+            arg = line.rstrip("\n")
+            if arg.startswith("-execute"):
+                counter = arg[len("-execute"):]
+                marker = None
+                if "-echo4" in pending:
+                    marker = pending[pending.index("-echo4") + 1]
+                try:
+                    out, err, _ = self._exiftool_request(pending + common)
+                except _Crash:
+                    return 1
+                sys.stdout.write(out + f"{{ready{counter}}}\n")
+                sys.stdout.flush()
+                sys.stderr.write(err + (marker + "\n" if marker else ""))
+                sys.stderr.flush()
+                pending = []
+            elif pending[-1:] == ["-stay_open"] and arg == "False":
+                return 0
+            else:
+                pending.append(arg)
+        return 0
+
+    def steghide(self, argv: list):
+        if argv[:1] in (["--version"], ["version"]):
+            print(_VERSIONS["steghide"])
+            return 0
+        if argv[:1] != ["info"] or not argv[1:]:
+            sys.stderr.write("steghide: unsupported command in stand-in\n")
+            return 1
+        path = argv[-1]
+        if self.request(path) == "fail" or not os.path.isfile(path):
+            sys.stderr.write(f'steghide: could not open the file "{path}".\n')
+            return 1
+        rec = self.recording(path) or {}
+        name = os.path.basename(path)
+        stdout = rec.get("stdout", f'"{name}":\n  format: unknown\n')
+        stderr = rec.get("stderr", "steghide: could not extract any data with that passphrase!\n")
+        sys.stdout.write(stdout.replace(f'"{_PREFIX.sub("", name)}"', f'"{name}"'))
+        sys.stderr.write(stderr)
+        return rec.get("returncode", 1)
+
+    def binwalk(self, argv: list):
+        files = [a for a in argv if not a.startswith("-")]
+        if not files:
+            print(_VERSIONS["binwalk"])
+            return 0
+        path = files[-1]
+        if self.request(path) == "fail" or not os.path.isfile(path):
+            sys.stderr.write(f"General Error: Cannot open file {path}\n")
+            return 3
+        out = self.recording(path)
+        sys.stdout.write(out if out is not None else
+                         "\nDECIMAL       HEXADECIMAL     DESCRIPTION\n"
+                         + "-" * 80 + "\n\n")
+        return 0
+
+    def zsteg(self, argv: list):
+        if "--version" in argv:
+            print(_VERSIONS["zsteg"])
+            return 0
+        files = [a for a in argv if not a.startswith("-")]
+        if not files:
+            sys.stderr.write("zsteg: no file given\n")
+            return 1
+        path = files[-1]
+        if self.request(path) == "fail" or not os.path.isfile(path):
+            sys.stderr.write(f"zsteg: cannot open {path}\n")
+            return 1
+        if "-E" in argv:
+            return 0
+        out = self.recording(path) or ""
+        # Recordings carry runzsteg.sh's banner lines; zsteg itself prints only findings
+        sys.stdout.write("\n".join(
+            l for l in out.splitlines() if " .. " in l or l.startswith("imagedata")
+        ) + "\n")
+        return 0
+
+
+def main():
+    tool = os.path.basename(sys.argv[0])
+    if tool.endswith(".py"):
+        tool = os.environ.get("STANDIN_TOOL", "")
+    standin = StandIn(tool)
+    handler = getattr(standin, tool, None) if tool in _VERSIONS else None
+    if handler is None:
+        sys.stderr.write(f"standin: unknown tool {tool!r}\n")
+        sys.exit(2)
+
+    standin.log("spawn", argv=sys.argv[1:4])
+    standin.sleep_ms("startup_ms")
+    try:
+        code = handler(sys.argv[1:])
+    except BrokenPipeError:
+        code = 1
+    standin.finish(code or 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+browser_pool.py
+
+Pool of warm, headless Chrome sessions for reverse-image searches.
+
+Starting Chrome costs a second or more per search, so sessions are kept
+and handed out again: a session is health-checked when it is checked
+out, reset to about:blank when it comes back, and recycled after a fixed
+number of searches or age so a long GUI session never runs on a browser
+that has been accumulating state for hours. Sessions are started lazily,
+at most `size` at a time; callers beyond that wait for a free one.
+
+Environment:
+    BIGSISTER_BROWSERS   Pool size (default 2)
+    BIGSISTER_HEADLESS   Set to 0 to show the browser windows
+"""
+
+import os
+import time
+import atexit
+import threading
+from contextlib import contextmanager
+
+from selenium import webdriver
+from selenium.webdriver.chrome.options import Options
+
+from utils.tracing import span
+
+
+def chrome_options(headless: bool = True) -> Options:
+    """Chrome options used for every pooled session."""
+    options = Options()
+    if headless:
+        options.add_argument("--headless=new")
+        options.add_argument("--window-size=1366,900")
+    options.add_argument("--disable-blink-features=AutomationControlled")
+    options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    options.add_experimental_option("useAutomationExtension", False)
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_experimental_option("prefs", {"intl.accept_languages": "en-US,en"})
+    return options
+
+
+def make_chrome_driver(headless: bool = None):
+    """
+    Start a Chrome webdriver with stealth options.
+
+    Args:
+        headless (bool): Run without a window (default: unless
+            BIGSISTER_HEADLESS=0).
+    """
+    if headless is None:
+        headless = os.environ.get("BIGSISTER_HEADLESS", "1") != "0"
+    with span("browser.launch", cat="iris"):
+        driver = webdriver.Chrome(options=chrome_options(headless))
+        driver.execute_script(
+            "Object.defineProperty(navigator, 'webdriver', {get: () => undefined})"
+        )
+    return driver
+
+
+class _Session:
+    __slots__ = ("driver", "created", "uses")
+
+    def __init__(self, driver):
+        self.driver = driver
+        self.created = time.monotonic()
+        self.uses = 0
+
+
+class BrowserPool:
+    """
+    Bounded pool of reusable webdriver sessions.
+
+    Use `with pool.session() as driver:`; the driver goes back to the pool
+    afterwards. discard() quits a checked-out session from any thread,
+    which is how a search in progress is cancelled.
+    """
+
+    def __init__(self, size: int = None, factory=None, max_uses: int = 50,
+                 max_age: float = 1800):
+        """
+        Args:
+            size (int): Most sessions alive at once (default
+                $BIGSISTER_BROWSERS or 2).
+            factory (callable): Returns a new driver (default
+                make_chrome_driver). Tests pass a stand-in here.
+            max_uses (int): Searches before a session is recycled.
+            max_age (float): Seconds before a session is recycled.
+        """
+        if size is None:
+            size = int(os.environ.get("BIGSISTER_BROWSERS", "2"))
+        self.size = max(1, size)
+        self.factory = factory or make_chrome_driver
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.launched = 0
+        self.recycled = 0
+        self._idle = []  # most recently used last
+        self._busy = {}  # id(driver) -> _Session
+        self._alive = 0  # idle + busy + being launched
+        self._closed = False
+        self._cond = threading.Condition()
+
+    # --- checkout -------------------------------------------------------
+
+    def acquire(self, timeout: float = None):
+        """
+        Check out a healthy driver, starting one if the pool is not full.
+
+        Raises:
+            TimeoutError: If no session frees up within timeout seconds.
+            RuntimeError: If the pool is closed.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("browser pool is closed")
+                    if self._idle or self._alive < self.size:
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"no browser session free within {timeout}s")
+                    self._cond.wait(remaining)
+                session = self._idle.pop() if self._idle else None
+                if session is None:
+                    self._alive += 1
+
+            if session is None:
+                try:
+                    session = _Session(self.factory())
+                except BaseException:
+                    with self._cond:
+                        self._alive -= 1
+                        self._cond.notify()
+                    raise
+                self.launched += 1
+            elif self._expired(session) or not self._healthy(session.driver):
+                self._quit(session)
+                continue
+
+            with self._cond:
+                if self._closed:
+                    self._alive -= 1
+                    self._cond.notify_all()
+                else:
+                    self._busy[id(session.driver)] = session
+                    return session.driver
+            self._quit_driver(session.driver)
+            raise RuntimeError("browser pool is closed")
+
+    def release(self, driver):
+        """Return a checked-out driver; it is reset or recycled as needed."""
+        with self._cond:
+            session = self._busy.pop(id(driver), None)
+        if session is None:
+            return  # discarded while checked out
+        session.uses += 1
+        if not self._closed and session.uses < self.max_uses and not self._expired(session):
+            try:
+                # Stop whatever the page is still doing before the next user
+                driver.get("about:blank")
+            except Exception:
+                pass
+            else:
+                with self._cond:
+                    if not self._closed:
+                        self._idle.append(session)
+                        self._cond.notify()
+                        return
+        self._quit(session)
+
+    def discard(self, driver):
+        """Quit a checked-out driver instead of returning it to the pool."""
+        with self._cond:
+            session = self._busy.pop(id(driver), None)
+        if session is not None:
+            self._quit(session)
+
+    @contextmanager
+    def session(self, timeout: float = None):
+        """Context manager around acquire()/release()."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        finally:
+            self.release(driver)
+
+    def warm(self, count: int = 1):
+        """Start up to count sessions ahead of the first search."""
+        drivers = []
+        try:
+            for _ in range(min(count, self.size)):
+                drivers.append(self.acquire(timeout=0))
+        except TimeoutError:
+            pass
+        finally:
+            for driver in drivers:
+                self.release(driver)
+
+    # --- housekeeping ---------------------------------------------------
+
+    def _expired(self, session: _Session) -> bool:
+        return (session.uses >= self.max_uses
+                or time.monotonic() - session.created >= self.max_age)
+
+    @staticmethod
+    def _healthy(driver) -> bool:
+        try:
+            driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit_driver(driver):
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+    def _quit(self, session: _Session):
+        self._quit_driver(session.driver)
+        with self._cond:
+            self._alive -= 1
+            self.recycled += 1
+            self._cond.notify()
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "size": self.size,
+                "idle": len(self._idle),
+                "busy": len(self._busy),
+                "launched": self.launched,
+                "recycled": self.recycled,
+            }
+
+    def close(self):
+        """Quit every session; checked-out ones are quit as well."""
+        with self._cond:
+            self._closed = True
+            sessions = self._idle + list(self._busy.values())
+            self._idle = []
+            self._busy = {}
+            self._alive -= len(sessions)
+            self._cond.notify_all()
+        for session in sessions:
+            self._quit_driver(session.driver)
+
+
+_default_pool = None
+_default_lock = threading.Lock()
+
+
+def get_browser_pool() -> BrowserPool:
+    """Return the process-wide BrowserPool (closed at interpreter exit)."""
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = BrowserPool()
+            atexit.register(_default_pool.close)
+        return _default_pool
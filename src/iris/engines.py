@@ -0,0 +1,278 @@
+"""
+engines.py
+
+Reverse-image search engines for ImageSearchIRIS.
+
+Every engine drives the same upload flow with its own selectors: open
+the search page, dismiss a consent dialog, open the upload dialog with
+the camera button (if the page has one), hand the image to the file
+input, then wait for the results page and return its HTML. Subclasses
+only declare selectors, hosts and limits; an engine whose site needs a
+different flow overrides search().
+
+base_url points an engine at another server with the same markup, which
+is how tests substitute local stand-in pages (benchmarks/standins/
+search_page.py) for the real sites.
+"""
+
+import os
+import time
+import threading
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException
+
+# Elements that open the upload dialog, tried together on every poll
+UPLOAD_SELECTORS = [
+    (By.XPATH, "//div[contains(text(), 'Upload a file')]"),
+    (By.XPATH, "//div[contains(text(), 'upload a file')]"),
+    (By.XPATH, "//div[contains(text(), 'Upload an image')]"),
+    (By.XPATH, "//span[contains(text(), 'Upload a file')]"),
+    (By.XPATH, "//span[contains(text(), 'upload a file')]"),
+    (By.XPATH, "//button[contains(text(), 'Upload')]"),
+    (By.XPATH, "//div[@role='tab'][contains(., 'Upload')]"),
+    (By.XPATH, "//div[contains(@class, 'upload')]"),
+    (By.CSS_SELECTOR, "[data-bucket='upload']"),
+]
+
+CONSENT_SELECTORS = [
+    "button[id*='accept']",
+    "button[id*='agree']",
+    "button[class*='accept']",
+    "button[class*='agree']",
+    "div[role='button'][jsaction*='accept']",
+]
+
+FILE_INPUT = (By.CSS_SELECTOR, "input[type='file']")
+
+
+def _first_clickable(driver, locators):
+    """Expected condition: the first displayed, enabled match of any locator."""
+    for by, selector in locators:
+        for element in driver.find_elements(by, selector):
+            try:
+                if element.is_displayed() and element.is_enabled():
+                    return element
+            except Exception:
+                continue  # went stale between find and check
+    return False
+
+
+def _page_loaded(driver):
+    return driver.execute_script("return document.readyState") == "complete"
+
+
+class RateLimiter:
+    """Spaces out calls to at least min_interval seconds apart (thread-safe)."""
+
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self, cancelled: threading.Event = None):
+        """Sleep until the next call may start; return early once cancelled is set."""
+        with self._lock:
+            now = time.monotonic()
+            start = max(now, self._next)
+            self._next = start + self.min_interval
+        if start > now:
+            if cancelled is not None:
+                cancelled.wait(start - now)
+            else:
+                time.sleep(start - now)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limiter_for(key: str, min_interval: float) -> RateLimiter:
+    # One limiter per engine and site for the whole process, however many
+    # ImageSearchIRIS instances search at once
+    with _limiters_lock:
+        limiter = _limiters.get(key)
+        if limiter is None or limiter.min_interval != min_interval:
+            limiter = _limiters[key] = RateLimiter(min_interval)
+        return limiter
+
+
+class SearchEngine:
+    """Upload flow of one reverse-image search site."""
+
+    name = None
+    search_url = None
+    # Camera / "search by image" button; None when the file input is on the page
+    camera_selector = None
+    upload_selectors = UPLOAD_SELECTORS
+    consent_selectors = CONSENT_SELECTORS
+    # Present once the results page exists (before results render), if any
+    results_marker = None
+    # Host substrings of engine-internal links (see iris.result_parser)
+    exclude_hosts = ()
+    min_interval = 2.0  # seconds between searches on this engine
+    timeout = 45.0  # seconds for one whole search
+    dialog_timeout = 10.0
+    results_timeout = 10.0  # for result links to render; none is an answer
+
+    def __init__(self, base_url: str = None, min_interval: float = None,
+                 timeout: float = None):
+        """
+        Args:
+            base_url (str): Search page to use instead of the real site.
+            min_interval (float): Override of the per-engine rate limit.
+            timeout (float): Override of the per-search time budget.
+        """
+        if base_url:
+            self.search_url = base_url
+        if min_interval is not None:
+            self.min_interval = min_interval
+        if timeout is not None:
+            self.timeout = timeout
+        self.limiter = _limiter_for(f"{self.name}|{self.search_url}", self.min_interval)
+
+    @property
+    def result_link_selector(self) -> str:
+        """CSS for links that leave the engine: results have rendered."""
+        exclusions = "".join(f":not([href*='{host}'])" for host in self.exclude_hosts)
+        return f"a[href^='http']{exclusions}"
+
+    def search(self, driver, image_path: str, log=print) -> str:
+        """
+        Upload image_path and return the results page HTML; the results
+        page address is left in driver.current_url.
+
+        Raises:
+            selenium.common.exceptions.WebDriverException: Any step failed
+                (TimeoutException if the page did not get there in time).
+        """
+        deadline = time.monotonic() + self.timeout
+
+        def remaining(cap=None):
+            left = max(0.1, deadline - time.monotonic())
+            return min(left, cap) if cap else left
+
+        log(f"🔍 [{self.name}] Starting reverse image search for: {image_path}")
+        # get() returns once the page has loaded; without a page-load
+        # timeout it may block for Selenium's default of 300 s
+        driver.set_page_load_timeout(remaining())
+        driver.get(self.search_url)
+        self.handle_consent(driver, log)
+
+        if self.camera_selector:
+            camera_button = WebDriverWait(driver, remaining(self.dialog_timeout)).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, self.camera_selector))
+            )
+            camera_button.click()
+
+        # The dialog either exposes its file input straight away or behind an
+        # "Upload a file" tab; wait for whichever appears first
+        target = WebDriverWait(driver, remaining(self.dialog_timeout)).until(EC.any_of(
+            EC.presence_of_element_located(FILE_INPUT),
+            lambda d: _first_clickable(d, self.upload_selectors),
+        ))
+        if target.tag_name.lower() != "input":
+            target.click()
+            target = WebDriverWait(driver, remaining(self.dialog_timeout)).until(
+                EC.presence_of_element_located(FILE_INPUT)
+            )
+
+        start_url = driver.current_url
+        target.send_keys(os.path.abspath(image_path))
+
+        # Wait for the results page: navigation away from the upload page,
+        # then its marker, then the end of loading
+        log(f"⏳ [{self.name}] Waiting for search results...")
+        wait = WebDriverWait(driver, remaining())
+        wait.until(EC.url_changes(start_url))
+        if self.results_marker:
+            wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, self.results_marker)))
+        wait.until(_page_loaded)
+        try:
+            # Result cards are often rendered by script after the load event
+            WebDriverWait(driver, remaining(self.results_timeout)).until(
+                lambda d: d.find_elements(By.CSS_SELECTOR, self.result_link_selector)
+            )
+        except TimeoutException:
+            pass  # a page without results is a valid answer
+        return driver.page_source
+
+    def handle_consent(self, driver, log=print):
+        """Dismiss a cookie consent dialog if one is showing."""
+        try:
+            button = _first_clickable(
+                driver, [(By.CSS_SELECTOR, s) for s in self.consent_selectors]
+            )
+            if button:
+                button.click()
+                # The dialog is gone once the button is detached
+                WebDriverWait(driver, 5).until(EC.staleness_of(button))
+        except TimeoutException:
+            pass
+        except Exception as e:
+            log(f"Note: [{self.name}] Could not handle cookie consent: {e}")
+
+
+class GoogleEngine(SearchEngine):
+    name = "google"
+    search_url = "https://images.google.com?hl=en&gl=us"
+    camera_selector = "[aria-label*='Search by image']"
+    results_marker = "[data-ved]"
+    exclude_hosts = ("google.", "gstatic.com", "googleusercontent.com", "googleapis.com",
+                     "youtube.com", "blogger.com")
+
+
+class BingEngine(SearchEngine):
+    name = "bing"
+    search_url = "https://www.bing.com/images?FORM=HDRSC2&setlang=en-us"
+    camera_selector = "#sb_sbi, [aria-label*='Search using an image']"
+    consent_selectors = ["#bnp_btn_accept", *CONSENT_SELECTORS]
+    exclude_hosts = ("bing.", "microsoft.", "msn.", "live.com")
+
+
+class YandexEngine(SearchEngine):
+    name = "yandex"
+    search_url = "https://yandex.com/images/"
+    camera_selector = (".input__cbir-button, button[aria-label*='Image search'], "
+                       "[aria-label*='Search by image']")
+    exclude_hosts = ("yandex.", "ya.ru", "yastatic.net")
+    timeout = 60.0
+
+
+class TinEyeEngine(SearchEngine):
+    name = "tineye"
+    search_url = "https://tineye.com/"
+    camera_selector = None  # the upload input is on the front page
+    exclude_hosts = ("tineye.com",)
+    min_interval = 5.0
+
+
+ENGINES = {cls.name: cls for cls in (GoogleEngine, BingEngine, YandexEngine, TinEyeEngine)}
+
+
+def default_engine_names() -> list:
+    """Engines used when none are named: $BIGSISTER_ENGINES or just Google."""
+    names = os.environ.get("BIGSISTER_ENGINES", "google")
+    return [name.strip().lower() for name in names.split(",") if name.strip()]
+
+
+def make_engines(engines=None) -> list:
+    """
+    Resolve engine names and instances into a list of SearchEngine instances.
+
+    Raises:
+        ValueError: For an unknown engine name.
+    """
+    resolved = []
+    for engine in engines or default_engine_names():
+        if isinstance(engine, SearchEngine):
+            resolved.append(engine)
+            continue
+        cls = ENGINES.get(str(engine).lower())
+        if cls is None:
+            raise ValueError(f"unknown search engine {engine!r} "
+                             f"(choose from {', '.join(ENGINES)})")
+        resolved.append(cls())
+    return resolved
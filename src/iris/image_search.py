@@ -1,146 +1,244 @@
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-import time
 import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from iris.browser_pool import get_browser_pool
+from iris.engines import make_engines
+from iris.result_parser import parse_results, merge_results, PARSER_VERSION
+from utils.cache import get_cache
+from utils.tracing import span
+
 
 class ImageSearchIRIS:
-    def __init__(self):
-        """Initialize the Image Retrieval and Identification Script"""
-        self.driver = None
+    # Web results drift; cached searches older than this are repeated
+    CACHE_MAX_AGE = 7 * 24 * 3600
+    # Scheduler poll interval, and slack past an engine's own time budget
+    # before its browser is killed
+    _TICK = 0.25
+    _GRACE = 5.0
+
+    def __init__(self, pool=None, engines=None, verbose: bool = True):
+        """
+        Initialize the Image Retrieval and Identification Script.
+
+        Args:
+            pool (BrowserPool): Browser sessions to search with (default:
+                the shared headless pool).
+            engines (list): Engine names or SearchEngine instances (see
+                iris.engines; default $BIGSISTER_ENGINES or Google).
+                Instances with a base_url point at local stand-ins in tests.
+            verbose (bool): Print progress; batch and NDJSON runs turn it off.
+
+        Raises:
+            ValueError: For an unknown engine name.
+        """
+        self.pool = pool or get_browser_pool()
+        self.engines = make_engines(engines)
+        self.results_url = None
         self.max_results = 10
-        self.search_timeout = 30
-        self.setup_driver()
-    
-    def setup_driver(self):
-        """Set up Chrome webdriver with stealth options"""
-        chrome_options = Options()
-        chrome_options.add_argument("--disable-blink-features=AutomationControlled")
-        chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
-        chrome_options.add_experimental_option('useAutomationExtension', False)
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_experimental_option("prefs", {"intl.accept_languages": "en-US,en"})
-        
-        self.driver = webdriver.Chrome(options=chrome_options)
-        self.driver.execute_script("Object.defineProperty(navigator, 'webdriver', {get: () => undefined})")
-    
+        self.last_error = None
+        self.verbose = verbose
+        self._active = {}  # engine name -> (driver, start time) while searching
+        self._lock = threading.Lock()
+        self._stopped = threading.Event()  # set by close()
+
     def reverse_image_search(self, image_path):
-        """Perform reverse image search using Google Images"""
+        """
+        Perform reverse image search with the first engine.
+
+        On success the results page address is left in self.results_url.
+        """
+        engine = self.engines[0]
+        result = self._search_all([engine], image_path, use_cache=False)[engine.name]
+        self.results_url = result["results_url"]
+        self.last_error = result.get("error")
+        return result["success"]
+
+    def search_image(self, image_path, use_cache=True):
+        """
+        Reverse-search image_path on every engine at once and merge the results.
+
+        Each engine's results are cached by the image's SHA-256, engine and
+        search page for CACHE_MAX_AGE seconds, so batch runs over repeated
+        images stay off the network. Engines are rate limited and given
+        their own time budget; one slow or failing engine only costs its
+        own results.
+
+        Returns:
+            dict: {"success" (any engine succeeded), "image", "results"
+                (merged records, see iris.result_parser.merge_results),
+                "engines" ({name: {"success", "results_url", "results",
+                "searched_at", "elapsed", "cached", "error"?}}), "cached",
+                "searched_at"} and "error" when every engine failed.
+        """
+        per_engine = self._search_all(self.engines, image_path, use_cache)
+        ok = {name: r for name, r in per_engine.items() if r["success"]}
+        result = {
+            "success": bool(ok),
+            "image": image_path,
+            "results": merge_results({name: r["results"] for name, r in ok.items()}),
+            "engines": per_engine,
+            "cached": all(r["cached"] for r in per_engine.values()),
+            "searched_at": min(r["searched_at"] for r in per_engine.values()),
+        }
+        if not ok:
+            result["error"] = "; ".join(f"{name}: {r.get('error')}"
+                                        for name, r in per_engine.items())
+        return result
+
+    def _search_all(self, engines, image_path, use_cache):
+        """
+        Search engines on worker threads, even a single one, so _collect()
+        can kill the browser of an engine that overruns its budget.
+        """
+        with ThreadPoolExecutor(max_workers=len(engines)) as workers:
+            futures = {
+                workers.submit(self._search_engine, engine, image_path, use_cache): engine
+                for engine in engines
+            }
+            return self._collect(futures)
+
+    def _collect(self, futures: dict) -> dict:
+        """Wait for every engine, killing the browser of any that overruns."""
+        per_engine = {}
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=self._TICK, return_when=FIRST_COMPLETED)
+            for future in done:
+                per_engine.setdefault(futures[future].name, future.result())
+            now = time.monotonic()
+            overdue = []
+            with self._lock:
+                for future in pending:
+                    engine = futures[future]
+                    active = self._active.get(engine.name)
+                    if (active and engine.name not in per_engine
+                            and now - active[1] > engine.timeout + self._GRACE):
+                        overdue.append((engine, active[0]))
+            for engine, driver in overdue:
+                self.pool.discard(driver)
+                per_engine[engine.name] = self._failure(
+                    engine, time.time(), f"timed out after {engine.timeout:g}s"
+                )
+                self._log(f"❌ [{engine.name}] Timed out")
+        return {engine.name: per_engine[engine.name] for engine in futures.values()}
+
+    def _cache_key(self, engine, image_path):
+        cache = get_cache()
+        return cache.make_key(
+            cache.file_hash(image_path), "iris", f"{engine.name}-{PARSER_VERSION}",
+            {"search_url": engine.search_url, "max_results": self.max_results},
+        )
+
+    @staticmethod
+    def _failure(engine, searched_at, error):
+        return {
+            "success": False, "engine": engine.name, "results_url": None, "results": [],
+            "searched_at": searched_at, "elapsed": round(time.time() - searched_at, 3),
+            "cached": False, "error": error,
+        }
+
+    def _search_engine(self, engine, image_path, use_cache=True):
+        """Search one engine (or its cache); never raises."""
+        searched_at = time.time()
         if not os.path.exists(image_path):
-            print(f"❌ Error: Image file not found: {image_path}")
-            return False
-        
-        try:
-            print(f"🔍 Starting reverse image search for: {image_path}")
-            
-            # Navigate to Google Images
-            self.driver.get("https://images.google.com?hl=en&gl=us")
-            time.sleep(3)
-            
-            # Handle cookie consent if present
-            self._handle_cookie_consent()
-            
-            # Click on the camera icon for reverse image search
-            camera_button = WebDriverWait(self.driver, 5).until(
-                EC.element_to_be_clickable((By.CSS_SELECTOR, "[aria-label*='Search by image']"))
-            )
-            camera_button.click()
-            
-            # Wait for upload dialog and click "Upload a file"
-            upload_tab = None
-            upload_selectors = [
-                "//div[contains(text(), 'Upload a file')]",
-                "//div[contains(text(), 'upload a file')]", 
-                "//div[contains(text(), 'Upload an image')]",
-                "//span[contains(text(), 'Upload a file')]",
-                "//span[contains(text(), 'upload a file')]",
-                "//button[contains(text(), 'Upload')]",
-                "//div[@role='tab'][contains(., 'Upload')]",
-                "//div[contains(@class, 'upload')]",
-                "[data-bucket='upload']",
-                "input[type='file']"
-            ]
-            
-            for selector in upload_selectors:
-                try:
-                    if selector.startswith("//"):
-                        upload_tab = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.XPATH, selector))
-                        )
-                    else:
-                        upload_tab = WebDriverWait(self.driver, 3).until(
-                            EC.element_to_be_clickable((By.CSS_SELECTOR, selector))
-                        )
-                    print(f"✅ Found upload element with selector: {selector}")
-                    break
-                except:
-                    continue
-            
-            if upload_tab:
-                upload_tab.click()
-            else:
-                print("❌ Could not find upload button, trying alternative approach...")
-            
-            # Find and click the file input
-            file_input = WebDriverWait(self.driver, 10).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "input[type='file']"))
-            )
-            
-            # Upload the image file
-            file_input.send_keys(os.path.abspath(image_path))
-            
-            # Wait for search results to load
-            print("⏳ Waiting for search results...")
-            WebDriverWait(self.driver, self.search_timeout).until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, "[data-ved]"))
-            )
-            
-            time.sleep(3)  # Additional wait for full page load
-            
-            print("✅ Search completed! Results are now visible in the browser.")
-            print("🌐 You can browse the results directly in the opened browser window.")
-            
-            return True
-            
-        except Exception as e:
-            print(f"❌ Error during reverse image search: {e}")
-            return False
-    
-    def _handle_cookie_consent(self):
-        """Handle Google's cookie consent dialog"""
+            error = f"Image file not found: {image_path}"
+            self._log(f"❌ Error: {error}")
+            return self._failure(engine, searched_at, error)
+
+        cache = get_cache()
+        key = None
+        if use_cache and cache.enabled and os.path.isfile(image_path):
+            key = self._cache_key(engine, image_path)
+            cached = cache.get(key)
+            if cached is not None and time.time() - cached["searched_at"] < self.CACHE_MAX_AGE:
+                return dict(cached, cached=True)
+
         try:
-            # Look for various cookie consent buttons
-            consent_selectors = [
-                "button[id*='accept']",
-                "button[id*='agree']",
-                "button[id*='Accept all']" 
-                "button[class*='accept']",
-                "button[class*='agree']",
-                "div[role='button'][jsaction*='accept']"
-            ]
-            
-            for selector in consent_selectors:
+            engine.limiter.wait(self._stopped)
+            with span("iris.search", cat="iris", engine=engine.name):
+                driver = self._acquire()
+                if driver is None:
+                    return self._failure(engine, searched_at, "search stopped")
                 try:
-                    buttons = self.driver.find_elements(By.CSS_SELECTOR, selector)
-                    for button in buttons:
-                        if button.is_displayed() and button.is_enabled():
-                            button.click()
-                            time.sleep(1)
-                            return
-                except:
-                    continue
+                    with self._lock:
+                        if self._stopped.is_set():
+                            return self._failure(engine, searched_at, "search stopped")
+                        self._active[engine.name] = (driver, time.monotonic())
+                    try:
+                        html = engine.search(driver, image_path, log=self._log)
+                        results_url = driver.current_url
+                    finally:
+                        with self._lock:
+                            self._active.pop(engine.name, None)
+                finally:
+                    self.pool.release(driver)
         except Exception as e:
-            print(f"Note: Could not handle cookie consent: {e}")
-    
+            if self._stopped.is_set():
+                return self._failure(engine, searched_at, "search stopped")
+            error = str(e).strip() or type(e).__name__
+            self._log(f"❌ [{engine.name}] Error during reverse image search: {error}")
+            return self._failure(engine, searched_at, error)
+
+        with span("iris.parse_results", cat="parse", engine=engine.name):
+            records = parse_results(html, results_url, exclude_hosts=engine.exclude_hosts,
+                                    limit=self.max_results)
+        self._log(f"✅ [{engine.name}] {len(records)} result(s): {results_url}")
+        result = {
+            "success": True, "engine": engine.name, "results_url": results_url,
+            "results": records, "searched_at": searched_at,
+            "elapsed": round(time.time() - searched_at, 3), "cached": False,
+        }
+        if key is not None:
+            cache.set(key, result, "iris")
+        return result
+
+    def _acquire(self):
+        """Check out a browser session, or None once the search is stopped."""
+        while not self._stopped.is_set():
+            try:
+                return self.pool.acquire(timeout=self._TICK)
+            except TimeoutError:
+                pass
+        return None
+
+    def display_results(self, results):
+        """Print the records returned by search_image()"""
+        for name, engine in results.get("engines", {}).items():
+            if engine["success"]:
+                source = "cached" if engine["cached"] else f"{engine['elapsed']:.1f}s"
+                print(f"✅ {name}: {len(engine['results'])} result(s) ({source})")
+            else:
+                print(f"❌ {name}: {engine.get('error') or 'unknown error'}")
+        if not results.get("success"):
+            return
+        several = len(results.get("engines", {})) > 1
+        for n, record in enumerate(results["results"], 1):
+            size = (f" [{record['width']}x{record['height']}]"
+                    if record.get("width") else "")
+            found = f" ({', '.join(record['engines'])})" if several else ""
+            print(f"{n:2}. {record['title'] or '(untitled)'}{size}{found}")
+            print(f"    {record['page_url']}")
+            if record.get("thumbnail_url"):
+                print(f"    🖼  {record['thumbnail_url']}")
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
     def close(self):
-        """Close the webdriver"""
-        if self.driver:
-            self.driver.quit()
-            print("🔒 Browser closed")
+        """
+        Abort searches in progress by quitting their browser sessions;
+        searches still waiting for their turn or a session never start.
+        """
+        with self._lock:
+            self._stopped.set()
+            drivers = [driver for driver, _ in self._active.values()]
+        for driver in drivers:
+            self.pool.discard(driver)
+        if drivers:
+            self._log("🔒 Browser closed")
 
 def main():
     """Main function to demonstrate reverse image search"""
@@ -158,16 +256,8 @@ def main():
             print("\n" + "="*60)
             print("🎯 REVERSE IMAGE SEARCH COMPLETED!")
             print("="*60)
-            print("📋 The search results are now displayed in your browser.")
-            print("🔍 You can:")
-            print("   • Browse through visually similar images")
-            print("   • Check pages that contain matching images")
-            print("   • Click on any result to explore further")
-            print("   • Use browser tools to save or analyze results")
+            print(f"📋 Open the results in your browser: {iris.results_url}")
             print("="*60)
-            
-            # Keep browser open for user interaction
-            input("\n⏸️  Press Enter when you're done viewing the results to close the browser...")
         
     except KeyboardInterrupt:
         print("\n⚠️  Search interrupted by user")
@@ -0,0 +1,194 @@
+"""
+result_parser.py
+
+Turns a reverse-image search results page into structured records.
+
+Pages are parsed with lxml once the browser has rendered them, so the
+scraper only pays for one page_source round trip instead of dozens of
+WebDriver element queries. Result markup changes often, so the rules
+are deliberately loose: every link to a page outside the search engine
+(and the results page's own host) that carries a thumbnail or a title
+is a result; its title, thumbnail and the "W × H" size of the matched
+image are read from the link and the result card around it.
+
+Each record is a dict:
+
+    {"page_url": str, "title": str, "thumbnail_url": str or None,
+     "width": int or None, "height": int or None}
+"""
+
+import re
+from urllib.parse import urljoin, urlparse, parse_qs
+
+import lxml.html
+
+# Bump when the records produced for the same page change
+PARSER_VERSION = 1
+
+# Hosts whose links are navigation, not results
+ENGINE_HOSTS = (
+    "google.", "gstatic.com", "googleusercontent.com", "googleapis.com",
+    "youtube.com", "blogger.com",
+)
+
+_SIZE = re.compile(r"(\d{2,5})\s*[×xX]\s*(\d{2,5})")
+_SPACE = re.compile(r"\s+")
+# How far up from a link to look for its result card's size text
+_CARD_DEPTH = 3
+
+
+def _clean(text: str) -> str:
+    return _SPACE.sub(" ", text or "").strip()
+
+
+def _unwrap(href: str, base_url: str) -> str:
+    """Absolute target URL of a result link (redirect wrappers removed)."""
+    url = urljoin(base_url, href)
+    parsed = urlparse(url)
+    if parsed.path in ("/url", "/imgres"):
+        query = parse_qs(parsed.query)
+        for name in ("q", "url", "imgrefurl"):
+            if query.get(name):
+                return query[name][0]
+    return url
+
+
+def _is_result_host(url: str, own_host: str, exclude_hosts) -> bool:
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.netloc:
+        return False
+    host = parsed.netloc.lower()
+    return host != own_host and not any(marker in host for marker in exclude_hosts)
+
+
+def _thumbnail(link, base_url: str):
+    for img in link.iter("img"):
+        for attr in ("src", "data-src", "data-iurl"):
+            src = img.get(attr)
+            # Inline data: thumbnails are placeholders or too large to keep
+            if src and not src.startswith("data:"):
+                return urljoin(base_url, src)
+    return None
+
+
+def _title(link) -> str:
+    for attr in ("aria-label", "title"):
+        if link.get(attr):
+            return _clean(link.get(attr))
+    for tag in ("h3", "h2", "h4"):
+        heading = link.find(f".//{tag}")
+        if heading is not None:
+            return _clean(heading.text_content())
+    return _clean(link.text_content())
+
+
+def _size(link, url: str, base_url: str):
+    node = link
+    for _ in range(_CARD_DEPTH + 1):
+        # Stop at the first ancestor that also holds another result's link
+        if node is None or any(_unwrap(a.get("href"), base_url) != url
+                               for a in node.iterfind(".//a[@href]")):
+            break
+        # Text node by text node: "Match 1" + "641 × 480" must not read as 1641
+        for text in node.itertext():
+            match = _SIZE.search(text)
+            if match:
+                return int(match.group(1)), int(match.group(2))
+        node = node.getparent()
+    return None, None
+
+
+def parse_results(html: str, base_url: str = "", exclude_hosts=ENGINE_HOSTS,
+                  limit: int = None) -> list:
+    """
+    Extract result records from a results page.
+
+    Args:
+        html (str): Page source.
+        base_url (str): Address of the page, for resolving relative links.
+        exclude_hosts (tuple): Host substrings that mark engine-internal links.
+        limit (int): Maximum number of records (None for all).
+
+    Returns:
+        list: Records in page order, one per distinct page URL.
+    """
+    if not html or not html.strip():
+        return []
+    root = lxml.html.fromstring(html)
+    for junk in root.xpath("//script | //style | //noscript"):
+        junk.drop_tree()
+
+    own_host = urlparse(base_url).netloc.lower()
+    records = {}
+    for link in root.iterfind(".//a[@href]"):
+        url = _unwrap(link.get("href"), base_url)
+        if not _is_result_host(url, own_host, exclude_hosts):
+            continue
+        thumbnail = _thumbnail(link, base_url)
+        title = _title(link)
+        if not title and thumbnail is None:
+            continue
+        width, height = _size(link, url, base_url)
+        record = records.get(url)
+        if record is None:
+            if limit is not None and len(records) >= limit:
+                break
+            records[url] = {
+                "page_url": url,
+                "title": title,
+                "thumbnail_url": thumbnail,
+                "width": width,
+                "height": height,
+            }
+        else:
+            # A page is often linked twice (thumbnail, then title): merge
+            if not record["title"] and title:
+                record["title"] = title
+            if record["thumbnail_url"] is None:
+                record["thumbnail_url"] = thumbnail
+            if record["width"] is None and width is not None:
+                record["width"], record["height"] = width, height
+    return list(records.values())
+
+
+def _merge_key(url: str) -> str:
+    """The same page as linked by different engines: no scheme, www or trailing /."""
+    parsed = urlparse(url)
+    host = parsed.netloc.lower()
+    if host.startswith("www."):
+        host = host[4:]
+    key = host + (parsed.path.rstrip("/") or "")
+    return f"{key}?{parsed.query}" if parsed.query else key
+
+
+def merge_results(per_engine: dict) -> list:
+    """
+    Merge and de-duplicate the records of several engines.
+
+    Args:
+        per_engine (dict): {engine name: records in that engine's order}.
+
+    Returns:
+        list: One record per page with an extra "engines" list, pages
+            found by more engines first, then by their best position.
+    """
+    merged = {}
+    for name, records in per_engine.items():
+        for position, record in enumerate(records):
+            key = _merge_key(record["page_url"])
+            entry = merged.get(key)
+            if entry is None:
+                merged[key] = entry = dict(record, engines=[], _best=position)
+            else:
+                entry["_best"] = min(entry["_best"], position)
+                for field in ("title", "thumbnail_url"):
+                    if not entry[field] and record[field]:
+                        entry[field] = record[field]
+                if entry["width"] is None and record["width"] is not None:
+                    entry["width"], entry["height"] = record["width"], record["height"]
+            if name not in entry["engines"]:
+                entry["engines"].append(name)
+    ranked = sorted(merged.values(), key=lambda e: (-len(e["engines"]), e["_best"]))
+    for entry in ranked:
+        del entry["_best"]
+    return ranked
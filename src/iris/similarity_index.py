@@ -0,0 +1,413 @@
+"""
+similarity_index.py
+
+Offline reverse-image search over a local image corpus.
+
+Every indexed image is reduced to three 64-bit perceptual hashes:
+
+    pHash   signs of the 8x8 low-frequency DCT coefficients of a 32x32
+            grayscale copy, relative to their median
+    dHash   horizontal gradient signs of a 9x8 copy
+    aHash   8x8 block means relative to their mean
+
+The three are computed together from one 32x32 grayscale array, for a
+whole batch of images at a time: the DCT and both downscales are plain
+matrix products, so NumPy does them as stacked matmuls. Hashes live in
+a small SQLite table next to the result cache and are loaded into a
+BK-tree keyed on pHash, so a Hamming-radius query only visits the
+subtrees that can hold a match. dHash and aHash then rank the candidates.
+
+Environment:
+    BIGSISTER_CACHE_DIR         Default location of similarity.sqlite3
+    BIGSISTER_SIMILARITY_DB     Explicit path of the index database
+"""
+
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PIL import Image
+
+from utils.cache import get_cache
+from utils.tracing import span
+
+HASH_SIZE = 8  # 8x8 = 64 bits per hash
+HASH_BITS = HASH_SIZE * HASH_SIZE
+SAMPLE_SIZE = 32  # side of the grayscale copy all hashes are taken from
+
+IMAGE_EXTENSIONS = {
+    ".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tif", ".tiff", ".webp",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS images (
+    path     TEXT PRIMARY KEY,
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    width    INTEGER NOT NULL,
+    height   INTEGER NOT NULL,
+    phash    TEXT NOT NULL,
+    dhash    TEXT NOT NULL,
+    ahash    TEXT NOT NULL
+);
+"""
+
+
+def _dct_matrix(n: int) -> np.ndarray:
+    """Orthonormal DCT-II matrix: dct(x) == M @ x."""
+    k = np.arange(n)[:, None]
+    i = np.arange(n)[None, :]
+    m = np.cos(np.pi * (2 * i + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    m[0] /= np.sqrt(2.0)
+    return m.astype(np.float32)
+
+
+def _box_matrix(src: int, dst: int) -> np.ndarray:
+    """Box-filter resampling matrix from src to dst samples (rows sum to 1)."""
+    edges = np.linspace(0, src, dst + 1)
+    m = np.zeros((dst, src), dtype=np.float32)
+    for j in range(dst):
+        lo, hi = edges[j], edges[j + 1]
+        for i in range(int(lo), min(src, int(np.ceil(hi)))):
+            m[j, i] = min(hi, i + 1) - max(lo, i)
+    return m / m.sum(axis=1, keepdims=True)
+
+
+_DCT = _dct_matrix(SAMPLE_SIZE)
+_ROWS = _box_matrix(SAMPLE_SIZE, HASH_SIZE)  # 32 -> 8
+_COLS_D = _box_matrix(SAMPLE_SIZE, HASH_SIZE + 1)  # 32 -> 9 (dHash)
+
+
+def load_sample(image_path: str):
+    """
+    Decode image_path to the 32x32 grayscale array the hashes are taken from.
+
+    Returns:
+        tuple: (float32 array of shape (32, 32), (width, height) of the original)
+    """
+    with Image.open(image_path) as img:
+        size = img.size
+        # JPEG only: decode the DCT at the smallest scale still >= 2x sample
+        img.draft("L", (SAMPLE_SIZE * 2, SAMPLE_SIZE * 2))
+        if img.mode not in ("L", "RGB", "RGBA"):
+            img = img.convert("RGBA" if "transparency" in img.info else "RGB")
+        small = img.convert("L").resize((SAMPLE_SIZE, SAMPLE_SIZE),
+                                         Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return np.asarray(small, dtype=np.float32), size
+
+
+def _pack(bits: np.ndarray) -> list:
+    """(N, 64) bool -> N Python ints (first bit is the most significant)."""
+    packed = np.packbits(bits.reshape(len(bits), -1), axis=1)
+    return [int(v) for v in packed.view(">u8").ravel()]
+
+
+def compute_hashes(samples: np.ndarray) -> dict:
+    """
+    pHash, dHash and aHash of a batch of 32x32 grayscale samples.
+
+    Args:
+        samples (np.ndarray): Array of shape (N, 32, 32).
+
+    Returns:
+        dict: {"phash": [int], "dhash": [int], "ahash": [int]}, N each.
+    """
+    x = np.asarray(samples, dtype=np.float32).reshape(-1, SAMPLE_SIZE, SAMPLE_SIZE)
+
+    # pHash: 2-D DCT as D @ X @ D^T, keep the low-frequency 8x8 block
+    low = (_DCT @ x @ _DCT.T)[:, :HASH_SIZE, :HASH_SIZE].reshape(len(x), -1)
+    # The DC term only tracks brightness; leave it out of the median
+    median = np.median(low[:, 1:], axis=1, keepdims=True)
+    phash = low > median
+
+    # aHash: 8x8 block means against their mean
+    blocks = _ROWS @ x @ _ROWS.T
+    ahash = blocks > blocks.mean(axis=(1, 2), keepdims=True)
+
+    # dHash: 9x8 copy, is each pixel brighter than its right neighbour
+    wide = _ROWS @ x @ _COLS_D.T
+    dhash = wide[:, :, :-1] > wide[:, :, 1:]
+
+    return {"phash": _pack(phash), "dhash": _pack(dhash), "ahash": _pack(ahash)}
+
+
+def image_hashes(image_path: str) -> dict:
+    """
+    Perceptual hashes of a single image.
+
+    Returns:
+        dict: {"phash", "dhash", "ahash"} as ints plus "width" and "height".
+    """
+    sample, (width, height) = load_sample(image_path)
+    hashes = compute_hashes(sample[None])
+    return {name: values[0] for name, values in hashes.items()} | {
+        "width": width, "height": height,
+    }
+
+
+def hamming(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over 64-bit hashes under Hamming distance.
+
+    Each node holds one hash and every item that has exactly that hash;
+    its children are keyed by their distance to it. By the triangle
+    inequality a query within radius r of q only needs the children of a
+    node at distance d whose key lies in [d - r, d + r].
+    """
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+        self.size = 0
+
+    def __len__(self):
+        return self.size
+
+    def add(self, value: int, item):
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            d = hamming(value, node[0])
+            if d == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(d)
+            if child is None:
+                node[2][d] = [value, [item], {}]
+                return
+            node = child
+
+    def query(self, value: int, radius: int) -> list:
+        """Return [(distance, item)] for every item within radius of value."""
+        found = []
+        if self.root is None:
+            return found
+        stack = [self.root]
+        while stack:
+            node_value, items, children = stack.pop()
+            d = hamming(value, node_value)
+            if d <= radius:
+                found.extend((d, item) for item in items)
+            lo, hi = d - radius, d + radius
+            stack.extend(child for key, child in children.items() if lo <= key <= hi)
+        return found
+
+
+class SimilarityIndex:
+    """Persistent perceptual-hash index with ranked Hamming-radius search."""
+
+    DEFAULT_MAX_DISTANCE = 10
+    BATCH_SIZE = 256
+
+    def __init__(self, db_path: str = None):
+        """
+        Args:
+            db_path (str): SQLite file holding the hashes (default
+                $BIGSISTER_SIMILARITY_DB or <cache dir>/similarity.sqlite3).
+        """
+        if db_path is None:
+            db_path = os.environ.get("BIGSISTER_SIMILARITY_DB") or os.path.join(
+                get_cache().cache_dir, "similarity.sqlite3"
+            )
+        self.db_path = str(db_path)
+        self._tree = None  # built from the database on first search
+        self._records = {}  # path -> row dict, mirrors the table once loaded
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+
+    def _connection(self):
+        # SQLite handles must not cross a fork; reopen in child processes
+        if self._conn is None or self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.db_path)), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _load(self):
+        if self._tree is not None:
+            return
+        with span("similarity.load", cat="iris"):
+            rows = self._connection().execute(
+                "SELECT path, size, mtime_ns, width, height, phash, dhash, ahash FROM images"
+            ).fetchall()
+            self._records = {}
+            for path, size, mtime_ns, width, height, phash, dhash, ahash in rows:
+                self._records[path] = {
+                    "path": path, "size": size, "mtime_ns": mtime_ns,
+                    "width": width, "height": height,
+                    "phash": int(phash, 16), "dhash": int(dhash, 16), "ahash": int(ahash, 16),
+                }
+            self._rebuild()
+
+    def _rebuild(self):
+        tree = BKTree()
+        for record in self._records.values():
+            tree.add(record["phash"], record)
+        self._tree = tree
+
+    def __len__(self):
+        with self._lock:
+            self._load()
+            return len(self._records)
+
+    def add(self, paths, workers: int = None, progress=None) -> dict:
+        """
+        Hash and index image files. Files already indexed with the same size
+        and mtime are skipped; non-images and unreadable files are counted
+        as failed.
+
+        Args:
+            paths (iterable): Image file paths.
+            workers (int): Decoder threads (default: CPU count).
+            progress (callable): Called with (done, total) after each batch.
+
+        Returns:
+            dict: {"added": int, "unchanged": int, "failed": [paths]}
+        """
+        with self._lock:
+            self._load()
+            todo, unchanged = [], 0
+            for path in dict.fromkeys(os.path.abspath(p) for p in paths):
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                known = self._records.get(path)
+                if known and (known["size"], known["mtime_ns"]) == (st.st_size, st.st_mtime_ns):
+                    unchanged += 1
+                else:
+                    todo.append((path, st))
+
+        def sample(path):
+            try:
+                return load_sample(path)
+            except Exception:
+                return None
+
+        added, failed = [], []
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 4) as pool:
+            for start in range(0, len(todo), self.BATCH_SIZE):
+                batch = todo[start:start + self.BATCH_SIZE]
+                with span("similarity.hash_batch", cat="iris", images=len(batch)):
+                    decoded = list(pool.map(sample, [path for path, _ in batch]))
+                    ok = [(entry, res) for entry, res in zip(batch, decoded) if res is not None]
+                    failed.extend(path for (path, _), res in zip(batch, decoded) if res is None)
+                    if ok:
+                        hashes = compute_hashes(np.stack([res[0] for _, res in ok]))
+                        for n, ((path, st), (_, (width, height))) in enumerate(ok):
+                            added.append({
+                                "path": path, "size": st.st_size, "mtime_ns": st.st_mtime_ns,
+                                "width": width, "height": height,
+                                "phash": hashes["phash"][n], "dhash": hashes["dhash"][n],
+                                "ahash": hashes["ahash"][n],
+                            })
+                if progress:
+                    progress(min(start + self.BATCH_SIZE, len(todo)), len(todo))
+
+        if added:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO images VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(r["path"], r["size"], r["mtime_ns"], r["width"], r["height"],
+                          f"{r['phash']:016x}", f"{r['dhash']:016x}", f"{r['ahash']:016x}")
+                         for r in added],
+                    )
+                replaced = any(r["path"] in self._records for r in added)
+                for record in added:
+                    self._records[record["path"]] = record
+                if replaced:
+                    self._rebuild()
+                else:
+                    for record in added:
+                        self._tree.add(record["phash"], record)
+        return {"added": len(added), "unchanged": unchanged, "failed": failed}
+
+    def prune(self) -> int:
+        """Drop entries whose file no longer exists. Returns how many."""
+        with self._lock:
+            self._load()
+            gone = [path for path in self._records if not os.path.exists(path)]
+            if gone:
+                conn = self._connection()
+                with conn:
+                    conn.executemany("DELETE FROM images WHERE path = ?", [(p,) for p in gone])
+                for path in gone:
+                    del self._records[path]
+                self._rebuild()
+        return len(gone)
+
+    def search_image(self, image_path: str, max_distance: int = None, limit: int = 10,
+                     include_self: bool = False) -> list:
+        """
+        Find indexed images perceptually similar to image_path.
+
+        Args:
+            image_path (str): Query image (need not be indexed).
+            max_distance (int): Largest pHash Hamming distance (0-64) to accept.
+            limit (int): Maximum number of matches returned (None for all).
+            include_self (bool): Also return image_path itself if indexed.
+
+        Returns:
+            list: Match dicts, best first, with "path", "width", "height",
+                "distance" (pHash), "dhash_distance", "ahash_distance" and
+                "similarity" (1.0 = identical hashes).
+        """
+        if max_distance is None:
+            max_distance = self.DEFAULT_MAX_DISTANCE
+        query = image_hashes(image_path)
+        own_path = os.path.abspath(image_path)
+        with self._lock:
+            self._load()
+            with span("similarity.search", cat="iris", indexed=len(self._records)):
+                candidates = self._tree.query(query["phash"], max_distance)
+
+        matches = []
+        for distance, record in candidates:
+            if record["path"] == own_path and not include_self:
+                continue
+            d_dist = hamming(query["dhash"], record["dhash"])
+            a_dist = hamming(query["ahash"], record["ahash"])
+            matches.append({
+                "path": record["path"],
+                "width": record["width"],
+                "height": record["height"],
+                "distance": distance,
+                "dhash_distance": d_dist,
+                "ahash_distance": a_dist,
+                "similarity": round(1 - (distance + d_dist + a_dist) / (3 * HASH_BITS), 3),
+            })
+        matches.sort(key=lambda m: (m["distance"], m["dhash_distance"] + m["ahash_distance"],
+                                    m["path"]))
+        return matches[:limit] if limit is not None else matches
+
+    def close(self):
+        if self._conn is not None and self._pid == os.getpid():
+            self._conn.close()
+        self._conn = None
+
+
+_default_index = None
+_default_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Return the process-wide SimilarityIndex."""
+    global _default_index
+    with _default_lock:
+        if _default_index is None:
+            _default_index = SimilarityIndex()
+        return _default_index
@@ -5,101 +5,478 @@ Big Sister - Orchestrates metadata scrapers, parser, and reverse-image search
 via either a GUI or terminal interface.
 """
 
+import os
 import sys
+import glob
+import atexit
+import json
+import time
+import threading
+import multiprocessing
 from pathlib import Path
+from functools import partial
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 
 # Metadata scrapers
 from metadata.exiftool_scraper import MetadataScraper
 from steganography.steghide_scraper import SteghideScraper
 from steganography.binwalk_scraper import BinwalkScraper
+from steganography.steghide_cracker import SteghideCracker, print_progress
 
 # Unified parser
 from metadata.parser import MetadataParser
 
 # Reverse-image search
 from iris.image_search import ImageSearchIRIS
+from iris.browser_pool import get_browser_pool
+from iris.engines import ENGINES, make_engines
+from iris.similarity_index import get_similarity_index, IMAGE_EXTENSIONS
 
 # Interfaces
 from utils.gui import startGUI
+from utils.cache import get_cache, set_cache_enabled
+from utils.analysis_context import AnalysisContext
+from utils.async_runner import run_tools
+from utils.processes import shared_slots, install_slots
+from utils.ndjson_writer import NDJSONWriter, stage_record
+from utils.tracing import get_tracer, span, export_on_exit
 
 
-def run_metadata_chain(file_path: str) -> dict:
+def run_metadata_chain(file_path: str, verbose: bool = True,
+                       context: AnalysisContext = None, timeouts: dict = None,
+                       emit=None) -> dict:
     """
     Run the full metadata scraping → parsing chain on the given file.
     Returns a dict of combined parsed metadata.
+
+    With verbose=False nothing is printed; batch runs use this so worker
+    processes don't interleave their tables on stdout. All scrapers share
+    one AnalysisContext, so EXIF is scraped once even though Steghide
+    needs it for passphrase derivation.
+
+    The tools themselves run concurrently (see utils.async_runner) with
+    per-tool timeouts; `timeouts` overrides config.json per tool.
+
+    emit, if given, receives one record per stage (see utils.ndjson_writer)
+    the moment that stage finishes, followed by a "summary" record. Each
+    record carries "elapsed", the seconds since this file's analysis began.
     """
+    if context is None:
+        with AnalysisContext(file_path) as context:
+            return run_metadata_chain(file_path, verbose, context, timeouts, emit)
+    with span("pipeline.file", cat="pipeline", file=file_path):
+        return _metadata_chain(file_path, verbose, context, timeouts, emit)
+
+
+def _metadata_chain(file_path: str, verbose: bool, context: AnalysisContext,
+                    timeouts: dict, emit) -> dict:
     parser = MetadataParser()
+    exif_scraper = MetadataScraper()
+    stages = {}
+    started = time.perf_counter()
+
+    def stage_done(stage, raw_result):
+        if stage == "exif":
+            record = {
+                "raw": raw_result,
+                "parsed": parser.parse_exif(raw_result),
+                "anomalies": exif_scraper.check_timestamp_anomaly(file_path, raw_result),
+            }
+        elif stage == "steghide":
+            record = {"raw": raw_result, "parsed": parser.parse_steghide(raw_result)}
+        elif stage == "binwalk":
+            record = {"raw": raw_result, "parsed": parser.parse_binwalk(raw_result)}
+        else:
+            return
+        stages[stage] = record
+        if emit is not None:
+            emit(stage_record(file_path, stage, elapsed=round(time.perf_counter() - started, 6),
+                              **record))
+
+    run_tools(context, timeouts, on_result=stage_done)
     combined = {}
 
 
 
     # 1) EXIFTool (with Pillow fallback)
-    exif_scraper = MetadataScraper()
-    raw_exif = exif_scraper.scrape(file_path)
-    print("\n[ Raw EXIFTool Output ]")
-    exif_scraper.display_metadata(raw_exif)
-
-    exif_anomalies = exif_scraper.check_timestamp_anomaly(file_path, raw_exif)
-    if exif_anomalies:
-        print("\n[ EXIF Timestamp Anomalies ]")
-        for k, v in exif_anomalies.items():
+    raw_exif = stages["exif"]["raw"]
+    exif_anomalies = stages["exif"]["anomalies"]
+    parsed_exif = stages["exif"]["parsed"]
+    if verbose:
+        print("\n[ Raw EXIFTool Output ]")
+        exif_scraper.display_metadata(raw_exif)
+        if exif_anomalies:
+            print("\n[ EXIF Timestamp Anomalies ]")
+            for k, v in exif_anomalies.items():
+                print(f"{k:25}: {v}")
+        print("\n[ Parsed EXIF Metadata ]")
+        for k, v in parsed_exif.items():
             print(f"{k:25}: {v}")
-
-    parsed_exif = parser.parse_exif(raw_exif)
-    print("\n[ Parsed EXIF Metadata ]")
-    for k, v in parsed_exif.items():
-        print(f"{k:25}: {v}")
     combined.update(parsed_exif)
 
 
 
     # 2) Steghide
     steg_scraper = SteghideScraper()
-    raw_steg = steg_scraper.scrape(file_path)
-    print("\n[ Raw Steghide Output ]")
-    steg_scraper.display_metadata(raw_steg)
-    parsed_steg = parser.parse_steghide(raw_steg)
-    print("\n[ Parsed Steghide Metadata ]")
-    for k, v in parsed_steg.items():
-        print(f"{k:25}: {v}")
+    raw_steg = stages["steghide"]["raw"]
+    parsed_steg = stages["steghide"]["parsed"]
+    if verbose:
+        print("\n[ Raw Steghide Output ]")
+        steg_scraper.display_metadata(raw_steg)
+        print("\n[ Parsed Steghide Metadata ]")
+        for k, v in parsed_steg.items():
+            print(f"{k:25}: {v}")
     combined.update(parsed_steg)
 
 
 
     # 3) Binwalk
     bw_scraper = BinwalkScraper()
-    raw_bw = bw_scraper.scrape(file_path, extract=False)
-    print("\n[ Raw Binwalk Output ]")
-    bw_scraper.display_metadata(raw_bw)
-    parsed_bw = parser.parse_binwalk(raw_bw)
-    print("\n[ Parsed Binwalk Metadata ]")
-    for k, v in parsed_bw.items():
-        print(f"{k:25}: {v}")
+    raw_bw = stages["binwalk"]["raw"]
+    parsed_bw = stages["binwalk"]["parsed"]
+    if verbose:
+        print("\n[ Raw Binwalk Output ]")
+        bw_scraper.display_metadata(raw_bw)
+        print("\n[ Parsed Binwalk Metadata ]")
+        for k, v in parsed_bw.items():
+            print(f"{k:25}: {v}")
     combined.update(parsed_bw)
 
 
 
     # 4) Summary
+    if verbose:
+        print("\n" + "=" * 60)
+        print("Combined Parsed Metadata".center(60))
+        print("=" * 60)
+        for k, v in combined.items():
+            print(f"{k:25}: {v}")
+        print("=" * 60)
+    if emit is not None:
+        emit(stage_record(file_path, "summary", combined=combined,
+                          elapsed=round(time.perf_counter() - started, 6)))
+
+    return combined
+
+
+
+def collect_files(inputs, files_from: str = None, recursive: bool = False) -> list:
+    """
+    Expand CLI inputs into a de-duplicated, ordered list of file paths.
+
+    Each input may be a file, a directory (its files; all descendants if
+    recursive=True) or a glob pattern. files_from names a text file with
+    one path per line ("-" reads the list from stdin).
+    """
+    candidates = []
+    for item in inputs:
+        path = Path(item)
+        if path.is_dir():
+            walker = path.rglob("*") if recursive else path.iterdir()
+            candidates.extend(sorted(p for p in walker if p.is_file()))
+        elif glob.has_magic(item):
+            candidates.extend(sorted(Path(p) for p in glob.glob(item, recursive=True)))
+        else:
+            candidates.append(path)
+
+    if files_from:
+        stream = sys.stdin if files_from == "-" else open(files_from, encoding="utf-8")
+        try:
+            candidates.extend(Path(line.strip()) for line in stream if line.strip())
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    files = []
+    seen = set()
+    for path in candidates:
+        key = str(path)
+        if key in seen or not path.is_file():
+            continue
+        seen.add(key)
+        files.append(key)
+    return files
+
+
+_record_queue = None
+
+
+def _init_batch_worker(record_queue=None, slots=None):
+    """
+    Process-pool initializer: reuse stay_open ExifTool sessions for every
+    file this worker handles instead of spawning exiftool per file, and
+    keep signature scans in-process since files already run in parallel.
+    record_queue, when streaming, carries stage records to the parent;
+    slots are the shared tool_concurrency semaphores of the whole pool.
+    """
+    global _record_queue
+    # A forked worker inherits the parent's spans; it only reports its own
+    get_tracer().drain()
+    if slots:
+        install_slots(slots)
+    MetadataScraper.default_persistent = True
+    BinwalkScraper.default_scan_workers = 1
+    _record_queue = record_queue
+
+
+def _batch_worker(file_path: str, timeouts: dict = None):
+    """
+    Process-pool entry point: run the quiet metadata chain on one file.
+    Returns (file_path, combined, error, spans, cache_counts) so one bad
+    file never kills the batch. When streaming, records go through the
+    queue and combined is None so results never pile up in the parent.
+    spans holds the worker's trace spans when tracing is on, and
+    cache_counts the (hits, misses) of this file's cache lookups.
+
+    Workers are never shut down through atexit, so the cache's buffered
+    counters and access times are flushed after every file.
+    """
+    emit = _record_queue.put if _record_queue is not None else None
+    tracer = get_tracer()
+    cache = get_cache()
+    hits, misses = cache.hits, cache.misses
+    combined, error = None, None
+    try:
+        combined = run_metadata_chain(file_path, verbose=False, timeouts=timeouts, emit=emit)
+    except Exception as e:
+        combined, error = {}, str(e)
+    finally:
+        cache.flush()
+    spans = tracer.drain() if tracer.enabled else None
+    if emit and error is None:
+        combined = None
+    return file_path, combined, error, spans, (cache.hits - hits, cache.misses - misses)
+
+
+def run_batch(files: list, workers: int = None, chunksize: int = 4,
+              timeouts: dict = None, writer: NDJSONWriter = None) -> dict:
+    """
+    Fan the metadata chain out over a process pool.
+
+    Args:
+        files (list): Paths to analyze.
+        workers (int): Pool size (defaults to the CPU count).
+        chunksize (int): Files handed to a worker per round trip.
+        timeouts (dict): Per-tool timeout overrides in seconds.
+        writer (NDJSONWriter): Stream records through this writer as
+            stages finish instead of collecting results; the summary
+            table is suppressed.
+
+    Returns:
+        dict: {file_path: combined parsed metadata}. Files that raised are
+        recorded as {"Error": message}. Empty when streaming.
+    """
+    results = {}
+    failed = 0
+    start = time.perf_counter()
+    cache = get_cache()
+
+    record_queue = drainer = None
+    if writer is not None:
+        # Bounded, so workers block instead of buffering if output stalls
+        record_queue = multiprocessing.Queue(maxsize=1024)
+
+        def drain():
+            for record in iter(record_queue.get, None):
+                writer.write(record)
+
+        drainer = threading.Thread(target=drain, daemon=True)
+        drainer.start()
+
+    try:
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_batch_worker,
+            initargs=(record_queue, shared_slots()),
+        ) as pool:
+            for done, (path, combined, error, spans, (hits, misses)) in enumerate(
+                pool.map(partial(_batch_worker, timeouts=timeouts), files, chunksize=chunksize), 1
+            ):
+                if spans:
+                    get_tracer().extend(spans)
+                # Workers persist their own counters; this run's totals live here
+                cache.hits += hits
+                cache.misses += misses
+                if error:
+                    failed += 1
+                    combined = {"Error": error}
+                    if writer is not None:
+                        writer.write(stage_record(path, "error", error=error))
+                if writer is None:
+                    results[path] = combined
+                if done % 100 == 0 or done == len(files):
+                    elapsed = time.perf_counter() - start
+                    print(
+                        f"[{done}/{len(files)}] {done / elapsed:.1f} files/s",
+                        file=sys.stderr,
+                    )
+    finally:
+        # Workers have exited (and flushed the queue) once the pool is closed
+        if drainer is not None:
+            record_queue.put(None)
+            drainer.join()
+
+    elapsed = time.perf_counter() - start
+    rate = len(files) / elapsed if elapsed > 0 else 0.0
+    if writer is not None:
+        print(
+            f"{len(files)} files, {failed} failed, {elapsed:.2f}s, {rate:.2f} files/s",
+            file=sys.stderr,
+        )
+        return results
+
     print("\n" + "=" * 60)
-    print("Combined Parsed Metadata".center(60))
+    print("Batch Summary".center(60))
     print("=" * 60)
-    for k, v in combined.items():
-        print(f"{k:25}: {v}")
+    print(f"{'Files processed':25}: {len(files)}")
+    print(f"{'Failed':25}: {failed}")
+    print(f"{'Elapsed (s)':25}: {elapsed:.2f}")
+    print(f"{'Throughput (files/s)':25}: {rate:.2f}")
     print("=" * 60)
 
-    return combined
+    return results
+
 
 
 
+def _print_cache_stats(file=None):
+    # file=sys.stderr keeps the table out of an NDJSON stream on stdout
+    file = file or sys.stdout
+    print("\n[ Result Cache ]", file=file)
+    for k, v in get_cache().stats().items():
+        print(f"{k:25}: {v}", file=file)
 
-def run_image_search(file_path: str):
+
+def run_image_search(file_path: str, engines: list = None) -> dict:
     """
     Perform a reverse-image search on the given file and display results.
+    engines names the search engines to fan out to (see iris.engines).
     """
-    searcher = ImageSearchIRIS()
+    searcher = ImageSearchIRIS(engines=engines)
     results = searcher.search_image(file_path)
     print("\n[ Reverse Image Search Results ]")
     searcher.display_results(results)
+    return results
+
+
+def run_batch_image_search(files: list, writer: NDJSONWriter = None,
+                           engines: list = None) -> dict:
+    """
+    Reverse-search every image among files on each of engines, keeping
+    the browser pool busy. Results come from the cache where possible.
+
+    Returns:
+        dict: {file_path: search_image() result}. Empty when streaming
+        through writer, which receives one "image_search" record per file.
+    """
+    images = [f for f in files if Path(f).suffix.lower() in IMAGE_EXTENSIONS]
+    results = {}
+
+    engines = make_engines(engines)
+
+    def search(path):
+        # One searcher per image: it tracks its engines' live sessions
+        return path, ImageSearchIRIS(engines=engines, verbose=False).search_image(path)
+
+    # Each image search occupies one browser per engine
+    images_at_once = max(1, get_browser_pool().size // len(engines))
+    with ThreadPoolExecutor(max_workers=images_at_once) as pool:
+        for done, (path, result) in enumerate(pool.map(search, images), 1):
+            if writer is not None:
+                writer.write(stage_record(path, "image_search", result=result))
+            else:
+                results[path] = result
+            print(f"[image search {done}/{len(images)}]", file=sys.stderr)
+    return results
+
+
+def run_similar_search(file_path: str, max_distance: int = None, limit: int = 10) -> list:
+    """
+    Look file_path up in the local perceptual-hash index (see
+    iris.similarity_index) and print the ranked matches.
+    """
+    matches = get_similarity_index().search_image(file_path, max_distance=max_distance,
+                                                  limit=limit)
+    print("\n[ Similar Images (local index) ]")
+    if not matches:
+        print("No similar images in the index.")
+    for m in matches:
+        print(f"{m['similarity']:.3f}  d={m['distance']:<2} "
+              f"{m['width']}x{m['height']:<6} {m['path']}")
+    return matches
+
+
+def build_similarity_index(inputs, recursive: bool = True) -> dict:
+    """Add the images among inputs (files, directories, globs) to the local index."""
+    files = [
+        f for f in collect_files(inputs, recursive=recursive)
+        if Path(f).suffix.lower() in IMAGE_EXTENSIONS
+    ]
+    index = get_similarity_index()
+    result = index.add(files)
+    print(f"Indexed {result['added']} new image(s), {result['unchanged']} unchanged, "
+          f"{len(result['failed'])} unreadable; {len(index)} in the index.")
+    return result
+
+
+def run_steghide_crack(file_path: str, wordlist: str = None, workers: int = None,
+                       use_ocr: bool = False, resume: bool = True,
+                       verbose: bool = True) -> dict:
+    """
+    Crack the steghide passphrase of file_path and print the outcome
+    (nothing is printed with verbose=False).
+    Candidates are mined from its EXIF fields, file name and (optionally)
+    OCR text before the wordlist is streamed.
+    """
+    ocr_text = None
+    if use_ocr:
+        # Imported here: pulling in OpenCV/Tesseract is only worth it on request
+        from ocr.ocr_engine import OCREngine
+        ocr = OCREngine().extract_text_from_image(file_path)
+        ocr_text = ocr.get("text") if ocr.get("success") else None
+
+    cracker = SteghideCracker(workers=workers)
+    result = cracker.crack(
+        file_path,
+        wordlist=wordlist,
+        exif=MetadataScraper().scrape(file_path),
+        ocr_text=ocr_text,
+        resume=resume,
+        progress=print_progress if verbose else None,
+    )
+    if verbose:
+        print(file=sys.stderr)
+        cracker.display_result(result)
+    return result
+
+
+def _stream_single(fp: Path, args, timeouts: dict, writer: NDJSONWriter):
+    """Single-file run of terminal_mode with --format ndjson."""
+    path = str(fp)
+    run_metadata_chain(path, verbose=False, timeouts=timeouts, emit=writer)
+
+    if args.extract_binwalk:
+        extracted = BinwalkScraper().scrape(
+            path, extract=True, extract_dir=f"{fp.name}.extracted"
+        )
+        writer.write(stage_record(path, "binwalk_extract", raw=extracted))
+    if args.search_image:
+        result = ImageSearchIRIS(engines=args.engines, verbose=False).search_image(path)
+        writer.write(stage_record(path, "image_search", result=result))
+    if args.similar is not None:
+        matches = get_similarity_index().search_image(
+            path, max_distance=None if args.similar < 0 else args.similar
+        )
+        writer.write(stage_record(path, "similar", matches=matches))
+    if args.crack is not None:
+        cracked = run_steghide_crack(
+            path,
+            wordlist=args.crack or None,
+            workers=args.crack_workers,
+            use_ocr=args.crack_ocr,
+            resume=not args.no_resume,
+            verbose=False,
+        )
+        writer.write(stage_record(path, "crack", result=cracked))
 
 
 def terminal_mode():
@@ -112,8 +489,67 @@ def terminal_mode():
         description="Big Sister – Metadata & Reverse-Image CTF Tool"
     )
     ap.add_argument(
-        "file",
-        help="Path to the file/image to analyze",
+        "inputs",
+        nargs="*",
+        metavar="file",
+        help="File(s), directories or glob patterns to analyze",
+    )
+    ap.add_argument(
+        "--files-from",
+        metavar="LIST",
+        help="Read additional paths (one per line) from LIST, or '-' for stdin",
+    )
+    ap.add_argument(
+        "-r", "--recursive",
+        action="store_true",
+        help="Descend into sub-directories of directory inputs",
+    )
+    ap.add_argument(
+        "-j", "--workers",
+        type=int,
+        default=None,
+        help="Worker processes for batch mode (default: CPU count)",
+    )
+    ap.add_argument(
+        "-o", "--output",
+        metavar="JSON",
+        help="Write the combined metadata of every file to JSON (batch mode), "
+             "or the NDJSON stream with --format ndjson",
+    )
+    ap.add_argument(
+        "--format",
+        choices=["table", "ndjson"],
+        default="table",
+        help="table: human-readable report; ndjson: one JSON record per file "
+             "and stage, written as each stage completes",
+    )
+    ap.add_argument(
+        "--timeout",
+        action="append",
+        default=[],
+        metavar="TOOL=SECONDS",
+        help="Override a tool timeout, e.g. --timeout binwalk=300 (repeatable)",
+    )
+    ap.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Bypass the result cache and re-run every tool",
+    )
+    ap.add_argument(
+        "--cache-stats",
+        action="store_true",
+        help="Print result-cache hit/miss counters when done",
+    )
+    ap.add_argument(
+        "--trace",
+        metavar="FILE",
+        help="Record timing spans for every stage; write a Chrome trace to FILE "
+             "and print a per-stage summary when done",
+    )
+    ap.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="With --trace, also record tracemalloc peaks per span (slower)",
     )
     ap.add_argument(
         "--extract-binwalk",
@@ -125,15 +561,123 @@ def terminal_mode():
         action="store_true",
         help="Perform reverse-image search after metadata scraping",
     )
+    ap.add_argument(
+        "--engines",
+        type=lambda value: [name.strip() for name in value.split(",") if name.strip()],
+        default=None,
+        metavar="LIST",
+        help=f"Comma-separated engines for --search-image, searched concurrently "
+             f"(from: {', '.join(ENGINES)}; default $BIGSISTER_ENGINES or google)",
+    )
+    ap.add_argument(
+        "--index",
+        action="append",
+        default=[],
+        metavar="PATH",
+        help="Add the images under PATH (file, directory or glob) to the local "
+             "similarity index (repeatable; may be the only argument)",
+    )
+    ap.add_argument(
+        "--similar",
+        nargs="?",
+        type=int,
+        const=-1,
+        default=None,
+        metavar="DISTANCE",
+        help="Rank similar images from the local index (pHash Hamming distance, "
+             "default 10)",
+    )
+    ap.add_argument(
+        "--crack",
+        nargs="?",
+        const="",
+        default=None,
+        metavar="WORDLIST",
+        help="Crack the steghide passphrase (EXIF/filename candidates, then WORDLIST if given)",
+    )
+    ap.add_argument(
+        "--crack-workers",
+        type=int,
+        default=None,
+        help="Concurrent steghide processes for --crack (default: CPU count)",
+    )
+    ap.add_argument(
+        "--crack-ocr",
+        action="store_true",
+        help="Also mine OCR text from the image for --crack candidates",
+    )
+    ap.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="Start --crack from scratch instead of its last checkpoint",
+    )
     args = ap.parse_args()
 
-    fp = Path(args.file)
-    if not fp.is_file():
-        print(f"Error: '{args.file}' does not exist or is not a file.", file=sys.stderr)
-        sys.exit(1)
+    unknown = [name for name in args.engines or [] if name.lower() not in ENGINES]
+    if unknown:
+        ap.error(f"unknown --engines value(s): {', '.join(unknown)}")
+    if args.index:
+        build_similarity_index(args.index)
+        if not args.inputs and not args.files_from:
+            return
+    if not args.inputs and not args.files_from:
+        ap.error("no input files given")
+    timeouts = {}
+    for spec in args.timeout:
+        tool, _, seconds = spec.partition("=")
+        try:
+            timeouts[tool.strip()] = float(seconds)
+        except ValueError:
+            ap.error(f"invalid --timeout value: {spec!r} (expected TOOL=SECONDS)")
+    if args.no_cache:
+        set_cache_enabled(False)
+    if args.cache_stats:
+        atexit.register(_print_cache_stats, sys.stderr if args.format == "ndjson" else None)
+    if args.trace:
+        export_on_exit(args.trace, memory=args.trace_memory)
+
+    writer = None
+    if args.format == "ndjson":
+        stream = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+        if stream is not sys.stdout:
+            atexit.register(stream.close)
+        writer = NDJSONWriter(stream)
+
+    # A single plain file keeps the interactive, fully printed report
+    single = (
+        len(args.inputs) == 1
+        and not args.files_from
+        and Path(args.inputs[0]).is_file()
+    )
+    if not single:
+        files = collect_files(args.inputs, args.files_from, args.recursive)
+        if not files:
+            print("Error: no files matched the given inputs.", file=sys.stderr)
+            sys.exit(1)
+        if args.extract_binwalk or args.similar is not None or args.crack is not None:
+            print(
+                "Note: --extract-binwalk, --similar and --crack only apply to single-file runs.",
+                file=sys.stderr,
+            )
+        results = run_batch(files, workers=args.workers, timeouts=timeouts, writer=writer)
+        if args.search_image:
+            searches = run_batch_image_search(files, writer=writer, engines=args.engines)
+            for path, result in searches.items():
+                results.setdefault(path, {})["Image Search"] = result
+        if args.output and writer is None:
+            with open(args.output, "w", encoding="utf-8") as fh:
+                json.dump(results, fh, indent=2, default=str)
+            print(f"Results written to {args.output}")
+        return
+
+    fp = Path(args.inputs[0])
+
+    if writer is not None:
+        _stream_single(fp, args, timeouts, writer)
+        return
 
     # 1) Metadata scraping & parsing
-    run_metadata_chain(str(fp))
+    run_metadata_chain(str(fp), timeouts=timeouts)
 
     # 2) Optional binwalk extraction
     if args.extract_binwalk:
@@ -143,10 +687,32 @@ def terminal_mode():
 
     # 3) Optional reverse-image search
     if args.search_image:
-        run_image_search(str(fp))
+        run_image_search(str(fp), engines=args.engines)
+    if args.similar is not None:
+        run_similar_search(str(fp), max_distance=None if args.similar < 0 else args.similar)
+
+    # 4) Optional steghide passphrase cracking
+    if args.crack is not None:
+        print("\n[ Steghide Passphrase Cracking ]")
+        run_steghide_crack(
+            str(fp),
+            wordlist=args.crack or None,
+            workers=args.crack_workers,
+            use_ocr=args.crack_ocr,
+            resume=not args.no_resume,
+        )
 
 
 def main():
+    if os.environ.get("BIGSISTER_TRACE_FILE"):
+        export_on_exit(os.environ["BIGSISTER_TRACE_FILE"],
+                       memory=bool(os.environ.get("BIGSISTER_TRACE_MEMORY")))
+
+    # Arguments on the command line mean a scripted run: skip the menu
+    if len(sys.argv) > 1:
+        terminal_mode()
+        return
+
     print("=== Big Sister - Metadata and Image Analysis Tool ===")
     print("Choose your interface:")
     print("1. GUI (Graphical User Interface)")
@@ -3,29 +3,314 @@ exiftool_scraper.py
 
 Scrapes image metadata using the external ExifTool binary (preferred)
 and falls back to Pillow for basic info if ExifTool is unavailable.
+
+For batch work the scraper can keep long-lived `exiftool -stay_open`
+sessions (see ExifToolSession / ExifToolPool) instead of paying Perl
+startup for every file.
 """
 
 import subprocess
 import json
+import atexit
+import queue
+import select
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 
 from PIL import Image
 from PIL.ExifTags import TAGS
 
+from utils.cache import get_cache, tool_version
+from utils.config import tool_timeouts
+from utils.processes import run_tool
+from utils.tracing import span, traced
+
 import os
 from datetime import datetime
 
+
+class ExifToolSessionError(RuntimeError):
+    """Raised when a stay_open exiftool process dies or stops responding."""
+
+
+class ExifToolSession:
+    """
+    A single long-lived `exiftool -stay_open True -@ -` process.
+
+    Arguments are written to the process one per line followed by
+    `-execute<N>`; ExifTool answers with `{ready<N>}` on stdout, and the
+    matching `-echo4` marker tells us when stderr is complete too.
+    A session is not thread-safe on its own; ExifToolPool hands each
+    session to one thread at a time.
+    """
+
+    COMMON_ARGS = ["-j", "-n", "-charset", "filename=utf8"]
+
+    def __init__(self, exiftool_path: str = "exiftool", timeout: float = None):
+        """
+        Args:
+            exiftool_path (str): Path to the ExifTool executable.
+            timeout (float): Seconds to wait for one request before the
+                process is considered hung (POSIX only). Defaults to
+                config.json "tool_timeouts".
+        """
+        self.exiftool_path = exiftool_path
+        self.timeout = timeout if timeout is not None else tool_timeouts()["exiftool"]
+        self._proc = None
+        self._counter = 0
+
+    @property
+    def alive(self) -> bool:
+        return self._proc is not None and self._proc.poll() is None
+
+    def start(self):
+        """Launch the exiftool process (raises FileNotFoundError if missing)."""
+        with span("spawn.exiftool.stay_open", cat="subprocess"):
+            self._proc = subprocess.Popen(
+                [self.exiftool_path, "-stay_open", "True", "-@", "-",
+                 "-common_args", *self.COMMON_ARGS],
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+            )
+        self._counter = 0
+
+    def close(self, graceful: bool = True):
+        """
+        Ask exiftool to exit, killing it if it does not comply. graceful=False
+        kills it straight away (a hung or broken session will not answer).
+        """
+        proc, self._proc = self._proc, None
+        if proc is None:
+            return
+        try:
+            if graceful and proc.poll() is None:
+                proc.stdin.write(b"-stay_open\nFalse\n")
+                proc.stdin.flush()
+                proc.wait(timeout=5)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            pass
+        finally:
+            if proc.poll() is None:
+                proc.kill()
+                proc.wait()
+            for stream in (proc.stdin, proc.stdout, proc.stderr):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+
+    def restart(self):
+        self.close()
+        self.start()
+
+    def execute(self, args: list, timeout: float = None) -> tuple:
+        """
+        Run one exiftool request inside the session.
+
+        Args:
+            args (list): Per-request arguments (file names, extra options).
+            timeout (float): Overrides the session's timeout for this request.
+
+        Returns:
+            tuple: (stdout, stderr) as text.
+        """
+        if not self.alive:
+            self.start()
+        if any("\n" in str(a) for a in args):
+            raise ValueError("ExifTool arguments may not contain newlines")
+
+        self._counter += 1
+        marker = f"{{ready{self._counter}}}"
+        request = [str(a) for a in args] + ["-echo4", marker, f"-execute{self._counter}"]
+        try:
+            with span("exiftool.session.execute", cat="subprocess", args=len(args)):
+                self._proc.stdin.write(("\n".join(request) + "\n").encode("utf-8"))
+                self._proc.stdin.flush()
+                return self._read_response(marker, timeout or self.timeout)
+        except (OSError, ValueError) as e:
+            self.close(graceful=False)
+            raise ExifToolSessionError(f"ExifTool session failed: {e}") from e
+        except ExifToolSessionError:
+            self.close(graceful=False)
+            raise
+
+    def _read_response(self, marker: str, timeout: float) -> tuple:
+        """
+        Read stdout and stderr until both end with the ready marker.
+
+        Both pipes are drained as data arrives. Reading stdout to its end
+        first would let a long stderr (warnings for a batch of damaged
+        files) fill its pipe and block ExifTool before stdout is done.
+        """
+        sentinel = marker.encode()
+        out_fd, err_fd = self._proc.stdout.fileno(), self._proc.stderr.fileno()
+        if os.name == "nt":
+            # No select() on Windows pipes: drain stderr on a helper thread
+            drained = {}
+
+            def drain():
+                try:
+                    drained["stderr"] = self._read_until(err_fd, sentinel)
+                except ExifToolSessionError as e:
+                    drained["error"] = e
+
+            thread = threading.Thread(target=drain, daemon=True)
+            thread.start()
+            stdout = self._read_until(out_fd, sentinel)
+            thread.join()
+            if "error" in drained:
+                raise drained["error"]
+            return stdout, drained["stderr"]
+
+        buffers = {out_fd: bytearray(), err_fd: bytearray()}
+        pending = set(buffers)
+        while pending:
+            ready, _, _ = select.select(list(pending), [], [], timeout)
+            if not ready:
+                raise ExifToolSessionError(f"ExifTool did not respond within {timeout}s")
+            for fd in ready:
+                if self._read_chunk(fd, buffers[fd], sentinel):
+                    pending.discard(fd)
+        return tuple(self._strip(buffers[fd], sentinel) for fd in (out_fd, err_fd))
+
+    def _read_until(self, fd: int, sentinel: bytes) -> str:
+        """Read one pipe (blocking) until the ready marker terminates it."""
+        buf = bytearray()
+        while not self._read_chunk(fd, buf, sentinel):
+            pass
+        return self._strip(buf, sentinel)
+
+    @staticmethod
+    def _read_chunk(fd: int, buf: bytearray, sentinel: bytes) -> bool:
+        """Append one read to buf; True once it ends with the marker."""
+        chunk = os.read(fd, 65536)
+        if not chunk:
+            raise ExifToolSessionError("ExifTool process exited unexpectedly")
+        buf.extend(chunk)
+        # Only the tail can hold the marker (plus a trailing newline)
+        return bytes(buf[-(len(sentinel) + 16):]).rstrip().endswith(sentinel)
+
+    @staticmethod
+    def _strip(buf: bytearray, sentinel: bytes) -> str:
+        return bytes(buf.rstrip()[: -len(sentinel)]).decode("utf-8", errors="replace")
+
+
+class ExifToolPool:
+    """
+    Thread-safe pool of ExifToolSession objects.
+
+    Sessions are created lazily up to `size`; callers borrow one with
+    `with pool.session() as s:`. A session that dies mid-request is
+    restarted once before the error is surfaced.
+    """
+
+    _shared = {}
+    _shared_lock = threading.Lock()
+
+    def __init__(self, exiftool_path: str = "exiftool", size: int = 2):
+        self.exiftool_path = exiftool_path
+        self.size = max(1, size)
+        self._idle = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+        self._sessions = []
+        self._pid = os.getpid()
+
+    @classmethod
+    def shared(cls, exiftool_path: str = "exiftool", size: int = 2) -> "ExifToolPool":
+        """Return the process-wide pool for an ExifTool binary."""
+        with cls._shared_lock:
+            pool = cls._shared.get(exiftool_path)
+            # A forked child must not talk to its parent's exiftool processes
+            if pool is None or pool._pid != os.getpid():
+                pool = cls(exiftool_path, size)
+                cls._shared[exiftool_path] = pool
+            return pool
+
+    @classmethod
+    def close_shared(cls):
+        with cls._shared_lock:
+            pools, cls._shared = list(cls._shared.values()), {}
+        for pool in pools:
+            if pool._pid == os.getpid():
+                pool.close()
+
+    @contextmanager
+    def session(self):
+        sess = self._acquire()
+        try:
+            yield sess
+        finally:
+            self._idle.put(sess)
+
+    def _acquire(self) -> ExifToolSession:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._created < self.size:
+                self._created += 1
+                sess = ExifToolSession(self.exiftool_path)
+                self._sessions.append(sess)
+                return sess
+        return self._idle.get()
+
+    def execute(self, args: list, timeout: float = None) -> tuple:
+        """
+        Run a request on any free session, restarting it once on a crash.
+        timeout overrides the sessions' own (see ExifToolSession.execute).
+        """
+        with self.session() as sess:
+            try:
+                return sess.execute(args, timeout)
+            except ExifToolSessionError:
+                sess.restart()
+                return sess.execute(args, timeout)
+
+    def close(self):
+        with self._lock:
+            sessions, self._sessions = self._sessions, []
+            self._created = 0
+        for sess in sessions:
+            sess.close()
+        self._idle = queue.LifoQueue()
+
+
+atexit.register(ExifToolPool.close_shared)
+
+
 class MetadataScraper:
-    def __init__(self, exiftool_path: str = "exiftool"):
+    # Batch runs flip this so every scraper in the process shares sessions
+    default_persistent = False
+
+    def __init__(self, exiftool_path: str = "exiftool", persistent: bool = None,
+                 pool_size: int = 2, use_cache: bool = True, timeout: float = None):
         """
         Initialize the MetadataScraper.
 
         Args:
             exiftool_path (str): Path to the ExifTool executable.
+            persistent (bool): Use pooled `-stay_open` ExifTool sessions
+                instead of one process per file. Defaults to
+                MetadataScraper.default_persistent.
+            pool_size (int): Number of sessions in the shared pool.
+            use_cache (bool): Consult the shared result cache (see
+                utils.cache); False always re-runs ExifTool.
+            timeout (float): Seconds before a one-shot ExifTool run or a
+                pooled session request is abandoned (defaults to
+                config.json "tool_timeouts").
         """
         self.exiftool_path = exiftool_path
+        self.persistent = self.default_persistent if persistent is None else persistent
+        self.pool_size = pool_size
+        self.use_cache = use_cache
+        self.timeout = timeout if timeout is not None else tool_timeouts()["exiftool"]
 
-    def scrape(self, file_path: str) -> dict:
+    @traced("exiftool.scrape", cat="scraper")
+    def scrape(self, file_path: str, context=None) -> dict:
         """
         Scrape metadata from the given file path.
 
@@ -34,6 +319,9 @@ class MetadataScraper:
 
         Args:
             file_path (str): Path to the image file to analyze.
+            context (AnalysisContext): Optional per-file context; the
+                result is stored as its "exif" stage and reused by later
+                callers instead of running ExifTool again.
 
         Returns:
             dict: Dictionary containing all scraped metadata.
@@ -42,29 +330,160 @@ class MetadataScraper:
         if not file.exists():
             return {"Error": f"File not found: {file_path}"}
 
-        metadata = {}
-        # --- 1) Try ExifTool JSON ---
-        try:
-            # "-j" => JSON output, "-n" => numeric values where appropriate
-            result = subprocess.run(
-                [self.exiftool_path, "-j", "-n", str(file)],
-                capture_output=True,
-                check=True,
-                text=True,
+        if context is not None:
+            return context.get_or_compute(
+                "exif", lambda: self._scrape(file_path, context.sha256)
             )
-            # ExifTool returns a JSON array; we take the first element
-            data = json.loads(result.stdout)
-            if isinstance(data, list) and data:
-                metadata.update(data[0])
-            else:
-                metadata["Warning"] = "ExifTool returned no data"
-        except (subprocess.CalledProcessError, FileNotFoundError, json.JSONDecodeError) as e:
-            # Fallback to PIL if ExifTool not found or errors out
-            metadata["ExifTool Error"] = str(e)
-            metadata.update(self._pillow_fallback(file_path))
+        return self._scrape(file_path)
+
+    def _scrape(self, file_path: str, content_hash: str = None) -> dict:
+        file = Path(file_path)
+        if self.persistent:
+            hashes = {file_path: content_hash} if content_hash else None
+            return self.scrape_many([file_path], content_hashes=hashes)[file_path]
+        if not self.use_cache:
+            return self._scrape_uncached(file)
+
+        return get_cache().fetch(
+            file_path, "exiftool", self._version(), self._CACHE_OPTIONS,
+            lambda: self._scrape_uncached(file),
+            should_store=self._cacheable,
+            content_hash=content_hash,
+        )
+
+    # Options folded into the cache key; bump if the invocation changes
+    _CACHE_OPTIONS = {"args": ["-j", "-n"]}
 
+    def _version(self) -> str:
+        return tool_version(self.exiftool_path, "-ver")
+
+    @staticmethod
+    def _cacheable(metadata: dict) -> bool:
+        # Never pin a transient failure (crash, missing binary) in the cache
+        return "Error" not in metadata and "ExifTool Error" not in metadata
+
+    def _scrape_uncached(self, file: Path) -> dict:
+        """Run ExifTool once on the file, falling back to Pillow."""
+        cmd = self.build_command(file)
+        try:
+            with span("spawn.exiftool", cat="subprocess"):
+                result = run_tool("exiftool", cmd, timeout=self.timeout)
+        except FileNotFoundError as e:
+            return self.parse_result(file, None, error=str(e))
+        except subprocess.TimeoutExpired:
+            return self.parse_result(file, None, error=f"ExifTool timed out after {self.timeout}s")
+        if result.returncode != 0:
+            error = str(subprocess.CalledProcessError(result.returncode, cmd))
+            return self.parse_result(file, None, error=error)
+        return self.parse_result(file, result.stdout)
+
+    def build_command(self, file_path) -> list:
+        """Command line for a one-shot ExifTool run on file_path."""
+        # "-j" => JSON output, "-n" => numeric values where appropriate
+        return [self.exiftool_path, "-j", "-n", str(file_path)]
+
+    @traced("parse.exiftool_json", cat="parse")
+    def parse_result(self, file_path, stdout: str, error: str = None) -> dict:
+        """
+        Turn ExifTool's JSON output into the scrape() dict.
+
+        Args:
+            file_path: The scraped file (used by the Pillow fallback).
+            stdout (str): ExifTool's stdout, ignored when error is set.
+            error (str): Why ExifTool failed, if it did.
+
+        Returns:
+            dict: ExifTool metadata, or the error plus Pillow's metadata.
+        """
+        metadata = {}
+        if error is None:
+            try:
+                # ExifTool returns a JSON array; we take the first element
+                data = json.loads(stdout)
+                if isinstance(data, list) and data:
+                    metadata.update(data[0])
+                else:
+                    metadata["Warning"] = "ExifTool returned no data"
+            except json.JSONDecodeError as e:
+                error = str(e)
+        if error is not None:
+            # Fallback to PIL if ExifTool not found or errors out
+            metadata["ExifTool Error"] = error
+            metadata.update(self._pillow_fallback(str(file_path)))
         return metadata
 
+    @traced("exiftool.scrape_many", cat="scraper")
+    def scrape_many(self, file_paths: list, batch_size: int = 64,
+                    content_hashes: dict = None) -> dict:
+        """
+        Scrape several files through the pooled `-stay_open` sessions.
+
+        Files are sent to ExifTool in batches of batch_size per request.
+        Any file ExifTool could not handle (missing binary, crash, no
+        output) goes through the Pillow fallback exactly like scrape().
+
+        Args:
+            file_paths (list): Paths of the files to analyze.
+            batch_size (int): Maximum number of files per ExifTool request.
+            content_hashes (dict): Optional {file_path: sha256} for files
+                whose hash is already known (saves re-reading them).
+
+        Returns:
+            dict: {file_path: metadata dict}, in the order given.
+        """
+        results = {}
+        pending = []
+        keys = {}
+        content_hashes = content_hashes or {}
+        cache = get_cache()
+        use_cache = self.use_cache and cache.enabled
+        for path in file_paths:
+            if not Path(path).exists():
+                results[path] = {"Error": f"File not found: {path}"}
+                continue
+            if use_cache:
+                digest = content_hashes.get(path) or cache.file_hash(path)
+                keys[path] = cache.make_key(
+                    digest, "exiftool", self._version(), self._CACHE_OPTIONS
+                )
+                cached = cache.get(keys[path])
+                if cached is not None:
+                    results[path] = cached
+                    continue
+            pending.append(path)
+
+        pool = ExifToolPool.shared(self.exiftool_path, self.pool_size)
+        for start in range(0, len(pending), batch_size):
+            batch = pending[start:start + batch_size]
+            try:
+                stdout, stderr = pool.execute([str(Path(p)) for p in batch], self.timeout)
+                records = json.loads(stdout) if stdout.strip() else []
+                error = stderr.strip() or "ExifTool returned no data"
+            except (ExifToolSessionError, FileNotFoundError, ValueError) as e:
+                records, error = [], str(e)
+
+            # ExifTool echoes each path back as SourceFile (with "/" separators)
+            by_source = {
+                self._normalize_path(r.get("SourceFile", "")): r
+                for r in records if isinstance(r, dict)
+            }
+            for path in batch:
+                record = by_source.get(self._normalize_path(str(Path(path))))
+                if record is not None:
+                    results[path] = dict(record)
+                    if path in keys:
+                        cache.set(keys[path], results[path], "exiftool")
+                else:
+                    metadata = {"ExifTool Error": error}
+                    metadata.update(self._pillow_fallback(path))
+                    results[path] = metadata
+
+        return {path: results[path] for path in file_paths}
+
+    @staticmethod
+    def _normalize_path(path: str) -> str:
+        return os.path.normcase(os.path.normpath(path.replace("/", os.sep)))
+
     def _pillow_fallback(self, file_path: str) -> dict:
         """
         Fallback metadata extraction via Pillow.
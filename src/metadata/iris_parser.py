@@ -1,147 +1,271 @@
-    
+"""
+iris_parser.py
+
+Categorizes parsed EXIF metadata into search parameters for IRIS.
+
+What to look for is data rather than code: FIELD_RULES maps EXIF keys to
+a category, a field name, a keyword rule and a confidence weight, and
+KEYWORD_RULES derives photography-type keywords from the categorized
+values. Both tables are compiled once at import (keyword rules into
+handler functions, substring lists into precompiled regexes), so a
+record costs a fixed number of dict lookups and regex searches.
+categorize_many() runs the compiled rules over batches of records.
+
+Diagnostics go to the "metadata.iris_parser" logger at DEBUG level.
+"""
+
 import re
+import logging
+
+from metadata.parser import MetadataParser
+from utils.tracing import traced, span
+
+logger = logging.getLogger(__name__)
+
+CATEGORIES = ("device_info", "location_data", "temporal_data", "technical_specs")
+
+# (EXIF key, category, field, keyword rule, confidence weight), in the
+# order keywords are emitted. Keyword rules:
+#   "camera"      camera:<value>
+#   "location"    location:<value>
+#   "gps"         location:gps_tagged
+#   "year"        year:<YYYY>; weighted only when the value holds a year
+#   "iso"         low_light from ISO 1600; weighted only for a numeric ISO
+#   "flash"       flash_photography when the flash fired
+#   "resolution"  high_resolution from 4000 px
+#   None          the value is only stored
+FIELD_RULES = (
+    ("Make", "device_info", "camera_make", "camera", 0.2),
+    ("Model", "device_info", "camera_model", "camera", 0.2),
+    ("Software", "device_info", "software", "camera", 0.2),
+    ("CameraMake", "device_info", "camera_make", "camera", 0.2),
+    ("CameraModel", "device_info", "camera_model", "camera", 0.2),
+    ("CameraSoftware", "device_info", "software", "camera", 0.2),
+    ("LensMake", "device_info", "lens_make", "camera", 0.2),
+    ("LensModel", "device_info", "lens_model", "camera", 0.2),
+
+    ("GPSLatitude", "location_data", "latitude", "gps", 0.3),
+    ("GPSLongitude", "location_data", "longitude", "gps", 0.3),
+    ("GPSAltitude", "location_data", "altitude", "gps", 0.3),
+    ("Location", "location_data", "location_name", "location", 0.25),
+    ("City", "location_data", "city", "location", 0.25),
+    ("State", "location_data", "state", "location", 0.25),
+    ("Country", "location_data", "country", "location", 0.25),
+    ("GPSPosition", "location_data", "coordinates", "gps", 0.3),
+
+    ("DateTime", "temporal_data", "creation_date", "year", 0.15),
+    ("Date/Time Original", "temporal_data", "original_date", "year", 0.15),
+    ("CreateDate", "temporal_data", "create_date", "year", 0.15),
+    ("ModifyDate", "temporal_data", "modify_date", "year", 0.15),
+    ("DateTimeOriginal", "temporal_data", "datetime_original", "year", 0.15),
+
+    ("ISO", "technical_specs", "iso", "iso", 0.1),
+    ("Aperture", "technical_specs", "aperture", None, 0.0),
+    ("ShutterSpeed", "technical_specs", "shutter_speed", None, 0.0),
+    ("FocalLength", "technical_specs", "focal_length", None, 0.0),
+    ("Flash", "technical_specs", "flash_used", "flash", 0.1),
+    ("WhiteBalance", "technical_specs", "white_balance", None, 0.0),
+    ("ExposureMode", "technical_specs", "exposure_mode", None, 0.0),
+    ("ImageWidth", "technical_specs", "width", "resolution", 0.05),
+    ("ImageHeight", "technical_specs", "height", "resolution", 0.05),
+    ("Resolution", "technical_specs", "resolution", None, 0.0),
+    ("ColorSpace", "technical_specs", "color_space", None, 0.0),
+)
+
+# Derived keywords, in order. Every (category, field, substrings) condition
+# must find one of its substrings in the lower-cased value; "requires"
+# names a category that must not be empty.
+KEYWORD_RULES = (
+    {"keyword": "professional_photography",
+     "match": (("device_info", "camera_make", ("canon", "nikon", "sony", "fujifilm")),
+               ("device_info", "camera_model",
+                ("d850", "d750", "5d", "7r", "x-t", "coolpix")))},
+    {"keyword": "mobile_photography",
+     "match": (("device_info", "camera_make",
+                ("apple", "samsung", "google", "huawei", "iphone")),)},
+    {"keyword": "indoor_event",
+     "match": (("technical_specs", "flash_used", ("fired",)),),
+     "requires": "temporal_data"},
+    {"keyword": "landscape_photography",
+     "match": (("technical_specs", "focal_length", ("14mm", "16mm", "18mm", "20mm", "24mm")),)},
+    {"keyword": "portrait_photography",
+     "match": (("technical_specs", "focal_length", ("85mm", "105mm", "135mm")),)},
+)
+
+# The first dated field decides "vintage_photography"
+VINTAGE_BEFORE_YEAR = 2010
+
+# Keywords get_iris_search_terms() passes on as technical terms
+TECHNICAL_TERMS = frozenset(("low_light", "flash_photography", "high_resolution"))
+MAX_SEARCH_TERMS = 10
+
+_YEAR = re.compile(r"(\d{4})")
+
+
+# --- keyword rules: value -> (keyword or None, whether the weight counts) ---
+
+def _camera_keyword(value):
+    return f"camera:{value}", True
+
+
+def _location_keyword(value):
+    return f"location:{value}", True
+
+
+def _gps_keyword(value):
+    return "location:gps_tagged", True
+
+
+def _year_keyword(value):
+    match = _YEAR.search(str(value))
+    return (f"year:{match.group(1)}", True) if match else (None, False)
+
+
+def _iso_keyword(value):
+    text = str(value)
+    if not text.isdecimal():
+        return None, False
+    return ("low_light" if int(text) >= 1600 else None), True
+
+
+def _flash_keyword(value):
+    return ("flash_photography" if "fired" in str(value).lower() else None), True
+
+
+def _resolution_keyword(value):
+    text = str(value)
+    return ("high_resolution" if text.isdecimal() and int(text) >= 4000 else None), True
+
+
+_KEYWORD_HANDLERS = {
+    "camera": _camera_keyword,
+    "location": _location_keyword,
+    "gps": _gps_keyword,
+    "year": _year_keyword,
+    "iso": _iso_keyword,
+    "flash": _flash_keyword,
+    "resolution": _resolution_keyword,
+}
+
+
+def _compile_rules():
+    fields = tuple(
+        (key, category, field, _KEYWORD_HANDLERS[rule] if rule else None, weight)
+        for key, category, field, rule, weight in FIELD_RULES
+    )
+    keywords = tuple(
+        (
+            rule["keyword"],
+            tuple((category, field, re.compile("|".join(map(re.escape, needles))))
+                  for category, field, needles in rule["match"]),
+            rule.get("requires"),
+        )
+        for rule in KEYWORD_RULES
+    )
+    return fields, keywords
+
+
+_FIELDS, _KEYWORDS = _compile_rules()
+
 
 class IrisParser:
+    def __init__(self):
+        self._parser = MetadataParser()
+
     def _add_derived_search_terms(self, categories):
         """Add derived search terms based on categorized data"""
-        print(f"DEBUG: Adding derived search terms for categories: {list(categories.keys())}")
-        
-        # Professional vs Amateur detection
-        device_info = categories['device_info']
-        technical_specs = categories['technical_specs']
-        
-        print(f"DEBUG: Device info: {device_info}")
-        print(f"DEBUG: Technical specs: {technical_specs}")
-        
-        # Professional camera indicators
-        camera_make = str(device_info.get('camera_make', '')).lower()
-        camera_model = str(device_info.get('camera_model', '')).lower()
-        
-        if any(brand in camera_make for brand in ['canon', 'nikon', 'sony', 'fujifilm']):
-            print(f"DEBUG: Professional camera brand detected: {camera_make}")
-            if any(model_indicator in camera_model 
-                   for model_indicator in ['d850', 'd750', '5d', '7r', 'x-t', 'coolpix']):
-                categories['search_keywords'].append("professional_photography")
-                print("DEBUG: Added professional_photography keyword")
-        
-        # Mobile photography detection
-        if any(mobile_brand in camera_make 
-               for mobile_brand in ['apple', 'samsung', 'google', 'huawei', 'iphone']):
-            categories['search_keywords'].append("mobile_photography")
-            print("DEBUG: Added mobile_photography keyword")
-        
-        # Event type detection based on technical specs
-        flash_info = str(technical_specs.get('flash_used', '')).lower()
-        if flash_info and 'fired' in flash_info:
-            if categories['temporal_data']:
-                categories['search_keywords'].append("indoor_event")
-                print("DEBUG: Added indoor_event keyword")
-        
-        # Landscape photography indicators
-        focal_length = str(technical_specs.get('focal_length', '')).lower()
-        if focal_length and any(wide_focal in focal_length 
-                               for wide_focal in ['14mm', '16mm', '18mm', '20mm', '24mm']):
-            categories['search_keywords'].append("landscape_photography")
-            print("DEBUG: Added landscape_photography keyword")
-        
-        # Portrait photography indicators
-        if focal_length and any(portrait_focal in focal_length 
-                               for portrait_focal in ['85mm', '105mm', '135mm']):
-            categories['search_keywords'].append("portrait_photography")
-            print("DEBUG: Added portrait_photography keyword")
-        
-        # Vintage photography detection
-        if categories['temporal_data']:
-            for date_key, date_value in categories['temporal_data'].items():
-                year_match = re.search(r'(\d{4})', str(date_value))
-                if year_match:
-                    year = int(year_match.group(1))
-                    if year < 2010:
-                        categories['search_keywords'].append("vintage_photography")
-                        print(f"DEBUG: Added vintage_photography keyword for year {year}")
-                    break
-        
-        print(f"DEBUG: Final search keywords: {categories['search_keywords']}")
+        keywords = categories['search_keywords']
+        for keyword, conditions, requires in _KEYWORDS:
+            if requires and not categories[requires]:
+                continue
+            if all(pattern.search(str(categories[category].get(field, '')).lower())
+                   for category, field, pattern in conditions):
+                keywords.append(keyword)
+
+        # Vintage photography: decided by the first field holding a year
+        for date_value in categories['temporal_data'].values():
+            match = _YEAR.search(str(date_value))
+            if match:
+                if int(match.group(1)) < VINTAGE_BEFORE_YEAR:
+                    keywords.append("vintage_photography")
+                break
 
+    @traced("iris.search_terms", cat="iris")
     def get_iris_search_terms(self, categorized_data):
         """
         Extract the most relevant search terms for IRIS from categorized data.
-        
+
         Args:
             categorized_data (dict): Output from categorize_exif_for_iris()
-            
+
         Returns:
             list: Prioritized search terms for reverse image search
         """
-        print(f"DEBUG: Extracting IRIS search terms from: {type(categorized_data)}")
-        
         if not isinstance(categorized_data, dict):
-            print("DEBUG: Input is not a dict, returning empty list")
+            logger.debug("Search terms requested for a %s, not a dict",
+                         type(categorized_data).__name__)
             return []
-        
+
+        keywords = categorized_data['search_keywords']
         search_terms = []
-        
-        # Prioritize terms based on confidence and relevance
+        # Location data is highly valuable for image search
         if categorized_data.get('location_data'):
-            print(f"DEBUG: Found location data: {categorized_data['location_data']}")
-            # Location data is highly valuable for image search
-            for term in categorized_data['search_keywords']:
-                if term.startswith('location:'):
-                    search_terms.append(term)
-                    print(f"DEBUG: Added location term: {term}")
-        
-        # Device information
-        for term in categorized_data['search_keywords']:
-            if term.startswith('camera:'):
-                search_terms.append(term)
-                print(f"DEBUG: Added camera term: {term}")
-        
-        # Photography type
-        photo_types = [term for term in categorized_data['search_keywords'] 
-                      if 'photography' in term]
-        search_terms.extend(photo_types)
-        print(f"DEBUG: Added photography types: {photo_types}")
-        
-        # Year-based terms
-        year_terms = [term for term in categorized_data['search_keywords'] 
-                     if term.startswith('year:')]
-        search_terms.extend(year_terms)
-        print(f"DEBUG: Added year terms: {year_terms}")
-        
-        # Technical terms
-        tech_terms = [term for term in categorized_data['search_keywords'] 
-                     if term in ['low_light', 'flash_photography', 'high_resolution']]
-        search_terms.extend(tech_terms)
-        print(f"DEBUG: Added technical terms: {tech_terms}")
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_terms = []
-        for term in search_terms:
-            if term not in seen:
-                seen.add(term)
-                unique_terms.append(term)
-        
-        final_terms = unique_terms[:10]  # Limit to top 10 most relevant terms
-        print(f"DEBUG: Final IRIS search terms: {final_terms}")
+            search_terms.extend(t for t in keywords if t.startswith('location:'))
+        search_terms.extend(t for t in keywords if t.startswith('camera:'))
+        search_terms.extend(t for t in keywords if 'photography' in t)
+        search_terms.extend(t for t in keywords if t.startswith('year:'))
+        search_terms.extend(t for t in keywords if t in TECHNICAL_TERMS)
+
+        # Remove duplicates while preserving order, keep the most relevant
+        final_terms = list(dict.fromkeys(search_terms))[:MAX_SEARCH_TERMS]
+        logger.debug("IRIS search terms: %s", final_terms)
         return final_terms
 
+    @traced("iris.categorize_exif", cat="iris")
     def categorize_exif_for_iris(self, exif_data):
         """
         Categorize EXIF metadata into useful search parameters for IRIS.
-        
+
         Takes parsed EXIF data and organizes it into categories that can
         enhance reverse image search queries.
-        
+
         Args:
-            exif_data (dict): Parsed EXIF metadata from parse_exif()
-            
+            exif_data (dict): Parsed EXIF metadata from parse_exif(), or
+                raw "Key: Value" text, which is parsed first
+
         Returns:
             dict: Categorized metadata for search enhancement
         """
-        print(f"DEBUG: Starting categorize_exif_for_iris with data type: {type(exif_data)}")
-        print(f"DEBUG: Input data keys: {list(exif_data.keys()) if isinstance(exif_data, dict) else 'Not a dict'}")
-        
+        categories = self._categorize(exif_data)
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "IRIS categories: device=%s location=%s temporal=%s technical=%s "
+                "keywords=%s confidence=%.2f",
+                categories['device_info'], categories['location_data'],
+                categories['temporal_data'], categories['technical_specs'],
+                categories['search_keywords'], categories['confidence_score'],
+            )
+        return categories
+
+    def categorize_many(self, records):
+        """
+        Categorize a batch of EXIF records (see categorize_exif_for_iris).
+
+        One trace span covers the whole batch and nothing is logged per
+        record, so thousands of records cost only the rule evaluation.
+
+        Args:
+            records (iterable): Parsed EXIF dicts or raw "Key: Value" texts.
+
+        Returns:
+            list: One categories dict per record, in order.
+        """
+        with span("iris.categorize_many", cat="iris"):
+            results = [self._categorize(record) for record in records]
+        logger.debug("Categorized %d EXIF records for IRIS", len(results))
+        return results
+
+    def _categorize(self, exif_data):
         categories = {
             'device_info': {},
             'location_data': {},
@@ -150,145 +274,28 @@ class IrisParser:
             'search_keywords': [],
             'confidence_score': 0.0
         }
-        
-        # If input is not a dict, try to parse it first
+        # If input is not a dict, parse it first
         if not isinstance(exif_data, dict):
-            print("DEBUG: Input is not a dict, parsing first...")
-            exif_data = self.parse_exif(exif_data)
-            print(f"DEBUG: Parsed data keys: {list(exif_data.keys())}")
-        
+            exif_data = self._parser.parse_exif(exif_data)
+
+        keywords = categories['search_keywords']
         confidence_factors = []
-        
-        # Device Information
-        device_fields = [
-            ('Make', 'camera_make'),
-            ('Model', 'camera_model'),
-            ('Software', 'software'),
-            ('CameraMake', 'camera_make'),
-            ('CameraModel', 'camera_model'),
-            ('CameraSoftware', 'software'),
-            ('LensMake', 'lens_make'),
-            ('LensModel', 'lens_model')
-        ]
-        
-        print("DEBUG: Processing device fields...")
-        for exif_key, cat_key in device_fields:
-            if exif_key in exif_data:
-                value = exif_data[exif_key]
-                categories['device_info'][cat_key] = value
-                categories['search_keywords'].append(f"camera:{value}")
-                confidence_factors.append(0.2)
-                print(f"DEBUG: Found device field {exif_key}: {value}")
-        
-        # Location Data
-        location_fields = [
-            ('GPSLatitude', 'latitude'),
-            ('GPSLongitude', 'longitude'),
-            ('GPSAltitude', 'altitude'),
-            ('Location', 'location_name'),
-            ('City', 'city'),
-            ('State', 'state'),
-            ('Country', 'country'),
-            ('GPSPosition', 'coordinates')
-        ]
-        
-        print("DEBUG: Processing location fields...")
-        for exif_key, cat_key in location_fields:
-            if exif_key in exif_data:
-                value = exif_data[exif_key]
-                categories['location_data'][cat_key] = value
-                if 'GPS' in exif_key:
-                    categories['search_keywords'].append("location:gps_tagged")
-                    confidence_factors.append(0.3)
-                    print(f"DEBUG: Found GPS field {exif_key}: {value}")
-                else:
-                    categories['search_keywords'].append(f"location:{value}")
-                    confidence_factors.append(0.25)
-                    print(f"DEBUG: Found location field {exif_key}: {value}")
-        
-        # Temporal Data
-        temporal_fields = [
-            ('DateTime', 'creation_date'),
-            ('Date/Time Original', 'original_date'),
-            ('CreateDate', 'create_date'),
-            ('ModifyDate', 'modify_date'),
-            ('DateTimeOriginal', 'datetime_original')
-        ]
-        
-        print("DEBUG: Processing temporal fields...")
-        for exif_key, cat_key in temporal_fields:
-            if exif_key in exif_data:
-                date_value = exif_data[exif_key]
-                categories['temporal_data'][cat_key] = date_value
-                print(f"DEBUG: Found temporal field {exif_key}: {date_value}")
-                
-                # Extract year for search keywords
-                year_match = re.search(r'(\d{4})', str(date_value))
-                if year_match:
-                    year = year_match.group(1)
-                    categories['search_keywords'].append(f"year:{year}")
-                    confidence_factors.append(0.15)
-                    print(f"DEBUG: Extracted year: {year}")
-        
-        # Technical Specifications
-        technical_fields = [
-            ('ISO', 'iso'),
-            ('Aperture', 'aperture'),
-            ('ShutterSpeed', 'shutter_speed'),
-            ('FocalLength', 'focal_length'),
-            ('Flash', 'flash_used'),
-            ('WhiteBalance', 'white_balance'),
-            ('ExposureMode', 'exposure_mode'),
-            ('ImageWidth', 'width'),
-            ('ImageHeight', 'height'),
-            ('Resolution', 'resolution'),
-            ('ColorSpace', 'color_space')
-        ]
-        
-        print("DEBUG: Processing technical fields...")
-        for exif_key, cat_key in technical_fields:
-            if exif_key in exif_data:
-                value = exif_data[exif_key]
-                categories['technical_specs'][cat_key] = value
-                print(f"DEBUG: Found technical field {exif_key}: {value}")
-                
-                # Add specific technical keywords
-                if cat_key == 'iso':
-                    iso_str = str(value)
-                    if iso_str.isdigit():
-                        iso_val = int(iso_str.split()[0])  # Handle "ISO 800" format
-                        if iso_val >= 1600:
-                            categories['search_keywords'].append("low_light")
-                            print(f"DEBUG: High ISO detected ({iso_val}), added low_light keyword")
-                        confidence_factors.append(0.1)
-                
-                elif cat_key == 'flash_used':
-                    if 'fired' in str(value).lower():
-                        categories['search_keywords'].append("flash_photography")
-                        print(f"DEBUG: Flash fired detected, added flash_photography keyword")
-                    confidence_factors.append(0.1)
-                
-                elif cat_key in ['width', 'height']:
-                    if str(value).isdigit() and int(value) >= 4000:
-                        categories['search_keywords'].append("high_resolution")
-                        print(f"DEBUG: High resolution detected ({value}), added high_resolution keyword")
-                    confidence_factors.append(0.05)
-        
+        for key, category, field, keyword_rule, weight in _FIELDS:
+            if key not in exif_data:
+                continue
+            value = exif_data[key]
+            categories[category][field] = value
+            if keyword_rule is None:
+                continue
+            keyword, weighted = keyword_rule(value)
+            if keyword:
+                keywords.append(keyword)
+            if weighted:
+                confidence_factors.append(weight)
+
         # Calculate confidence score (0.0 to 1.0)
         if confidence_factors:
             categories['confidence_score'] = min(sum(confidence_factors), 1.0)
-            print(f"DEBUG: Calculated confidence score: {categories['confidence_score']} from {len(confidence_factors)} factors")
-        
-        # Add derived search terms
-        print("DEBUG: Adding derived search terms...")
+
         self._add_derived_search_terms(categories)
-        
-        print(f"DEBUG: Final categorized data:")
-        print(f"  - Device info: {categories['device_info']}")
-        print(f"  - Location data: {categories['location_data']}")
-        print(f"  - Temporal data: {categories['temporal_data']}")
-        print(f"  - Technical specs: {categories['technical_specs']}")
-        print(f"  - Search keywords: {categories['search_keywords']}")
-        print(f"  - Confidence score: {categories['confidence_score']}")
-        
-        return categories
\ No newline at end of file
+        return categories
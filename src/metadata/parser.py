@@ -6,6 +6,8 @@ Unified metadata parser for EXIF, Zsteg, Steghide, and Binwalk outputs.
 
 import re
 
+from utils.tracing import traced
+
 
 class MetadataParser:
     """
@@ -33,6 +35,7 @@ a consistent Python dictionary schema.
     
 
 
+    @traced("parse.exif", cat="parse")
     def parse_exif(self, exif_output):
         """
         Parse EXIF metadata.
@@ -58,6 +61,7 @@ a consistent Python dictionary schema.
     
 
 
+    @traced("parse.zsteg", cat="parse")
     def parse_zsteg(self, zsteg_output):
         """
         Parse Zsteg output (raw text or dict).
@@ -76,6 +80,7 @@ a consistent Python dictionary schema.
     
 
 
+    @traced("parse.steghide", cat="parse")
     def parse_steghide(self, steghide_output):
         """
         Parse Steghide "info" output (raw text or dict).
@@ -94,6 +99,7 @@ a consistent Python dictionary schema.
 
 
 
+    @traced("parse.binwalk", cat="parse")
     def parse_binwalk(self, binwalk_output):
         """
         Parse Binwalk scan or extract output.
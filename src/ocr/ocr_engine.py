@@ -1,11 +1,25 @@
 import pytesseract
-from pytesseract import Output
 from PIL import Image, ImageEnhance, ImageFilter, UnidentifiedImageError
 import os
 import cv2
 import numpy as np
 import time
+import shlex
 import logging
+import itertools
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from utils.cache import get_cache, tool_version
+from utils.config import tool_timeouts
+from utils.processes import (run_tool, raise_if_cancelled, cancel_scope, install_slots,
+                             shared_slots, ToolCancelled)
+from utils.tracing import span, traced
+
+# Seconds between checks of the caller's cancel_scope() while OCR runs elsewhere
+_CANCEL_POLL = 0.1
 
 # Set log file path inside src/ocr directory
 log_file_path = os.path.join(os.path.dirname(__file__), "ocr_engine.log")
@@ -20,18 +34,510 @@ logging.basicConfig(
     ]
 )
 
+def _gray(image):
+    """Decoded BGR/BGRA/grayscale image (any depth) as 2-D uint8."""
+    if image is None:
+        raise ValueError("Image could not be decoded")
+    if image.ndim == 3:
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        gray = cv2.cvtColor(image, code)
+    else:
+        gray = image
+    if gray.dtype != np.uint8:
+        gray = cv2.normalize(gray, None, 0, 255, cv2.NORM_MINMAX).astype(np.uint8)
+    return gray
+
+
+def pil_to_cv(img):
+    """
+    A PIL image as an OpenCV-layout array: grayscale stays 2-D, colour
+    becomes BGR (BGRA with alpha). Other modes are converted to RGB first.
+    """
+    if img.mode not in ("L", "RGB", "RGBA"):
+        img = img.convert("RGBA" if "A" in img.getbands() else "RGB")
+    arr = np.asarray(img)
+    if arr.ndim == 2:
+        return arr
+    return cv2.cvtColor(arr, cv2.COLOR_RGBA2BGRA if arr.shape[2] == 4 else cv2.COLOR_RGB2BGR)
+
+
+def binarize(image):
+    """
+    preprocess_image()'s steps on a decoded image: grayscale, 3x3
+    Gaussian blur, Otsu threshold.
+
+    Args:
+        image (np.ndarray): BGR, BGRA or grayscale image.
+
+    Returns:
+        np.ndarray: uint8 image holding only 0 and 255.
+    """
+    blur = cv2.GaussianBlur(_gray(image), (3, 3), 0)
+    _, thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    return thresh
+
+
+def run_tesseract(gray, lang="eng", config="--psm 3", tsv=False, timeout=None) -> str:
+    """
+    OCR a grayscale image by piping it to tesseract as a binary PGM.
+
+    Args:
+        gray (np.ndarray): 2-D uint8 image.
+        lang (str): Language(s) to use.
+        config (str): Extra tesseract arguments.
+        tsv (bool): Ask for tesseract's TSV word table instead of text.
+        timeout (float): Seconds before the run is abandoned.
+
+    Returns:
+        str: tesseract's stdout.
+
+    Raises:
+        RuntimeError: If tesseract exits with an error.
+        subprocess.TimeoutExpired: If the run took longer than timeout.
+        ToolCancelled: If the enclosing cancel_scope() was cancelled.
+    """
+    result = run_tool("tesseract", _tesseract_command(lang, config, tsv), input=_pgm(gray),
+                      timeout=timeout, text=False)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.decode("utf-8", errors="replace").strip()
+                           or f"tesseract exited with status {result.returncode}")
+    return result.stdout.decode("utf-8", errors="replace")
+
+
+def _pgm(gray) -> bytes:
+    gray = np.ascontiguousarray(gray)
+    height, width = gray.shape
+    return b"P5\n%d %d\n255\n" % (width, height) + gray.tobytes()
+
+
+def _tesseract_command(lang, config, tsv=False) -> list:
+    cmd = [pytesseract.pytesseract.tesseract_cmd, "stdin", "stdout", "-l", lang]
+    cmd += shlex.split(config, posix=os.name != "nt")
+    if tsv:
+        cmd.append("tsv")
+    return cmd
+
+
+def parse_tsv(tsv: str) -> dict:
+    """
+    Tesseract TSV output as pytesseract's Output.DICT: one list per
+    column, numbers converted (conf as float).
+    """
+    lines = tsv.splitlines()
+    if not lines:
+        return {}
+    header = lines[0].split("\t")
+    data = {column: [] for column in header}
+    for line in lines[1:]:
+        values = line.split("\t")
+        values += [""] * (len(header) - len(values))
+        for column, value in zip(header, values):
+            if column == "text":
+                data[column].append(value)
+            elif column == "conf":
+                data[column].append(float(value) if value else -1.0)
+            else:
+                data[column].append(int(value) if value.lstrip("-").isdigit() else value)
+    return data
+
+
+def _channel(index):
+    def pick(image):
+        return binarize(image[:, :, index] if image.ndim == 3 else image)
+    return pick
+
+
+def _adaptive(image):
+    return cv2.adaptiveThreshold(cv2.GaussianBlur(_gray(image), (3, 3), 0), 255,
+                                 cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10)
+
+
+# extract_text_sweep() preprocessing variants: decoded BGR/gray image ->
+# 2-D uint8 image for tesseract.
+PREPROCESS_VARIANTS = {
+    "otsu": binarize,
+    "inverted": lambda image: 255 - binarize(image),
+    "adaptive": _adaptive,
+    "upscale": lambda image: binarize(
+        cv2.resize(image, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)),
+    "red": _channel(2),
+    "green": _channel(1),
+    "blue": _channel(0),
+}
+_CHANNEL_VARIANTS = {"red", "green", "blue"}
+
+
+def score_words(data: dict) -> float:
+    """Mean confidence (0-100) of the recognised words in TSV data; 0 if none."""
+    confs = [conf for word, conf in zip(data.get("text", []), data.get("conf", []))
+             if conf >= 0 and word.strip()]
+    return round(sum(confs) / len(confs), 2) if confs else 0.0
+
+
+def tsv_text(data: dict) -> str:
+    """Text of TSV data, one output line per tesseract line."""
+    lines = {}
+    for i, word in enumerate(data.get("text", [])):
+        if word.strip() and data["conf"][i] >= 0:
+            key = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            lines.setdefault(key, []).append(word)
+    return "\n".join(" ".join(words) for _, words in sorted(lines.items()))
+
+
+_ocr_stop = None
+
+
+def _init_ocr_worker(tesseract_cmd, slots=None, stop=None):
+    """
+    extract_text_batch() pool initializer. slots are the parent's tool
+    slots; setting stop kills the tesseract runs in progress.
+    """
+    global _ocr_stop
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    if slots:
+        install_slots(slots)
+    _ocr_stop = stop
+
+
+def _ocr_task(image, lang, config, return_data):
+    """OCR one path or decoded image inside a batch worker."""
+    if _ocr_stop is None:
+        return _ocr_one(image, lang, config, return_data)
+    with cancel_scope(_ocr_stop):
+        return _ocr_one(image, lang, config, return_data)
+
+
+def _ocr_one(image, lang, config, return_data):
+    start_time = time.time()
+    try:
+        if not isinstance(image, np.ndarray):
+            image = cv2.imread(image)
+            if image is None:
+                return {"success": False, "text": "", "error": "Invalid or corrupted image format."}
+        processed = binarize(image)
+        timeout = tool_timeouts().get("tesseract")
+        if return_data:
+            ocr_data = parse_tsv(run_tesseract(processed, lang, config, tsv=True, timeout=timeout))
+            text = "\n".join(
+                word for word, conf in zip(ocr_data.get("text", []), ocr_data.get("conf", []))
+                if conf > 60 and word.strip()
+            )
+            return {"success": True, "text": text.strip(), "data": ocr_data,
+                    "time": round(time.time() - start_time, 2)}
+        text = run_tesseract(processed, lang, config, timeout=timeout)
+        return {"success": True, "text": text.strip(), "time": round(time.time() - start_time, 2)}
+    except subprocess.TimeoutExpired:
+        return {"success": False, "text": "", "error": "tesseract timed out"}
+    except Exception as e:
+        return {"success": False, "text": "", "error": str(e)}
+
+
+def tile_grid(width, height, tile_size, overlap):
+    """
+    Overlapping tiles covering a width x height image.
+
+    Each tile also gets a "core": the part of the image it owns. Cores
+    split every overlap down the middle, so they partition the image and
+    each point belongs to exactly one tile.
+
+    Returns:
+        list: [{"x", "y", "w", "h", "core": (x0, y0, x1, y1)}, ...]
+    """
+    def starts(length):
+        if length <= tile_size:
+            return [0]
+        step = tile_size - overlap
+        positions = list(range(0, length - tile_size + 1, step))
+        if positions[-1] + tile_size < length:
+            positions.append(length - tile_size)
+        return positions
+
+    def cores(positions, length):
+        size = min(tile_size, length)
+        bounds = [0]
+        for a, b in zip(positions, positions[1:]):
+            bounds.append((b + a + size) / 2)     # middle of the overlap
+        bounds.append(length)
+        return list(zip(bounds, bounds[1:]))
+
+    xs, ys = starts(width), starts(height)
+    x_cores, y_cores = cores(xs, width), cores(ys, height)
+    return [
+        {"x": x, "y": y, "w": min(tile_size, width), "h": min(tile_size, height),
+         "core": (cx[0], cy[0], cx[1], cy[1])}
+        for y, cy in zip(ys, y_cores)
+        for x, cx in zip(xs, x_cores)
+    ]
+
+
+def _tile_words(data, tile):
+    """Words of one tile's TSV data in page coordinates, if the tile owns them."""
+    x0, y0, x1, y1 = tile["core"]
+    words = []
+    for i, text in enumerate(data.get("text", [])):
+        conf = data["conf"][i]
+        if not text.strip() or conf < 0:
+            continue
+        left = data["left"][i] + tile["x"]
+        top = data["top"][i] + tile["y"]
+        width, height = data["width"][i], data["height"][i]
+        cx, cy = left + width / 2, top + height / 2
+        if x0 <= cx < x1 and y0 <= cy < y1:
+            words.append({"left": left, "top": top, "width": width, "height": height,
+                          "conf": conf, "text": text})
+    return words
+
+
+def _dedupe_words(words):
+    """Drop repeated words whose boxes mostly coincide (split-centre edge cases)."""
+    kept = []
+    by_text = {}
+    for w in sorted(words, key=lambda w: -w["conf"]):
+        duplicate = False
+        for k in by_text.get(w["text"], []):
+            ix = min(w["left"] + w["width"], k["left"] + k["width"]) - max(w["left"], k["left"])
+            iy = min(w["top"] + w["height"], k["top"] + k["height"]) - max(w["top"], k["top"])
+            if ix > 0 and iy > 0 and ix * iy > 0.5 * min(w["width"] * w["height"],
+                                                         k["width"] * k["height"]):
+                duplicate = True
+                break
+        if not duplicate:
+            kept.append(w)
+            by_text.setdefault(w["text"], []).append(w)
+    return kept
+
+
+def _group_lines(words):
+    """Group words into reading-order lines by vertical centre."""
+    lines = []
+    for w in sorted(words, key=lambda w: w["top"] + w["height"] / 2):
+        cy = w["top"] + w["height"] / 2
+        if lines:
+            line = lines[-1]
+            ref = line[-1]
+            if abs(cy - (ref["top"] + ref["height"] / 2)) <= max(ref["height"], w["height"]) / 2:
+                line.append(w)
+                continue
+        lines.append([w])
+    return [sorted(line, key=lambda w: w["left"]) for line in lines]
+
+
+def _merge_boxes(boxes):
+    """Union overlapping (x0, y0, x1, y1) boxes until none overlap."""
+    boxes = [list(b) for b in boxes]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for box in sorted(boxes):
+            for other in out:
+                if (box[0] <= other[2] and other[0] <= box[2]
+                        and box[1] <= other[3] and other[1] <= box[3]):
+                    other[0], other[1] = min(other[0], box[0]), min(other[1], box[1])
+                    other[2], other[3] = max(other[2], box[2]), max(other[3], box[3])
+                    merged = True
+                    break
+            else:
+                out.append(box)
+        boxes = out
+    return boxes
+
+
+def _join_lines(boxes, gap):
+    """
+    Union (x0, y0, x1, y1) boxes that sit on the same line (vertical
+    overlap of at least half the shorter box) and are at most gap times
+    the taller box's height apart, until no more join.
+    """
+    boxes = [list(b) for b in boxes]
+    merged = True
+    while merged:
+        merged = False
+        out = []
+        for box in sorted(boxes):
+            for other in out:
+                h0, h1 = box[3] - box[1], other[3] - other[1]
+                overlap = min(box[3], other[3]) - max(box[1], other[1])
+                distance = max(box[0], other[0]) - min(box[2], other[2])
+                if overlap >= 0.5 * min(h0, h1) and distance <= gap * max(h0, h1):
+                    other[0], other[1] = min(other[0], box[0]), min(other[1], box[1])
+                    other[2], other[3] = max(other[2], box[2]), max(other[3], box[3])
+                    merged = True
+                    break
+            else:
+                out.append(box)
+        boxes = out
+    return boxes
+
+
+def detect_text_regions(image, min_height=8, pad=6, max_side=2000, line_gap=1.5):
+    """
+    Propose boxes likely to contain text.
+
+    Character candidates come from two sources: MSER blobs whose outline
+    also shows up in a morphological gradient, and connected components
+    of the gradient itself (MSER misses glyphs on flat backgrounds, and
+    the outlines of small, tightly set text run together into one
+    component). The gradient threshold sits well above the background's
+    own texture, so smooth shading and sensor noise do not count. Each
+    candidate is widened by half its own height so the letters of a word
+    join, and boxes on the same line no more than line_gap heights apart
+    are merged into one, so a caption comes back as a single region
+    rather than word fragments. Detection runs on a copy scaled to at
+    most max_side pixels, so it stays cheap on very large images.
+
+    Args:
+        image (np.ndarray): BGR or grayscale image.
+        min_height (int): Smallest line height, in full-size pixels
+            (single lowercase letters may be about half of it).
+        pad (int): Margin added around every box, in full-size pixels.
+        max_side (int): Longest side of the detection copy.
+        line_gap (float): Largest gap between boxes on one line, in line
+            heights, that still joins them.
+
+    Returns:
+        list: (x, y, w, h) boxes in image coordinates, in reading order.
+    """
+    gray = _gray(image)
+    height, width = gray.shape
+    scale = min(1.0, max_side / max(height, width))
+    small = gray if scale == 1.0 else cv2.resize(gray, None, fx=scale, fy=scale,
+                                                 interpolation=cv2.INTER_AREA)
+    min_h = max(3, int(min_height * scale))
+    char_h = max(2, min_h // 2)
+    max_h = small.shape[0] // 4
+    # MSER needs a few grey levels of edge to call a region stable
+    small = cv2.GaussianBlur(small, (3, 3), 0)
+
+    kernel = cv2.getStructuringElement(cv2.MORPH_ELLIPSE, (3, 3))
+    gradient = cv2.morphologyEx(small, cv2.MORPH_GRADIENT, kernel)
+    # Well above the background's own texture, but low enough for faint text
+    floor = max(8.0, 4 * float(np.percentile(gradient, 90)))
+    edges = np.where(gradient >= floor, 255, 0).astype(np.uint8)
+
+    chars = []
+    mser = cv2.MSER_create(delta=3, min_area=max(8, char_h * 2),
+                           max_area=max(64, small.size // 50), max_variation=0.5)
+    _, blobs = mser.detectRegions(small)
+    for x, y, w, h in blobs:
+        # Character-like (not a hairline, not a huge slab) with a real outline
+        if (char_h <= h <= max_h and 0.1 <= w / h <= 10
+                and cv2.countNonZero(edges[y:y + h, x:x + w]) >= w + h):
+            chars.append((x, y, w, h))
+    _, _, stats, _ = cv2.connectedComponentsWithStats(edges, connectivity=8)
+    for x, y, w, h, area in stats[1:]:
+        # Any length (a run of touching letters), but dense like strokes
+        # rather than a thin contour wandering across the image
+        if char_h <= h <= max_h and w >= 0.1 * h and area >= 0.25 * w * h:
+            chars.append((x, y, w, h))
+
+    mask = np.zeros_like(edges)
+    for x, y, w, h in chars:
+        reach = h // 2
+        cv2.rectangle(mask, (max(0, x - reach), y), (x + w + reach - 1, y + h - 1), 255, -1)
+    contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+
+    lines = []
+    for contour in contours:
+        x, y, w, h = cv2.boundingRect(contour)
+        if cv2.countNonZero(mask[y:y + h, x:x + w]) >= 0.3 * w * h:
+            lines.append((x, y, x + w, y + h))
+
+    boxes = []
+    for x0, y0, x1, y1 in _join_lines(lines, line_gap):
+        if y1 - y0 < min_h:
+            continue
+        boxes.append((max(0, int(x0 / scale) - pad), max(0, int(y0 / scale) - pad),
+                      min(width, int(x1 / scale) + pad), min(height, int(y1 / scale) + pad)))
+    boxes = _merge_boxes(boxes)
+    boxes.sort(key=lambda b: (b[1], b[0]))
+    return [(x0, y0, x1 - x0, y1 - y0) for x0, y0, x1, y1 in boxes]
+
+
+def pack_regions(crops, gap=24, max_height=4096):
+    """
+    Stack region crops onto white canvases, one above the other.
+
+    The gap keeps tesseract from joining lines of different regions.
+    A new canvas is started whenever the current one would exceed
+    max_height, so large region sets still OCR in parallel.
+
+    Returns:
+        list: (canvas, placements) pairs; placements holds one
+        (region_index, x, y, h) per crop on that canvas.
+    """
+    groups, current, used = [], [], gap
+    for index, crop in enumerate(crops):
+        if current and used + crop.shape[0] + gap > max_height:
+            groups.append(current)
+            current, used = [], gap
+        current.append(index)
+        used += crop.shape[0] + gap
+    if current:
+        groups.append(current)
+
+    canvases = []
+    for group in groups:
+        width = max(crops[i].shape[1] for i in group) + 2 * gap
+        height = sum(crops[i].shape[0] + gap for i in group) + gap
+        canvas = np.full((height, width), 255, np.uint8)
+        placements, y = [], gap
+        for i in group:
+            h, w = crops[i].shape
+            canvas[y:y + h, gap:gap + w] = crops[i]
+            placements.append((i, gap, y, h))
+            y += h + gap
+        canvases.append((canvas, placements))
+    return canvases
+
+
+def _canvas_words(data, placements, boxes):
+    """Words of one packed canvas mapped back to page coordinates."""
+    words = []
+    for i, text in enumerate(data.get("text", [])):
+        conf = data["conf"][i]
+        if not text.strip() or conf < 0:
+            continue
+        cy = data["top"][i] + data["height"][i] / 2
+        for region, x, y, h in placements:
+            if y <= cy < y + h:
+                bx, by = boxes[region][:2]
+                words.append({"left": data["left"][i] - x + bx, "top": data["top"][i] - y + by,
+                              "width": data["width"][i], "height": data["height"][i],
+                              "conf": conf, "text": text, "region": region})
+                break
+    return words
+
+
 class OCREngine:
-    def __init__(self, tesseract_cmd=None, lang='eng'):
+    # Tiled OCR (extract_text_tiled) geometry and the size that triggers it
+    TILE_SIZE = 2048
+    TILE_OVERLAP = 256
+    TILED_MIN_PIXELS = 24_000_000
+    # extract_text_sweep() defaults, in the order attempts are started
+    SWEEP_VARIANTS = ("otsu", "inverted", "adaptive", "upscale", "red", "green", "blue")
+    SWEEP_CONFIGS = ("--psm 3", "--psm 6", "--psm 11")
+    SWEEP_THRESHOLD = 85
+    # extract_text_regions() falls back to the whole image when text
+    # regions cover more than REGION_MAX_COVERAGE of it, or less than
+    # REGION_MIN_COVERAGE (no regions, or too little to hold real text)
+    REGION_MAX_COVERAGE = 0.6
+    REGION_MIN_COVERAGE = 0.001
+
+    def __init__(self, tesseract_cmd=None, lang='eng', use_cache=True):
         """
         Initialize the OCR engine.
         Args:
             tesseract_cmd (str): Optional path to tesseract executable.
             lang (str): Default language for OCR.
+            use_cache (bool): Reuse earlier OCR results for identical files.
         """
         if tesseract_cmd:
             pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
         self.default_lang = lang
+        self.use_cache = use_cache
 
+    @traced("ocr.preprocess", cat="ocr")
     def preprocess_image(self, image_path):
         """
         Preprocess the image for better OCR accuracy.
@@ -42,17 +548,16 @@ class OCREngine:
         """
         try:
             image = cv2.imread(image_path)
-            gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-            blur = cv2.GaussianBlur(gray, (3, 3), 0)
-            _, thresh = cv2.threshold(blur, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
-            processed = Image.fromarray(thresh)
+            processed = Image.fromarray(binarize(image))
             logging.info("Image preprocessing completed.")
             return processed
         except Exception as e:
             logging.error(f"Preprocessing failed: {e}")
             raise
 
-    def extract_text_from_image(self, image_path, lang=None, return_data=False, config="--psm 3"):
+    @traced("ocr.extract_text", cat="ocr")
+    def extract_text_from_image(self, image_path, lang=None, return_data=False, config=None,
+                                context=None, tiled=None, regions=False):
         """
         Extract text from an image using Tesseract OCR with preprocessing.
 
@@ -60,7 +565,16 @@ class OCREngine:
             image_path (str): Path to the image.
             lang (str): Language(s) to use.
             return_data (bool): If True, return detailed data (bounding boxes).
-            config (str): Custom tesseract config string.
+            config (str): Custom tesseract config string (default
+                "--psm 3"; region mode leaves the choice to
+                extract_text_regions()).
+            context (AnalysisContext): Optional per-file context; results are
+                stored per lang/config as "ocr:..." stages.
+            tiled (bool): OCR in overlapping tiles (see extract_text_tiled()).
+                None tiles images larger than TILED_MIN_PIXELS.
+            regions (bool): OCR only detected text regions (see
+                extract_text_regions()); for sparse images such as photos
+                with a caption or sign. Takes precedence over tiled.
 
         Returns:
             dict: {
@@ -71,20 +585,539 @@ class OCREngine:
                 'error': str (if any)
             }
         """
+        if not os.path.isfile(image_path):
+            logging.warning(f"File not found: {image_path}")
+            return {"success": False, "text": "", "error": f"File not found: {image_path}"}
+
+        lang = lang or self.default_lang
+        if regions:
+            mode = "regions"
+        elif tiled or (tiled is None and self._is_large(image_path)):
+            mode = "tiled"
+        else:
+            mode = "full"
+        if mode != "regions":
+            config = config or "--psm 3"
+        if context is not None:
+            stage = f"ocr:{lang}:{config}:{'data' if return_data else 'text'}"
+            if mode != "full":
+                stage += f":{mode}"
+            return context.get_or_compute(
+                stage,
+                lambda: self._extract_cached(image_path, lang, return_data, config,
+                                             context.sha256, mode, context),
+            )
+        return self._extract_cached(image_path, lang, return_data, config, mode=mode)
+
+    def _extract_cached(self, image_path, lang, return_data, config, content_hash=None,
+                        mode="full", context=None):
+        # With a context, OCR its decoded image instead of decoding the file again
+        source = lambda: self._source(image_path, context)
+        if mode == "regions":
+            run = lambda: self.extract_text_regions(source(), lang, return_data, config)
+        elif mode == "tiled":
+            run = lambda: self.extract_text_tiled(source(), lang, return_data, config)
+        else:
+            run = lambda: self._extract_uncached(image_path, lang, return_data, config,
+                                                 source())
+        if not self.use_cache:
+            return run()
+        options = self._cache_options(lang, return_data, config)
+        if mode == "regions":
+            options["regions"] = "gradient-mser-lines"
+        elif mode == "tiled":
+            options["tiles"] = [self.TILE_SIZE, self.TILE_OVERLAP]
+        return get_cache().fetch(
+            image_path, "tesseract", self._version(), options, run,
+            should_store=lambda result: result.get("success", False),
+            content_hash=content_hash,
+        )
+
+    @staticmethod
+    def _source(image_path, context):
+        """context's decoded image as an array, or image_path to decode."""
+        if context is not None:
+            try:
+                return pil_to_cv(context.image)
+            except Exception:
+                pass  # the path-based code reports the decode error
+        return image_path
+
+    def _is_large(self, image_path):
+        try:
+            with Image.open(image_path) as img:
+                width, height = img.size
+        except Exception:
+            return False
+        return width * height > self.TILED_MIN_PIXELS
+
+    @staticmethod
+    def _version():
+        return tool_version(pytesseract.pytesseract.tesseract_cmd, "--version")
+
+    @staticmethod
+    def _cache_options(lang, return_data, config):
+        return {"lang": lang, "return_data": return_data, "config": config,
+                "preprocess": "gray-blur3-otsu"}
+
+    def extract_text_batch(self, images, lang=None, return_data=False, config="--psm 3",
+                           workers=None):
+        """
+        OCR many images over a process pool, yielding each result as soon
+        as it is ready.
+
+        Paths are decoded once in the worker (no PIL round trip) and
+        already-decoded images are used as they are. The binarized image
+        is piped to tesseract as an uncompressed PGM on stdin instead of
+        being written to a temporary PNG.
+
+        Args:
+            images: Iterable of image paths and/or decoded images (NumPy
+                arrays in OpenCV's BGR or grayscale layout, as cv2.imread
+                returns them). It is consumed lazily.
+            lang (str): Language(s) to use.
+            return_data (bool): If True, include word boxes as "data".
+            config (str): Custom tesseract config string.
+            workers (int): Worker processes (default: CPU count).
+
+        Yields:
+            tuple: (index, result), in completion order; index is the
+            image's position in images and result has the shape
+            extract_text_from_image() returns.
+        """
+        lang = lang or self.default_lang
+        workers = workers or os.cpu_count() or 1
+        cache = get_cache()
+        use_cache = self.use_cache and cache.enabled
+        options = self._cache_options(lang, return_data, config)
+        keys = {}
+        stop = multiprocessing.Event()
+
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_ocr_worker,
+            initargs=(pytesseract.pytesseract.tesseract_cmd, shared_slots(), stop),
+        ) as pool:
+            pending = {}
+            try:
+                for index, image in enumerate(images):
+                    if not isinstance(image, np.ndarray):
+                        image = str(image)
+                        if not os.path.isfile(image):
+                            yield index, {"success": False, "text": "",
+                                          "error": f"File not found: {image}"}
+                            continue
+                        if use_cache:
+                            keys[index] = cache.make_key(
+                                cache.file_hash(image), "tesseract", self._version(), options
+                            )
+                            hit = cache.get(keys[index])
+                            if hit is not None:
+                                yield index, hit
+                                continue
+                    # Bounded look-ahead: enough to keep every worker busy
+                    while len(pending) >= workers * 2:
+                        yield from self._collect(pending, keys, cache)
+                    future = pool.submit(_ocr_task, image, lang, config, return_data)
+                    pending[future] = index
+                while pending:
+                    yield from self._collect(pending, keys, cache)
+            finally:
+                # Consumer stopped early (or failed, or was cancelled): drop
+                # work not yet started and kill the tesseract runs in progress
+                for future in pending:
+                    future.cancel()
+                if pending:
+                    stop.set()
+
+    @staticmethod
+    def _collect(pending, keys, cache):
+        finished = ()
+        while not finished:
+            # Workers cannot see the caller's cancel_scope(); stop feeding them
+            raise_if_cancelled("OCR")
+            finished, _ = wait(pending, timeout=_CANCEL_POLL, return_when=FIRST_COMPLETED)
+        for future in finished:
+            index = pending.pop(future)
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"success": False, "text": "", "error": str(e)}
+            if result.get("success") and index in keys:
+                cache.set(keys[index], result, "tesseract")
+            yield index, result
+
+    def extract_text_tiled(self, image, lang=None, return_data=False, config="--psm 3",
+                           tile_size=None, overlap=None, workers=None):
+        """
+        OCR a large image as overlapping tiles.
+
+        The image is loaded straight to grayscale, cut into tiles of
+        tile_size pixels that overlap by `overlap`, and every tile is
+        blurred and Otsu-thresholded on its own (so uneven lighting across
+        a scan does not defeat one global threshold). Tiles run in parallel
+        through extract_text_batch(); blank tiles are skipped. Words are
+        mapped back to page coordinates; a word seen by two tiles is kept
+        only by the tile whose share of the overlap holds its centre.
+
+        Args:
+            image: Image path or decoded image (BGR or grayscale array).
+            lang (str): Language(s) to use.
+            return_data (bool): If True, include the merged word boxes.
+            config (str): Custom tesseract config string (applied per tile).
+            tile_size (int): Tile edge in pixels (default TILE_SIZE).
+            overlap (int): Overlap between neighbouring tiles (default
+                TILE_OVERLAP); should exceed the height of a text line.
+            workers (int): Worker processes (default: CPU count).
+
+        Returns:
+            dict: As extract_text_from_image(), plus "tiles" (tiles OCRed)
+            and "failed_tiles". "data" holds left/top/width/height/conf/text/
+            line_num lists in page coordinates.
+        """
+        start_time = time.time()
+        lang = lang or self.default_lang
+        tile_size = tile_size or self.TILE_SIZE
+        overlap = self.TILE_OVERLAP if overlap is None else overlap
+        if overlap >= tile_size:
+            raise ValueError("overlap must be smaller than tile_size")
+
+        if isinstance(image, np.ndarray):
+            gray = image if image.ndim == 2 else cv2.cvtColor(
+                image, cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            )
+        else:
+            # Decoding to one channel keeps a 50 MP scan at 50 MB instead of 150
+            gray = cv2.imread(str(image), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                return {"success": False, "text": "", "error": "Invalid or corrupted image format."}
+
+        tiles = tile_grid(gray.shape[1], gray.shape[0], tile_size, overlap)
+        # Uniform tiles (margins, blank paper) cannot hold text
+        tiles = [t for t in tiles
+                 if np.ptp(gray[t["y"]:t["y"] + t["h"]:4, t["x"]:t["x"] + t["w"]:4]) >= 16]
+
+        words = []
+        failed = []
+        crops = (gray[t["y"]:t["y"] + t["h"], t["x"]:t["x"] + t["w"]] for t in tiles)
+        for index, result in self.extract_text_batch(crops, lang, True, config, workers):
+            if not result.get("success"):
+                failed.append(result.get("error", "unknown error"))
+                continue
+            words.extend(_tile_words(result.get("data", {}), tiles[index]))
+
+        if tiles and len(failed) == len(tiles):
+            return {"success": False, "text": "", "error": failed[0], "tiles": len(tiles),
+                    "failed_tiles": len(failed)}
+
+        lines = _group_lines(_dedupe_words(words))
+        min_conf = 60 if return_data else 0
+        text = "\n".join(
+            " ".join(w["text"] for w in line if w["conf"] > min_conf) for line in lines
+        )
+        elapsed = round(time.time() - start_time, 2)
+        logging.info(f"Tiled OCR of {len(tiles)} tiles completed in {elapsed}s.")
+        result = {
+            "success": True,
+            "text": "\n".join(l for l in text.splitlines() if l.strip()),
+            "time": elapsed,
+            "tiles": len(tiles),
+            "failed_tiles": len(failed),
+        }
+        if return_data:
+            columns = ("left", "top", "width", "height", "conf", "text", "line_num")
+            result["data"] = {c: [] for c in columns}
+            for line_num, line in enumerate(lines, 1):
+                for w in line:
+                    for c in columns[:-1]:
+                        result["data"][c].append(w[c])
+                    result["data"]["line_num"].append(line_num)
+        return result
+
+    @traced("ocr.regions", cat="ocr")
+    def extract_text_regions(self, image, lang=None, return_data=False, config=None,
+                             workers=None):
+        """
+        OCR only the parts of an image that look like text.
+
+        detect_text_regions() proposes boxes; each crop is binarized on its
+        own (and inverted if the text is light on dark), and the crops are
+        stacked onto as few white canvases as pack_regions() allows so a
+        handful of tesseract runs cover every region. Words are mapped back
+        to page coordinates. On a large photo with a small caption this
+        OCRs a few percent of the pixels.
+
+        When regions cover more than REGION_MAX_COVERAGE of the image, or
+        less than REGION_MIN_COVERAGE (including no regions at all), the
+        whole image is OCRed instead, as extract_text_tiled() would.
+
+        Args:
+            image: Image path or decoded image (BGR or grayscale array).
+            lang (str): Language(s) to use.
+            return_data (bool): If True, include word boxes in page
+                coordinates, with the index of their region.
+            config (str): Tesseract config string; None uses "--psm 6"
+                for the region canvases and "--psm 3" for a whole-image
+                fallback.
+            workers (int): Worker processes (default: CPU count).
+
+        Returns:
+            dict: As extract_text_from_image(), plus "regions": one
+            {"box": [x, y, w, h], "text": str} per detected region in
+            reading order.
+        """
         start_time = time.time()
+        lang = lang or self.default_lang
+        if isinstance(image, np.ndarray):
+            gray = _gray(image)
+        else:
+            gray = cv2.imread(str(image), cv2.IMREAD_GRAYSCALE)
+            if gray is None:
+                return {"success": False, "text": "", "error": "Invalid or corrupted image format."}
+
+        with span("ocr.detect_regions", cat="ocr"):
+            boxes = detect_text_regions(gray)
+        covered = sum(w * h for _, _, w, h in boxes)
+        if not (self.REGION_MIN_COVERAGE * gray.size <= covered
+                <= self.REGION_MAX_COVERAGE * gray.size):
+            result = self.extract_text_tiled(gray, lang, return_data, config or "--psm 3",
+                                             tile_size=max(gray.shape), overlap=0,
+                                             workers=workers)
+            result["regions"] = [{"box": [0, 0, gray.shape[1], gray.shape[0]],
+                                  "text": result.get("text", "")}]
+            return result
+
+        crops = []
+        for x, y, w, h in boxes:
+            crop = binarize(gray[y:y + h, x:x + w])
+            if cv2.countNonZero(crop) < crop.size / 2:
+                crop = 255 - crop     # light text on a dark background
+            crops.append(crop)
+        canvases = pack_regions(crops)
+        config = config or "--psm 6"
+
+        words = []
+        failed = []
+        images = (canvas for canvas, _ in canvases)
+        for index, result in self.extract_text_batch(images, lang, True, config, workers):
+            if not result.get("success"):
+                failed.append(result.get("error", "unknown error"))
+                continue
+            words.extend(_canvas_words(result.get("data", {}), canvases[index][1], boxes))
+
+        if canvases and len(failed) == len(canvases):
+            return {"success": False, "text": "", "error": failed[0], "regions": []}
+
+        min_conf = 60 if return_data else 0
+        by_region = {}
+        for w in words:
+            by_region.setdefault(w["region"], []).append(w)
+        regions = []
+        for index, box in enumerate(boxes):
+            lines = _group_lines(by_region.get(index, []))
+            text = "\n".join(" ".join(w["text"] for w in line if w["conf"] > min_conf)
+                             for line in lines)
+            regions.append({"box": list(box), "text": text.strip()})
+
+        elapsed = round(time.time() - start_time, 2)
+        logging.info(f"Region OCR of {len(boxes)} regions completed in {elapsed}s.")
+        result = {
+            "success": True,
+            "text": "\n".join(r["text"] for r in regions if r["text"]),
+            "time": elapsed,
+            "regions": regions,
+        }
+        if failed:
+            result["failed_regions"] = len(failed)
+        if return_data:
+            columns = ("left", "top", "width", "height", "conf", "text", "region")
+            result["data"] = {c: [w[c] for w in words] for c in columns}
+        return result
+
+    @traced("ocr.sweep", cat="ocr")
+    def extract_text_sweep(self, image_path, variants=None, configs=None, langs=None,
+                           threshold=None, return_data=False, workers=None):
+        """
+        OCR an image under several preprocessing variants and tesseract
+        configs at once and keep the best-scoring reading.
+
+        Each attempt is scored by the mean confidence of its words. Attempts
+        run concurrently in the order given (the first variant and config
+        first), and as soon as one scores at least `threshold` the others
+        are cancelled: queued attempts never start and running tesseract
+        processes are killed. An image that reads cleanly the usual way
+        therefore costs about one pass; the rest of the sweep is only paid
+        for when it is needed.
 
+        Args:
+            image_path (str): Path to the image.
+            variants (list): Names from PREPROCESS_VARIANTS (default
+                SWEEP_VARIANTS). Channel variants are skipped on gray images.
+            configs (list): Tesseract config strings (default SWEEP_CONFIGS).
+            langs (list): Languages to try (default [self.default_lang]).
+            threshold (float): Score that ends the sweep early (default
+                SWEEP_THRESHOLD); 0 takes the first attempt to finish and
+                anything above 100 runs every attempt.
+            return_data (bool): If True, include the winner's word boxes.
+            workers (int): Concurrent attempts (default: CPU count).
+
+        Returns:
+            dict: As extract_text_from_image(), plus "score", "variant",
+            "config" and "lang" of the winner and "attempts", one entry per
+            attempt: {"variant", "config", "lang", "score" | "error" |
+            "cancelled", "time"}.
+        """
         if not os.path.isfile(image_path):
-            logging.warning(f"File not found: {image_path}")
             return {"success": False, "text": "", "error": f"File not found: {image_path}"}
+        variants = list(variants or self.SWEEP_VARIANTS)
+        configs = list(configs or self.SWEEP_CONFIGS)
+        langs = list(langs or [self.default_lang])
+        threshold = self.SWEEP_THRESHOLD if threshold is None else threshold
+        unknown = [v for v in variants if v not in PREPROCESS_VARIANTS]
+        if unknown:
+            raise ValueError(f"Unknown preprocessing variant(s): {', '.join(unknown)}")
+
+        def run():
+            return self._sweep(image_path, variants, configs, langs, threshold, return_data,
+                               workers)
+
+        if not self.use_cache:
+            return run()
+        options = {"variants": variants, "configs": configs, "langs": langs,
+                   "threshold": threshold, "return_data": return_data, "sweep": 1}
+        return get_cache().fetch(
+            image_path, "tesseract", self._version(), options, run,
+            should_store=lambda result: result.get("success", False),
+        )
+
+    def _sweep(self, image_path, variants, configs, langs, threshold, return_data, workers):
+        start_time = time.time()
+        image = cv2.imread(image_path, cv2.IMREAD_UNCHANGED)
+        if image is None:
+            return {"success": False, "text": "", "error": "Invalid or corrupted image format."}
+        if image.ndim == 3 and image.shape[2] == 1:
+            image = image[:, :, 0]
+        if image.ndim == 2:
+            variants = [v for v in variants if v not in _CHANNEL_VARIANTS] or ["otsu"]
+        timeout = tool_timeouts().get("tesseract")
+        cancelled = threading.Event()
+        lock = threading.Lock()
+        prepared = {}
+
+        def prepare(variant):
+            # Each variant is computed once and shared by every config/lang
+            with lock:
+                if variant not in prepared:
+                    prepared[variant] = threading.Event(), []
+                    owner = True
+                else:
+                    owner = False
+                ready, slot = prepared[variant]
+            if owner:
+                try:
+                    slot.append(PREPROCESS_VARIANTS[variant](image))
+                except Exception as e:
+                    slot.append(e)
+                ready.set()
+            ready.wait()
+            if isinstance(slot[0], Exception):
+                raise slot[0]
+            return slot[0]
+
+        def attempt(variant, config, lang):
+            if cancelled.is_set():
+                return None
+            began = time.time()
+            processed = prepare(variant)
+            with span("spawn.tesseract", cat="subprocess", variant=variant, config=config), \
+                    cancel_scope(cancelled):
+                try:
+                    out = run_tesseract(processed, lang, config, tsv=True, timeout=timeout)
+                except ToolCancelled:
+                    return None
+                except subprocess.TimeoutExpired:
+                    raise RuntimeError("tesseract timed out")
+            if cancelled.is_set():
+                return None
+            data = parse_tsv(out)
+            return {"data": data, "score": score_words(data),
+                    "time": round(time.time() - began, 2)}
+
+        combos = list(itertools.product(variants, configs, langs))
+        attempts = {combo: {"variant": combo[0], "config": combo[1], "lang": combo[2]}
+                    for combo in combos}
+        best = None
+        with ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+            pending = {pool.submit(attempt, *combo): combo for combo in combos}
+            try:
+                while pending:
+                    # Attempts run on pool threads, outside the caller's cancel_scope()
+                    raise_if_cancelled("OCR sweep")
+                    finished, _ = wait(pending, timeout=_CANCEL_POLL,
+                                       return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        combo = pending.pop(future)
+                        try:
+                            outcome = future.result()
+                        except Exception as e:
+                            attempts[combo]["error"] = str(e)
+                            continue
+                        if outcome is None:
+                            attempts[combo]["cancelled"] = True
+                        else:
+                            attempts[combo].update(score=outcome["score"], time=outcome["time"])
+                            if best is None or outcome["score"] > best[1]["score"]:
+                                best = combo, outcome
+                    if best is not None and best[1]["score"] >= threshold:
+                        break
+            finally:
+                # Good enough (or interrupted): stop queued attempts from
+                # starting; running ones kill their tesseract via the scope
+                cancelled.set()
+                for future in pending:
+                    future.cancel()
+        for combo in pending.values():
+            attempts[combo]["cancelled"] = True
+
+        elapsed = round(time.time() - start_time, 2)
+        if best is None:
+            errors = [a["error"] for a in attempts.values() if "error" in a]
+            return {"success": False, "text": "", "time": elapsed,
+                    "error": errors[0] if errors else "OCR sweep was interrupted.",
+                    "attempts": list(attempts.values())}
+        (variant, config, lang), outcome = best
+        logging.info(f"OCR sweep picked {variant} / {config} / {lang} "
+                     f"(score {outcome['score']}) in {elapsed}s.")
+        result = {
+            "success": True,
+            "text": tsv_text(outcome["data"]).strip(),
+            "time": elapsed,
+            "score": outcome["score"],
+            "variant": variant,
+            "config": config,
+            "lang": lang,
+            "attempts": list(attempts.values()),
+        }
+        if return_data:
+            result["data"] = outcome["data"]
+        return result
+
+    def _extract_uncached(self, image_path, lang, return_data, config, image=None):
+        """Preprocess and OCR one image without consulting the cache."""
+        start_time = time.time()
 
         try:
-            processed_img = self.preprocess_image(image_path)
-            lang = lang or self.default_lang
+            if isinstance(image, np.ndarray):
+                with span("ocr.preprocess", cat="ocr"):
+                    processed_img = Image.fromarray(binarize(image))
+            else:
+                processed_img = self.preprocess_image(image_path)
 
+            gray = np.asarray(processed_img)
+            timeout = tool_timeouts().get("tesseract")
             if return_data:
-                ocr_data = pytesseract.image_to_data(
-                    processed_img, lang=lang, config=config, output_type=Output.DICT
-                )
+                with span("spawn.tesseract", cat="subprocess"):
+                    ocr_data = parse_tsv(run_tesseract(gray, lang, config, tsv=True,
+                                                       timeout=timeout))
                 structured_text = "\n".join([
                     ocr_data['text'][i] for i in range(len(ocr_data['text']))
                     if int(ocr_data['conf'][i]) > 60 and ocr_data['text'][i].strip()
@@ -98,7 +1131,8 @@ class OCREngine:
                     "time": elapsed
                 }
             else:
-                raw_text = pytesseract.image_to_string(processed_img, lang=lang, config=config)
+                with span("spawn.tesseract", cat="subprocess"):
+                    raw_text = run_tesseract(gray, lang, config, timeout=timeout)
                 elapsed = round(time.time() - start_time, 2)
                 logging.info(f"OCR completed in {elapsed}s with plain output.")
                 return {
@@ -110,6 +1144,11 @@ class OCREngine:
         except UnidentifiedImageError:
             logging.error("Invalid or corrupted image format.")
             return {"success": False, "text": "", "error": "Invalid or corrupted image format."}
+        except subprocess.TimeoutExpired:
+            logging.error("tesseract timed out")
+            return {"success": False, "text": "", "error": "tesseract timed out"}
+        except ToolCancelled:
+            raise
         except Exception as e:
             logging.exception("OCR processing failed")
             return {"success": False, "text": "", "error": str(e)}
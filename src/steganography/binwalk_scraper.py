@@ -3,6 +3,8 @@
 binwalk_scraper.py
 
 Scrapes file signatures and extraction info using the Binwalk CLI.
+Plain signature scans use the in-process scanner in signature_scanner.py
+by default; extraction always goes through binwalk.
 """
 
 import subprocess
@@ -11,15 +13,35 @@ import shlex
 import re
 from pathlib import Path
 
+from steganography.signature_scanner import SCANNER_VERSION, scan as scan_signatures
+from utils.cache import get_cache, tool_version
+from utils.config import tool_timeouts, tool_engines
+from utils.processes import run_tool
+from utils.tracing import span, traced
+
 
 class BinwalkScraper:
-    def __init__(self, binwalk_path: str = None):
+    # Processes the native scanner may use for one large file (None = all
+    # cores); batch workers set this to 1 since files already run in parallel
+    default_scan_workers = None
+
+    def __init__(self, binwalk_path: str = None, use_cache: bool = True, timeout: float = None,
+                 engine: str = None, scan_workers: int = None):
         """
         Initialize the BinwalkScraper.
 
         Args:
             binwalk_path (str): Custom path or command for Binwalk. If None, auto-select based on platform.
+            use_cache (bool): Consult the shared result cache for signature scans.
+            timeout (float): Seconds before a binwalk run is abandoned (defaults to config.json "tool_timeouts").
+            engine (str): "native" scans signatures in-process; "binwalk" always runs the CLI
+                (defaults to config.json "tool_engines").
+            scan_workers (int): Process count for native scans of large files.
         """
+        self.use_cache = use_cache
+        self.engine = engine or tool_engines()["binwalk"]
+        self.scan_workers = scan_workers if scan_workers is not None else self.default_scan_workers
+        self.timeout = timeout if timeout is not None else tool_timeouts()["binwalk"]
         if binwalk_path:
             self.binwalk_path = binwalk_path
         elif platform.system() == "Windows":
@@ -44,7 +66,9 @@ class BinwalkScraper:
             return wsl_path
         return str(path)
 
-    def scrape(self, file_path: str, extract: bool = False, extract_dir: str = None) -> dict:
+    @traced("binwalk.scrape", cat="scraper")
+    def scrape(self, file_path: str, extract: bool = False, extract_dir: str = None,
+               context=None, on_output=None) -> dict:
         """
         Run binwalk on the file. If extract=True, will extract embedded data.
 
@@ -52,6 +76,11 @@ class BinwalkScraper:
             file_path (str): Path to the file to analyze.
             extract (bool): Whether to run with -e (extract) flag.
             extract_dir (str, optional): Directory to extract into.
+            context (AnalysisContext, optional): Per-file context; plain scans
+                are stored as its "binwalk" stage.
+            on_output (callable, optional): Receives binwalk's output line by
+                line while the CLI runs. The native engine and cache hits
+                only return the finished result.
 
         Returns:
             dict: Parsed scan results, plus raw output and extraction dir if used.
@@ -60,6 +89,59 @@ class BinwalkScraper:
         if not file.exists():
             return {"Error": f"File not found: {file_path}"}
 
+        # Extraction has side effects on disk, so only plain scans are cached
+        if extract:
+            return self._run(file, extract, extract_dir, on_output)
+        if context is not None:
+            return context.get_or_compute(
+                "binwalk", lambda: self._scan(file, context.sha256, context.data, on_output)
+            )
+        return self._scan(file, on_output=on_output)
+
+    def _scan(self, file: Path, content_hash: str = None, data=None, on_output=None) -> dict:
+        if self.engine == "native":
+            scraper, version = "binwalk-native", SCANNER_VERSION
+            run = lambda: self._run_native(file, data)
+        else:
+            scraper, version = "binwalk", self.version()
+            run = lambda: self._run(file, on_output=on_output)
+        if not self.use_cache:
+            return run()
+        return get_cache().fetch(
+            str(file), scraper, version, {"extract": False}, run,
+            should_store=lambda result: "Error" not in result,
+            content_hash=content_hash,
+        )
+
+    def _run_native(self, file: Path, data=None) -> dict:
+        """Scan with the in-process signature scanner."""
+        try:
+            with span("engine.signature_scan", cat="engine"):
+                return scan_signatures(str(file), data=data, workers=self.scan_workers)
+        except (OSError, ValueError) as e:
+            return {"Signatures": [], "RawOutput": "", "Error": f"Signature scan failed: {e}"}
+
+    def _run(self, file: Path, extract: bool = False, extract_dir: str = None,
+             on_output=None) -> dict:
+        """Invoke binwalk once and parse the result."""
+        try:
+            with span("spawn.binwalk", cat="subprocess", extract=extract):
+                result = run_tool(
+                    "binwalk", self.build_command(file, extract, extract_dir),
+                    timeout=self.timeout, on_output=on_output,
+                )
+        except subprocess.TimeoutExpired:
+            return {"Signatures": [], "RawOutput": "",
+                    "Error": f"binwalk timed out after {self.timeout}s"}
+        return self.parse_result(
+            result.stdout, result.stderr, result.returncode, file, extract, extract_dir
+        )
+
+    def version(self) -> str:
+        return tool_version(*shlex.split(self.binwalk_path))
+
+    def build_command(self, file: Path, extract: bool = False, extract_dir: str = None) -> list:
+        """Command line for a binwalk scan (or extraction) of file."""
         cmd = shlex.split(self.binwalk_path)
         if extract:
             cmd.append("-e")
@@ -67,24 +149,26 @@ class BinwalkScraper:
                 cmd.extend(["-C", str(extract_dir)])
 
         # Convert path for WSL if needed
-        cmd.append(self._convert_to_wsl_path(file))
-
-        try:
-            result = subprocess.run(
-                cmd, capture_output=True, text=True, check=True
-            )
-            raw = result.stdout
-        except subprocess.CalledProcessError as e:
-            raw = (e.stdout or "") + "\n" + (e.stderr or "")
+        cmd.append(self._convert_to_wsl_path(Path(file)))
+        return cmd
+
+    def parse_result(self, stdout: str, stderr: str, returncode: int, file: Path,
+                     extract: bool = False, extract_dir: str = None) -> dict:
+        """Build the scrape() dict from a finished binwalk run."""
+        if returncode == 0:
+            raw = stdout
+        else:
+            raw = (stdout or "") + "\n" + (stderr or "")
 
         data = self._parse_output(raw)
         data["RawOutput"] = raw
         if extract:
-            outdir = extract_dir or f"{file.name}.extracted"
+            outdir = extract_dir or f"{Path(file).name}.extracted"
             data["Extraction Directory"] = str(Path(outdir))
 
         return data
 
+    @traced("parse.binwalk_table", cat="parse")
     def _parse_output(self, output: str) -> dict:
         """
         Parse binwalk scan output into structured signatures.
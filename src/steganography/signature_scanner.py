@@ -0,0 +1,356 @@
+"""
+signature_scanner.py
+
+In-process magic-signature scanner, a fast path for the binwalk CLI.
+
+The file is memory-mapped and searched for all magic numbers in one
+pass: every byte pair is looked up in a 64K-entry table of the magics'
+first two bytes (vectorized with NumPy, block by block), and only the
+few candidate offsets are compared against the full magics. Each hit is
+then checked by a small header parser that rejects false positives and
+builds a binwalk-style description.
+
+Files larger than PARALLEL_THRESHOLD are split into chunks scanned in
+parallel by a process pool. Every worker maps the whole file, but only
+reports hits that start inside its own chunk; magics and headers that
+straddle a chunk boundary are read from the shared mapping, so nothing
+is lost at the seams.
+
+The result mirrors BinwalkScraper.scrape():
+
+    {"Signatures": [{"Offset": "0", "Description": "PNG image, ..."}],
+     "RawOutput": "DECIMAL  HEXADECIMAL  DESCRIPTION ..."}
+"""
+
+import os
+import re
+import mmap
+import zlib
+import struct
+import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+
+SCANNER_VERSION = "signature-scanner/1"
+
+CHUNK_SIZE = 64 * 1024 * 1024
+PARALLEL_THRESHOLD = 2 * CHUNK_SIZE
+# Bytes run through the prefix table at once (bounds temporary arrays)
+BLOCK_SIZE = 4 * 1024 * 1024
+
+
+# --- header parsers ----------------------------------------------------
+#
+# Each takes (data, offset) and returns a description, or None when the
+# bytes at offset only look like the magic by accident.
+
+def _zip(data, offset):
+    header = data[offset:offset + 30]
+    if len(header) < 30:
+        return None
+    (version, flags, method, _, _, _, csize, usize,
+     name_len, extra_len) = struct.unpack("<HHHHHIIIHH", header[4:30])
+    if version > 100 or method not in (0, 1, 6, 8, 9, 12, 14, 93, 95, 98, 99):
+        return None
+    if not 0 < name_len < 1024:
+        return None
+    name = bytes(data[offset + 30:offset + 30 + name_len]).decode("utf-8", errors="replace")
+    return (
+        f"Zip archive data, at least v{version // 10}.{version % 10} to extract, "
+        f"compressed size: {csize}, uncompressed size: {usize}, name: {name}"
+    )
+
+
+def _zip_end(data, offset):
+    header = data[offset:offset + 22]
+    if len(header) < 22:
+        return None
+    comment_len = struct.unpack("<H", header[20:22])[0]
+    return f"End of Zip archive, footer length: {22 + comment_len}"
+
+
+_PNG_COLOR = {0: "grayscale", 2: "RGB", 3: "colormap", 4: "grayscale+alpha", 6: "RGBA"}
+
+
+def _png(data, offset):
+    header = data[offset + 8:offset + 29]
+    if len(header) < 21 or header[4:8] != b"IHDR":
+        return None
+    width, height, depth, color, _, _, interlace = struct.unpack(">IIBBBBB", header[8:21])
+    if color not in _PNG_COLOR or width == 0 or height == 0:
+        return None
+    kind = "interlaced" if interlace else "non-interlaced"
+    return f"PNG image, {width} x {height}, {depth}-bit/color {_PNG_COLOR[color]}, {kind}"
+
+
+def _jpeg(data, offset):
+    marker = data[offset + 3:offset + 4]
+    if marker == b"\xe0" and data[offset + 6:offset + 11] == b"JFIF\x00":
+        major, minor = data[offset + 11], data[offset + 12]
+        return f"JPEG image data, JFIF standard {major}.{minor:02d}"
+    if marker == b"\xe1" and data[offset + 6:offset + 10] == b"Exif":
+        return "JPEG image data, EXIF standard"
+    if marker in (b"\xdb", b"\xee", b"\xed", b"\xe2", b"\xfe"):
+        return "JPEG image data"
+    return None
+
+
+_GZIP_OS = {0: "FAT", 3: "Unix", 7: "Macintosh", 11: "NTFS"}
+
+
+def _gzip(data, offset):
+    header = data[offset:offset + 10]
+    if len(header) < 10:
+        return None
+    flags, mtime, xfl, os_id = header[3], struct.unpack("<I", header[4:8])[0], header[8], header[9]
+    if flags & 0xE0:
+        return None
+    parts = ["gzip compressed data"]
+    if xfl == 2:
+        parts.append("maximum compression")
+    elif xfl == 4:
+        parts.append("fastest compression")
+    parts.append(f"from {_GZIP_OS.get(os_id, 'unknown OS')}")
+    if flags & 0x08:
+        start = offset + 10
+        if flags & 0x04:
+            start += 2 + struct.unpack("<H", data[start:start + 2])[0]
+        end = data.find(b"\x00", start, start + 256)
+        if end > start:
+            name = bytes(data[start:end]).decode("latin-1")
+            parts.append(f'original file name: "{name}"')
+    if mtime:
+        stamp = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+        parts.append(f"last modified: {stamp:%Y-%m-%d %H:%M:%S}")
+    return ", ".join(parts)
+
+
+def _sevenzip(data, offset):
+    header = data[offset + 6:offset + 8]
+    if len(header) < 2 or header[0] != 0:
+        return None
+    return f"7-zip archive data, version {header[0]}.{header[1]}"
+
+
+_ELF_MACHINE = {
+    0x03: "Intel 80386", 0x08: "MIPS", 0x14: "PowerPC", 0x28: "ARM",
+    0x3E: "AMD x86-64", 0xB7: "ARM aarch64", 0xF3: "RISC-V",
+}
+_ELF_TYPE = {1: "relocatable", 2: "executable", 3: "shared object", 4: "core file"}
+
+
+def _elf(data, offset):
+    header = data[offset:offset + 20]
+    if len(header) < 20 or header[4] not in (1, 2) or header[5] not in (1, 2) or header[6] != 1:
+        return None
+    endian = "<" if header[5] == 1 else ">"
+    e_type, machine = struct.unpack(endian + "HH", header[16:20])
+    if e_type not in _ELF_TYPE:
+        return None
+    bits = "32-bit" if header[4] == 1 else "64-bit"
+    order = "LSB" if header[5] == 1 else "MSB"
+    arch = _ELF_MACHINE.get(machine, f"machine {machine}")
+    return f"ELF, {bits} {order} {_ELF_TYPE[e_type]}, {arch}, version 1 (SYSV)"
+
+
+def _pdf(data, offset):
+    m = re.match(rb"%PDF-(\d\.\d)", bytes(data[offset:offset + 8]))
+    return f'PDF document, version: "{m.group(1).decode()}"' if m else None
+
+
+def _rar(data, offset):
+    tail = data[offset + 6:offset + 8]
+    if tail[:1] == b"\x00":
+        return "RAR archive data, version 4.x"
+    if tail == b"\x01\x00":
+        return "RAR archive data, version 5.x"
+    return None
+
+
+_ZLIB_LEVEL = {
+    b"\x78\x01": "best speed",
+    b"\x78\x5e": "low compression",
+    b"\x78\x9c": "default compression",
+    b"\x78\xda": "best compression",
+}
+
+
+def _zlib(data, offset):
+    # Two-byte magic: only a stream that actually inflates counts
+    chunk = bytes(data[offset:offset + 4096])
+    try:
+        out = zlib.decompressobj().decompress(chunk, 256)
+    except zlib.error:
+        return None
+    if not out:
+        return None
+    return f"Zlib compressed data, {_ZLIB_LEVEL[chunk[:2]]}"
+
+
+_SQUASHFS_COMPRESSION = {1: "gzip", 2: "lzma", 3: "lzo", 4: "xz", 5: "lz4", 6: "zstd"}
+
+
+def _squashfs(data, offset):
+    header = data[offset:offset + 96]
+    if len(header) < 96:
+        return None
+    endian, order = ("<", "little endian") if header[:4] == b"hsqs" else (">", "big endian")
+    inodes, mtime, block_size = struct.unpack(endian + "III", header[4:16])
+    compression, = struct.unpack(endian + "H", header[20:22])
+    major, minor = struct.unpack(endian + "HH", header[28:32])
+    size, = struct.unpack(endian + "Q", header[40:48])
+    if major not in (1, 2, 3, 4) or block_size & (block_size - 1) or block_size == 0:
+        return None
+    stamp = datetime.datetime.fromtimestamp(mtime, datetime.timezone.utc)
+    return (
+        f"Squashfs filesystem, {order}, version {major}.{minor}, "
+        f"compression:{_SQUASHFS_COMPRESSION.get(compression, 'unknown')}, "
+        f"size: {size} bytes, {inodes} inodes, blocksize: {block_size} bytes, "
+        f"created: {stamp:%Y-%m-%d %H:%M:%S}"
+    )
+
+
+# (magic, header parser); one parser may serve several magics
+SIGNATURES = [
+    (b"PK\x03\x04", _zip),
+    (b"PK\x05\x06", _zip_end),
+    (b"\x89PNG\r\n\x1a\n", _png),
+    (b"\xff\xd8\xff", _jpeg),
+    (b"\x1f\x8b\x08", _gzip),
+    (b"7z\xbc\xaf\x27\x1c", _sevenzip),
+    (b"\x7fELF", _elf),
+    (b"%PDF-", _pdf),
+    (b"Rar!\x1a\x07", _rar),
+    (b"\x78\x01", _zlib),
+    (b"\x78\x5e", _zlib),
+    (b"\x78\x9c", _zlib),
+    (b"\x78\xda", _zlib),
+    (b"hsqs", _squashfs),
+    (b"sqsh", _squashfs),
+]
+
+_BY_PREFIX = {}
+for _magic, _parser in SIGNATURES:
+    _BY_PREFIX.setdefault(_magic[:2], []).append((_magic, _parser))
+
+_PREFIX_TABLE = np.zeros(1 << 16, dtype=bool)
+for _prefix in _BY_PREFIX:
+    _PREFIX_TABLE[_prefix[0] << 8 | _prefix[1]] = True
+
+
+def _candidates(data, start: int, end: int):
+    """Yield offsets in [start, end) whose two bytes begin some magic."""
+    size = len(data)
+    for block in range(start, end, BLOCK_SIZE):
+        # One extra byte so the pair starting at the block's last offset is seen
+        count = min(BLOCK_SIZE + 1, size - block)
+        if count < 2:
+            return
+        raw = np.frombuffer(data, dtype=np.uint8, count=count, offset=block)
+        keys = (raw[:-1].astype(np.uint16) << 8) | raw[1:]
+        for index in np.flatnonzero(_PREFIX_TABLE[keys]):
+            offset = block + int(index)
+            if offset >= end:
+                return
+            yield offset
+        del raw, keys
+
+
+def scan_range(data, start: int = 0, end: int = None) -> list:
+    """
+    Find signatures starting in data[start:end].
+
+    Args:
+        data: bytes-like object or mmap holding the whole file.
+        start (int): First offset to report.
+        end (int): Offset after the last one to report (default: len(data)).
+
+    Returns:
+        list: (offset, description) tuples in offset order.
+    """
+    if end is None:
+        end = len(data)
+    hits = []
+    for offset in _candidates(data, start, end):
+        for magic, parser in _BY_PREFIX[bytes(data[offset:offset + 2])]:
+            if data[offset:offset + len(magic)] != magic:
+                continue
+            try:
+                description = parser(data, offset)
+            except (struct.error, IndexError, ValueError, OverflowError, OSError):
+                description = None
+            if description:
+                hits.append((offset, description))
+            break
+    return hits
+
+
+def _scan_chunk(file_path: str, start: int, end: int) -> list:
+    """Process-pool worker: map the file and scan one chunk of it."""
+    with open(file_path, "rb") as fh, \
+            mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        return scan_range(data, start, end)
+
+
+def scan_file(file_path: str, data=None, workers: int = None,
+              chunk_size: int = CHUNK_SIZE) -> list:
+    """
+    Scan a whole file for signatures.
+
+    Args:
+        file_path (str): File to scan.
+        data: Optional already-mapped contents (e.g. AnalysisContext.data),
+            used for files scanned in this process.
+        workers (int): Processes for large files (default: CPU count);
+            1 keeps the scan in this process.
+        chunk_size (int): Bytes per parallel work item.
+
+    Returns:
+        list: (offset, description) tuples in offset order.
+    """
+    size = os.path.getsize(file_path)
+    workers = workers or os.cpu_count() or 1
+    if size == 0:
+        return []
+
+    if workers == 1 or size < PARALLEL_THRESHOLD:
+        if data is not None:
+            return scan_range(data)
+        return _scan_chunk(file_path, 0, size)
+
+    starts = list(range(0, size, chunk_size))
+    ends = [min(s + chunk_size, size) for s in starts]
+    with ProcessPoolExecutor(max_workers=min(workers, len(starts))) as pool:
+        chunks = pool.map(_scan_chunk, [file_path] * len(starts), starts, ends)
+        return [hit for chunk in chunks for hit in chunk]
+
+
+def format_raw_output(hits: list) -> str:
+    """Render hits as binwalk's DECIMAL / HEXADECIMAL / DESCRIPTION table."""
+    lines = [
+        "",
+        f"{'DECIMAL':<14}{'HEXADECIMAL':<18}DESCRIPTION",
+        "-" * 80,
+    ]
+    for offset, description in hits:
+        lines.append(f"{offset:<14}{hex(offset):<18}{description}")
+    return "\n".join(lines) + "\n"
+
+
+def scan(file_path: str, data=None, workers: int = None) -> dict:
+    """
+    Scan a file and return the BinwalkScraper.scrape() structure.
+
+    Returns:
+        dict: {"Signatures": [{"Offset", "Description"}, ...], "RawOutput": str}
+    """
+    hits = scan_file(file_path, data=data, workers=workers)
+    return {
+        "Signatures": [
+            {"Offset": str(offset), "Description": description}
+            for offset, description in hits
+        ],
+        "RawOutput": format_raw_output(hits),
+    }
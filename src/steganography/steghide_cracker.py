@@ -0,0 +1,374 @@
+#!/usr/bin/env python3
+"""
+steghide_cracker.py
+
+Parallel steghide passphrase cracker.
+
+Candidates are mined from the challenge itself first (empty passphrase,
+EXIF fields, OCR text, the file name) and then streamed from a wordlist,
+so arbitrarily large lists are never held in memory. A thread pool keeps
+a bounded number of `steghide info` processes running; the first
+passphrase that exposes embedded data stops the run.
+
+Progress is checkpointed to JSON (under the result-cache directory by
+default), keyed by the file's SHA-256 and the wordlist, so an interrupted
+run resumes where it stopped.
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from steganography.steghide_scraper import SteghideScraper
+from utils.cache import get_cache
+from utils.file_handler import file_sha256
+from utils.processes import process_group_kwargs, kill_group
+from utils.tracing import span
+
+
+# Present in `steghide info` output only when the passphrase was right
+_SUCCESS_MARKER = re.compile(r'embedded file\s+"')
+_TOKEN_SPLIT = re.compile(r"[\s_\-.,;:/\\|()\[\]{}\"']+")
+# EXIF fields that describe the file rather than anything a challenge author wrote
+_SKIP_EXIF_TAGS = {
+    "SourceFile", "Directory", "FileSize", "FileModifyDate", "FileAccessDate",
+    "FileInodeChangeDate", "FilePermissions", "FileType", "FileTypeExtension",
+    "MIMEType", "ExifToolVersion", "Warning",
+}
+
+
+def mine_candidates(file_path: str, exif: dict = None, ocr_text: str = None) -> list:
+    """
+    Build the ordered, de-duplicated list of challenge-derived candidates.
+
+    Args:
+        file_path (str): Cover file (its name is mined too).
+        exif (dict): EXIF fields as returned by MetadataScraper.scrape().
+        ocr_text (str): Text recognised in the image, if any.
+
+    Returns:
+        list: Passphrases, most likely first; always starts with "".
+    """
+    ordered = [""]
+
+    def add(value):
+        value = str(value).strip()
+        if not value or len(value) > 128:
+            return
+        ordered.append(value)
+        for token in _TOKEN_SPLIT.split(value):
+            if len(token) >= 3:
+                ordered.append(token)
+        ordered.append(value.lower())
+
+    if exif:
+        # The fields SteghideScraper derives a passphrase from come first
+        for tag in SteghideScraper._PASS_TAG_CANDIDATES:
+            if isinstance(exif.get(tag), str):
+                add(exif[tag])
+        for tag, value in exif.items():
+            if tag not in _SKIP_EXIF_TAGS and isinstance(value, str):
+                add(value)
+
+    if ocr_text:
+        for line in ocr_text.splitlines():
+            add(line)
+
+    add(Path(file_path).stem)
+
+    seen = set()
+    return [c for c in ordered if not (c in seen or seen.add(c))]
+
+
+def stream_wordlist(wordlist_path: str):
+    """Yield passphrases from a wordlist one line at a time."""
+    # Wordlists such as rockyou.txt are not valid UTF-8 throughout
+    with open(wordlist_path, "r", encoding="latin-1") as fh:
+        for line in fh:
+            yield line.rstrip("\r\n")
+
+
+class SteghideCracker:
+    """
+    Tries passphrases against a steghide cover file in parallel.
+    """
+
+    def __init__(self, steghide_path: str = "steghide", workers: int = None,
+                 timeout: float = None, checkpoint_dir: str = None,
+                 checkpoint_every: float = 5.0):
+        """
+        Args:
+            steghide_path (str): steghide executable.
+            workers (int): Concurrent steghide processes (default: CPU count).
+            timeout (float): Seconds allowed per attempt (defaults to
+                config.json "tool_timeouts").
+            checkpoint_dir (str): Where progress files go (default:
+                <cache dir>/crack).
+            checkpoint_every (float): Seconds between checkpoint writes.
+        """
+        self.scraper = SteghideScraper(steghide_path, use_cache=False, timeout=timeout)
+        self.workers = workers or os.cpu_count() or 1
+        self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else get_cache().cache_dir / "crack"
+        self.checkpoint_every = checkpoint_every
+
+    # --- checkpoints ----------------------------------------------------
+
+    def checkpoint_path(self, content_hash: str) -> Path:
+        return self.checkpoint_dir / f"{content_hash}.json"
+
+    def _load_checkpoint(self, path: Path, source: dict) -> dict:
+        try:
+            with open(path, encoding="utf-8") as fh:
+                state = json.load(fh)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        # A different wordlist or candidate set means different positions
+        return state if state.get("source") == source else {}
+
+    def _save_checkpoint(self, path: Path, state: dict):
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(".tmp")
+            with open(tmp, "w", encoding="utf-8") as fh:
+                json.dump(state, fh, indent=2)
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    # --- cracking -------------------------------------------------------
+
+    def try_passphrase(self, file_path: str, passphrase: str):
+        """
+        Run `steghide info` with one passphrase.
+
+        Returns:
+            dict: Parsed steghide info if the passphrase is right, else None.
+        """
+        # Not run_tool(): the cracker's own worker count bounds its steghide
+        # processes, and going through the shared steghide slot would cap a
+        # crack at tool_concurrency["steghide"] attempts at a time
+        with span("spawn.steghide.crack", cat="subprocess"):
+            proc = subprocess.Popen(
+                self.scraper.build_command(file_path, passphrase),
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                text=True,
+                **process_group_kwargs(),
+            )
+            try:
+                stdout, stderr = proc.communicate("\n", timeout=self.scraper.timeout)
+            except subprocess.TimeoutExpired:
+                kill_group(proc)
+                proc.communicate()
+                return None
+            except BaseException:
+                kill_group(proc)
+                proc.communicate()
+                raise
+        if not _SUCCESS_MARKER.search(stdout):
+            return None
+        return self.scraper.parse_result(stdout, stderr, proc.returncode)
+
+    def crack(self, file_path: str, wordlist: str = None, exif: dict = None,
+              ocr_text: str = None, resume: bool = True, progress=None) -> dict:
+        """
+        Search for the passphrase of file_path.
+
+        Args:
+            file_path (str): Cover file.
+            wordlist (str): Optional wordlist path, tried after mined candidates.
+            exif (dict): EXIF fields to mine (see mine_candidates()).
+            ocr_text (str): OCR text to mine.
+            resume (bool): Continue from a matching checkpoint.
+            progress (callable): Called as progress(attempts, rate) at most
+                once per second.
+
+        Returns:
+            dict: {"Passphrase": str or None, "Attempts": int, "Elapsed": float,
+                   "AttemptsPerSecond": float, "Steghide": dict (on success),
+                   "Checkpoint": str} or {"Error": ...}.
+        """
+        if not os.path.isfile(file_path):
+            return {"Error": f"File not found: {file_path}"}
+        if wordlist and not os.path.isfile(wordlist):
+            return {"Error": f"Wordlist not found: {wordlist}"}
+
+        mined = mine_candidates(file_path, exif, ocr_text)
+        source = {
+            "mined": hashlib.sha256(json.dumps(mined).encode("utf-8")).hexdigest(),
+            "wordlist": os.path.abspath(wordlist) if wordlist else None,
+        }
+        checkpoint = self.checkpoint_path(file_sha256(file_path))
+        state = self._load_checkpoint(checkpoint, source) if resume else {}
+        if state.get("found") is not None:
+            return self._summary(state["found"], state, 0.0, checkpoint, state.get("steghide"))
+
+        skip = state.get("position", 0)
+        prior_attempts = state.get("attempts", 0)
+        prior_elapsed = state.get("elapsed", 0.0)
+
+        def candidates():
+            mined_set = set(mined)
+            yield from mined
+            if wordlist:
+                for word in stream_wordlist(wordlist):
+                    if word not in mined_set:
+                        yield word
+
+        stop = threading.Event()
+        found = {}
+        done = set()        # completed positions above the low-water mark
+        position = skip     # every candidate below this has been tried
+        attempts = 0
+        start = time.time()
+        last_report = last_save = start
+
+        def attempt(index, passphrase):
+            if stop.is_set():
+                return index, None
+            try:
+                info = self.try_passphrase(file_path, passphrase)
+            except OSError as e:
+                found.setdefault("error", f"steghide not available: {e}")
+                stop.set()
+                return index, None
+            if info is not None:
+                found.setdefault("passphrase", passphrase)
+                found.setdefault("info", info)
+                stop.set()
+            return index, info
+
+        def state_now():
+            return {
+                "source": source,
+                "file": os.path.abspath(file_path),
+                "position": position,
+                "attempts": prior_attempts + attempts,
+                "elapsed": round(prior_elapsed + time.time() - start, 3),
+                "found": found.get("passphrase"),
+                "steghide": found.get("info"),
+            }
+
+        def collect(finished):
+            nonlocal attempts, position
+            for future in finished:
+                if future.cancelled():
+                    continue
+                done.add(future.result()[0])
+                attempts += 1
+            while position in done:
+                done.discard(position)
+                position += 1
+
+        pending = set()
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            try:
+                for index, passphrase in enumerate(candidates()):
+                    if index < skip:
+                        continue
+                    # Bounded look-ahead keeps memory flat for huge wordlists
+                    while len(pending) >= self.workers * 4:
+                        finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                        collect(finished)
+                    if stop.is_set():
+                        break
+                    pending.add(pool.submit(attempt, index, passphrase))
+
+                    now = time.time()
+                    if progress and now - last_report >= 1.0:
+                        progress(prior_attempts + attempts, attempts / (now - start))
+                        last_report = now
+                    if now - last_save >= self.checkpoint_every:
+                        self._save_checkpoint(checkpoint, state_now())
+                        last_save = now
+            except KeyboardInterrupt:
+                stop.set()
+                raise
+            finally:
+                # Queued attempts are pointless once stopped; running ones finish
+                if stop.is_set():
+                    for future in pending:
+                        future.cancel()
+                collect(wait(pending).done)
+                if "error" not in found:
+                    self._save_checkpoint(checkpoint, state_now())
+
+        if "error" in found and "passphrase" not in found:
+            return {"Error": found["error"]}
+        elapsed = time.time() - start
+        return self._summary(
+            found.get("passphrase"), state_now(), elapsed, checkpoint, found.get("info"),
+            rate=attempts / elapsed if elapsed > 0 else 0.0,
+        )
+
+    @staticmethod
+    def _summary(passphrase, state, elapsed, checkpoint, info=None, rate=0.0) -> dict:
+        summary = {
+            "Passphrase": passphrase,
+            "Attempts": state.get("attempts", 0),
+            "Elapsed": round(state.get("elapsed", elapsed), 2),
+            "AttemptsPerSecond": round(rate, 1),
+            "Checkpoint": str(checkpoint),
+        }
+        if info:
+            summary["Steghide"] = info
+        return summary
+
+    def display_result(self, result: dict):
+        """Pretty-print a crack() result."""
+        separator = "-" * 60
+        print("\n" + separator)
+        print(" STEGHIDE CRACK ".center(60, "-"))
+        print(separator)
+        if "Error" in result:
+            print(f"Error: {result['Error']}")
+        else:
+            found = result["Passphrase"]
+            print(f"{'Passphrase':25}: {repr(found) if found is not None else 'not found'}")
+            print(f"{'Attempts':25}: {result['Attempts']}")
+            print(f"{'Elapsed (s)':25}: {result['Elapsed']}")
+            print(f"{'Attempts/s':25}: {result['AttemptsPerSecond']}")
+            for k, v in result.get("Steghide", {}).items():
+                print(f"{k:25}: {v}")
+            print(f"{'Checkpoint':25}: {result['Checkpoint']}")
+        print(separator)
+
+
+def print_progress(attempts: int, rate: float):
+    """Default progress callback: one updating line on stderr."""
+    print(f"\r[crack] {attempts} tried, {rate:.1f}/s", end="", file=sys.stderr, flush=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    from metadata.exiftool_scraper import MetadataScraper
+
+    parser = argparse.ArgumentParser(
+        description="Crack a steghide passphrase from EXIF/filename candidates and a wordlist."
+    )
+    parser.add_argument("file", help="Cover file to crack")
+    parser.add_argument("-w", "--wordlist", help="Wordlist to stream after mined candidates")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="Concurrent steghide processes (default: CPU count)")
+    parser.add_argument("--no-resume", action="store_true", help="Ignore any saved checkpoint")
+    args = parser.parse_args()
+
+    cracker = SteghideCracker(workers=args.workers)
+    result = cracker.crack(
+        args.file,
+        wordlist=args.wordlist,
+        exif=MetadataScraper().scrape(args.file),
+        resume=not args.no_resume,
+        progress=print_progress,
+    )
+    print(file=sys.stderr)
+    cracker.display_result(result)
@@ -11,6 +11,10 @@ from pathlib import Path
 import re
 
 from metadata.exiftool_scraper import MetadataScraper
+from utils.cache import get_cache, tool_version
+from utils.config import tool_timeouts
+from utils.processes import run_tool
+from utils.tracing import span, traced
 
 
 class SteghideScraper:
@@ -18,52 +22,110 @@ class SteghideScraper:
         "UserComment", "ImageDescription", "Comment", "Artist", "Software"
     ]
 
-    def __init__(self, steghide_path: str = "steghide"):
+    def __init__(self, steghide_path: str = "steghide", use_cache: bool = True,
+                 timeout: float = None):
         self.steghide_path = steghide_path
-
-    def scrape(self, file_path: str, passphrase: str = None) -> dict:
+        self.use_cache = use_cache
+        self.timeout = timeout if timeout is not None else tool_timeouts()["steghide"]
+
+    @traced("steghide.scrape", cat="scraper")
+    def scrape(self, file_path: str, passphrase: str = None, context=None) -> dict:
+        """
+        Run `steghide info` on the file.
+
+        Args:
+            file_path (str): Path to the cover file.
+            passphrase (str): Explicit passphrase; derived from EXIF if None.
+            context (AnalysisContext): Optional per-file context. Its "exif"
+                stage supplies the EXIF fields (scraped at most once) and the
+                result is stored as its "steghide" stage.
+        """
         file = Path(file_path)
         if not file.exists():
             return {"Error": f"File not found: {file_path}"}
 
+        if context is not None and passphrase is None:
+            return dict(context.get_or_compute(
+                "steghide", lambda: self._scrape(file, None, context)
+            ))
+        return self._scrape(file, passphrase, context)
+
+    def _scrape(self, file: Path, passphrase: str = None, context=None) -> dict:
         derived = {}
         if passphrase is None:
-            exif = MetadataScraper().scrape(file_path)
-            for tag in self._PASS_TAG_CANDIDATES:
-                if tag in exif:
-                    candidate = exif[tag]
-                    if isinstance(candidate, str) and candidate.strip():
-                        passphrase = candidate.strip()
-                        derived["DerivedPassphrase"] = {tag: passphrase}
-                        break
+            exif = MetadataScraper().scrape(str(file), context=context)
+            passphrase, derived = self.derive_passphrase(exif)
+
+        if self.use_cache:
+            parsed = get_cache().fetch(
+                str(file), "steghide", self.version(),
+                self.cache_options(passphrase),
+                lambda: self._run_info(file, passphrase),
+                should_store=lambda result: "Error" not in result,
+                content_hash=context.sha256 if context is not None else None,
+            )
+        else:
+            parsed = self._run_info(file, passphrase)
+
+        if "DerivedPassphrase" in derived:
+            parsed["DerivedPassphrase"] = derived["DerivedPassphrase"]
+        return parsed
 
+    def derive_passphrase(self, exif: dict) -> tuple:
+        """
+        Pick a passphrase from the first non-empty candidate EXIF field.
+
+        Returns:
+            tuple: (passphrase or None, {"DerivedPassphrase": {tag: value}} or {})
+        """
+        for tag in self._PASS_TAG_CANDIDATES:
+            if tag in exif:
+                candidate = exif[tag]
+                if isinstance(candidate, str) and candidate.strip():
+                    passphrase = candidate.strip()
+                    return passphrase, {"DerivedPassphrase": {tag: passphrase}}
+        return None, {}
+
+    def version(self) -> str:
+        return tool_version(self.steghide_path, "--version")
+
+    @staticmethod
+    def cache_options(passphrase: str = None) -> dict:
+        return {"command": "info", "passphrase": passphrase or ""}
+
+    def build_command(self, file, passphrase: str = None) -> list:
+        """Command line for `steghide info` on file."""
         # Always provide a passphrase (even if empty) to prevent interactive prompt
-        cmd = [self.steghide_path, "info", "-p", passphrase if passphrase else "", str(file)]
+        return [self.steghide_path, "info", "-p", passphrase if passphrase else "", str(file)]
+
+    @traced("parse.steghide_info", cat="parse")
+    def parse_result(self, stdout: str, stderr: str, returncode: int) -> dict:
+        """Parse a finished `steghide info` run, adding hints on failure."""
+        if returncode == 0:
+            raw = stdout
+        else:
+            raw = (stdout or "") + "\n" + (stderr or "")
+            if "could not extract any data with that passphrase" in raw:
+                raw += (
+                "\n Steghide could not extract any data using this passphrase.\n"
+                "👉 CTF Tip: Check EXIF fields like Artist, Comment, or challenge hints for possible passwords. You can also try running this script with -p <passphrase> to test known values, or main.py --crack [wordlist] to search for it.\n"
+                )
+        return self._parse_output(raw)
 
+    def _run_info(self, file: Path, passphrase: str = None) -> dict:
+        """Run `steghide info` once and parse its output."""
         try:
             # Avoid terminal errors by feeding a newline to stdin
-            result = subprocess.run(
-                cmd,
-                input="\n",
-                capture_output=True,
-                text=True,
-                check=True,
-            )
-            raw = result.stdout
-        except subprocess.CalledProcessError as e:
-            raw_output = (e.stdout or "") + "\n" + (e.stderr or "")
-            if "could not extract any data with that passphrase" in raw_output:
-                raw_output += (
-                "\n Steghide could not extract any data using this passphrase.\n"
-                "👉 CTF Tip: Check EXIF fields like Artist, Comment, or challenge hints for possible passwords. You can also try running this script with -p <passphrase> to test known values.\n"
+            with span("spawn.steghide", cat="subprocess"):
+                result = run_tool(
+                    "steghide",
+                    self.build_command(file, passphrase),
+                    input="\n",
+                    timeout=self.timeout,
                 )
-        raw = raw_output
-
-
-        parsed = self._parse_output(raw)
-        if "DerivedPassphrase" in derived:
-            parsed["DerivedPassphrase"] = derived["DerivedPassphrase"]
-        return parsed
+        except subprocess.TimeoutExpired:
+            return {"Error": f"steghide timed out after {self.timeout}s"}
+        return self.parse_result(result.stdout, result.stderr, result.returncode)
 
     def _parse_output(self, output: str) -> dict:
         metadata = {}
@@ -1,8 +1,14 @@
 import subprocess
 import os
 import re
+import platform
 from collections import defaultdict
 
+from utils.cache import get_cache, tool_version
+from utils.config import tool_timeouts, tool_engines
+from utils.processes import run_tool, ToolCancelled
+from utils.tracing import span, traced
+
 def to_wsl_path(win_path: str) -> str:
     r"""
     Convert a Windows path (e.g. C:\Users\User\...) to a WSL path (/mnt/c/Users/User/...)
@@ -15,55 +21,145 @@ def to_wsl_path(win_path: str) -> str:
 
 
 
-def run_zsteg(image_path: str) -> str:
+# Options folded into the cache key (the modes runzsteg.sh runs)
+ZSTEG_CACHE_OPTIONS = {"modes": ["default", "-v", "-a", "-E"]}
+# ... and the detection parameters of the native engine
+NATIVE_CACHE_OPTIONS = {"limit": 256, "min_text": 8}
+
+
+def _wsl_prefix() -> list:
+    # zsteg is a Ruby gem; on Windows it lives inside WSL
+    return ["wsl"] if platform.system() == "Windows" else []
+
+
+def zsteg_version() -> str:
+    return tool_version(*_wsl_prefix(), "zsteg", "--version")
+
+
+@traced("zsteg.scrape", cat="scraper")
+def run_zsteg(image_path: str, use_cache: bool = True, context=None,
+              engine: str = None, on_output=None) -> str:
     """
-    Run zsteg via WSL on the provided image path and return filtered output.
+    Scan the image for LSB steganography and return grouped findings.
 
     Args:
-        image_path (str): Full Windows path to the image file (from GUI).
+        image_path (str): Path to the image file (from GUI or CLI).
+        use_cache (bool): Consult the shared result cache first.
+        context (AnalysisContext, optional): Per-file context; the output is
+            stored as its "zsteg" stage and the native engine scans its
+            decoded image.
+        engine (str): "native" uses the in-process NumPy engine
+            (steganography.lsb_engine); "zsteg" runs runzsteg.sh (through
+            WSL on Windows). Defaults to config.json "tool_engines".
+        on_output (callable, optional): Receives zsteg's raw output line by
+            line while runzsteg.sh runs. The native engine and cache hits
+            only return the finished result.
 
     Returns:
         str: Filtered output from zsteg or an appropriate error message.
     """
-    try:
-        # Locate script
-        script_path_win = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runzsteg.sh")
-
-        # Sanity checks
-        if not os.path.exists(script_path_win):
-            return f"❌ Error: Bash script not found:\n{script_path_win}"
-        if not os.path.exists(image_path):
-            return f"❌ Error: Image file not found:\n{image_path}"
-
-        # Convert both paths to WSL format
-        script_path_wsl = to_wsl_path(script_path_win)
-        image_path_wsl = to_wsl_path(image_path)
-
-        # Build and run WSL command
-        cmd = ["wsl", "bash", script_path_wsl, image_path_wsl]
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=120  # Increased timeout
+    engine = engine or tool_engines()["zsteg"]
+    if context is not None:
+        return context.get_or_compute(
+            "zsteg",
+            lambda: _run_zsteg_cached(image_path, use_cache, engine, context.sha256, context,
+                                      on_output),
+        )
+    return _run_zsteg_cached(image_path, use_cache, engine, on_output=on_output)
+
+
+def _run_zsteg_cached(image_path: str, use_cache: bool, engine: str,
+                      content_hash: str = None, context=None, on_output=None) -> str:
+    if engine == "native":
+        from steganography.lsb_engine import ENGINE_VERSION
+        scraper, version, options = "zsteg-native", ENGINE_VERSION, NATIVE_CACHE_OPTIONS
+        run = lambda path: run_lsb_engine(path, context)
+    else:
+        scraper, version, options = "zsteg", zsteg_version(), ZSTEG_CACHE_OPTIONS
+        run = lambda path: _run_zsteg_uncached(path, on_output)
+    if use_cache and os.path.isfile(image_path):
+        return get_cache().fetch(
+            image_path, scraper, version, options,
+            lambda: run(image_path),
+            should_store=lambda output: not output.startswith("❌"),
+            content_hash=content_hash,
         )
+    return run(image_path)
 
-        if result.returncode != 0:
-            return f"❌ Error from zsteg:\n{result.stderr.strip() or 'Unknown error'}"
 
-        raw_output = result.stdout.strip()
-        if not raw_output:
-            return "✅ Zsteg finished but returned no output."
+def run_lsb_engine(image_path: str, context=None) -> str:
+    """
+    Scan with the in-process LSB engine and group its findings; the
+    image is taken from context (decoded once for all stages) if given.
+    """
+    if not os.path.exists(image_path):
+        return f"❌ Error: Image file not found:\n{image_path}"
+    try:
+        # Imported lazily so the shell-out path works without NumPy
+        from steganography.lsb_engine import scan
+        with span("engine.lsb_scan", cat="engine"):
+            image = context.image if context is not None else image_path
+            findings = scan(image, path=image_path, **NATIVE_CACHE_OPTIONS)
+    except Exception as e:
+        return f"❌ Error: LSB scan failed: {e}"
+    return parse_and_group_zsteg("\n".join(findings))
 
-        # Parse & group zsteg output
-        return parse_and_group_zsteg(raw_output)
 
+def build_zsteg_command(image_path: str) -> list:
+    """
+    Command line that runs runzsteg.sh on image_path (through WSL on Windows).
+
+    Raises:
+        FileNotFoundError: If the bash script or the image is missing.
+    """
+    # Locate script
+    script_path_win = os.path.join(os.path.dirname(os.path.abspath(__file__)), "runzsteg.sh")
+
+    # Sanity checks
+    if not os.path.exists(script_path_win):
+        raise FileNotFoundError(f"Bash script not found:\n{script_path_win}")
+    if not os.path.exists(image_path):
+        raise FileNotFoundError(f"Image file not found:\n{image_path}")
+
+    if not _wsl_prefix():
+        return ["bash", script_path_win, image_path]
+    # Convert both paths to WSL format
+    return ["wsl", "bash", to_wsl_path(script_path_win), to_wsl_path(image_path)]
+
+
+def format_zsteg_result(returncode: int, stdout: str, stderr: str) -> str:
+    """Turn a finished runzsteg.sh run into the grouped summary text."""
+    if returncode != 0:
+        return f"❌ Error from zsteg:\n{stderr.strip() or 'Unknown error'}"
+
+    raw_output = stdout.strip()
+    if not raw_output:
+        return "✅ Zsteg finished but returned no output."
+
+    # Parse & group zsteg output
+    return parse_and_group_zsteg(raw_output)
+
+
+def _run_zsteg_uncached(image_path: str, on_output=None) -> str:
+    """Invoke runzsteg.sh and group its findings."""
+    try:
+        cmd = build_zsteg_command(image_path)
+        with span("spawn.zsteg", cat="subprocess"):
+            result = run_tool("zsteg", cmd, timeout=tool_timeouts()["zsteg"],
+                              on_output=on_output)
+        return format_zsteg_result(result.returncode, result.stdout, result.stderr)
+
+    except FileNotFoundError as e:
+        return f"❌ Error: {e}"
     except subprocess.TimeoutExpired:
         return "❌ Error: zsteg analysis timed out. Try a smaller image or check WSL status."
+    except ToolCancelled:
+        raise
     except Exception as e:
         return f"❌ Unexpected error: {str(e)}"
 
 
+@traced("parse.zsteg_group", cat="parse")
 def parse_and_group_zsteg(output: str) -> str:
     """
     Filter and group duplicate-looking zsteg lines.
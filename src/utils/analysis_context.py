@@ -0,0 +1,152 @@
+"""
+analysis_context.py
+
+Per-file state shared by every scraper working on the same file.
+
+An AnalysisContext memory-maps the file once, hashes it once, sniffs its
+type once, decodes the image once (for the LSB engine and OCR) and
+remembers the result of every completed stage ("exif", "steghide",
+"binwalk", ...), so e.g. SteghideScraper can derive its passphrase from
+the EXIF data run_metadata_chain already scraped instead of running
+exiftool a second time.
+"""
+
+import os
+import mmap
+import hashlib
+import threading
+
+
+# (offset, magic bytes, type name); checked in order, first match wins
+_MAGIC_SIGNATURES = [
+    (0, b"\xff\xd8\xff", "jpeg"),
+    (0, b"\x89PNG\r\n\x1a\n", "png"),
+    (0, b"GIF87a", "gif"),
+    (0, b"GIF89a", "gif"),
+    (0, b"BM", "bmp"),
+    (0, b"II*\x00", "tiff"),
+    (0, b"MM\x00*", "tiff"),
+    (8, b"WEBP", "webp"),
+    (8, b"WAVE", "wav"),
+    (0, b".snd", "au"),
+    (0, b"%PDF", "pdf"),
+    (0, b"PK\x03\x04", "zip"),
+    (0, b"\x7fELF", "elf"),
+]
+
+
+class AnalysisContext:
+    """
+    Lazily computed, thread-safe artifacts for one file.
+
+    Use as a context manager (or call close()) to release the mapping.
+    """
+
+    def __init__(self, file_path: str):
+        """
+        Args:
+            file_path (str): Path to the file under analysis.
+        """
+        self.file_path = str(file_path)
+        self.results = {}
+        self._file = None
+        self._data = None
+        self._sha256 = None
+        self._file_type = None
+        self._image = None
+        self._image_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._stage_locks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    @property
+    def data(self):
+        """Read-only view of the file contents (an mmap, or b"" when empty)."""
+        with self._lock:
+            if self._data is None:
+                if os.path.getsize(self.file_path) == 0:
+                    self._data = b""
+                else:
+                    self._file = open(self.file_path, "rb")
+                    self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            return self._data
+
+    @property
+    def sha256(self) -> str:
+        """Hex SHA-256 of the file contents, computed on first use."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self.data).hexdigest()
+        return self._sha256
+
+    @property
+    def file_type(self) -> str:
+        """Short type name sniffed from the magic bytes ("jpeg", "png", ...)."""
+        if self._file_type is None:
+            header = bytes(self.data[:16])
+            self._file_type = "unknown"
+            for offset, magic, name in _MAGIC_SIGNATURES:
+                if header[offset:offset + len(magic)] == magic:
+                    self._file_type = name
+                    break
+        return self._file_type
+
+    @property
+    def image(self):
+        """
+        The file decoded as a PIL.Image, fully loaded on first use.
+
+        Shared by every stage, so treat it as read-only (copy() before
+        modifying it).
+
+        Raises:
+            PIL.UnidentifiedImageError: If the file is not an image.
+        """
+        if self._image is None:
+            with self._image_lock:
+                if self._image is None:
+                    # Imported here: contexts of non-image files never decode
+                    from PIL import Image
+                    img = Image.open(self.file_path)
+                    img.load()
+                    self._image = img
+        return self._image
+
+    def has(self, stage: str) -> bool:
+        return stage in self.results
+
+    def get(self, stage: str, default=None):
+        return self.results.get(stage, default)
+
+    def set(self, stage: str, value):
+        self.results[stage] = value
+
+    def get_or_compute(self, stage: str, compute):
+        """
+        Return the stored result of a stage, running compute() the first
+        time. Concurrent callers for the same stage wait for the first
+        computation instead of starting their own.
+        """
+        if stage in self.results:
+            return self.results[stage]
+        with self._lock:
+            stage_lock = self._stage_locks.setdefault(stage, threading.Lock())
+        with stage_lock:
+            if stage not in self.results:
+                self.results[stage] = compute()
+            return self.results[stage]
+
+    def close(self):
+        """Release the memory mapping and file handle."""
+        with self._lock:
+            if isinstance(self._data, mmap.mmap):
+                self._data.close()
+            self._data = None
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            self._image = None
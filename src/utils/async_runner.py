@@ -0,0 +1,311 @@
+"""
+async_runner.py
+
+Runs the external tools of one analysis concurrently with asyncio.
+
+ExifTool, Binwalk and Zsteg start at the same time; Steghide starts as
+soon as the EXIF data it derives its passphrase from is available. Each
+tool has its own timeout (config.json "tool_timeouts") and takes a slot
+from the process-wide per-tool limit in utils.processes (config.json
+"tool_concurrency") before it starts, so the limit holds across files,
+event loops and the synchronous scrapers alike. Tools are started in
+their own process group so a timeout or cancellation kills the whole
+tree (e.g. `wsl` plus the real binary), not just the direct child.
+
+Command lines and output parsing come from the scrapers themselves, so
+the results are the same dicts their scrape() methods return. The LSB
+and signature stages run their in-process engines on a worker thread
+unless the zsteg / binwalk shell-outs are requested.
+"""
+
+import asyncio
+import subprocess
+from collections import namedtuple
+
+from metadata.exiftool_scraper import MetadataScraper
+from steganography.steghide_scraper import SteghideScraper
+from steganography.binwalk_scraper import BinwalkScraper
+from steganography.zsteg_scraper import (
+    build_zsteg_command, format_zsteg_result, run_zsteg, zsteg_version,
+    ZSTEG_CACHE_OPTIONS,
+)
+from utils.cache import get_cache
+from utils.config import tool_timeouts, tool_engines
+from utils.processes import tool_slot, process_group_kwargs, kill_group
+from utils.tracing import span
+
+
+ToolResult = namedtuple("ToolResult", ["returncode", "stdout", "stderr", "timed_out"])
+
+
+class ToolRunner:
+    """
+    Launches tool subprocesses with per-tool timeouts, within the
+    process-wide per-tool concurrency limits (see utils.processes).
+    """
+
+    def __init__(self, timeouts: dict = None,
+                 exif_scraper: MetadataScraper = None,
+                 steghide_scraper: SteghideScraper = None,
+                 binwalk_scraper: BinwalkScraper = None):
+        """
+        Args:
+            timeouts (dict): {tool: seconds} overriding config.json.
+            exif_scraper, steghide_scraper, binwalk_scraper: Scrapers that
+                supply command lines and parsing (defaults are created).
+        """
+        self.timeouts = {**tool_timeouts(), **(timeouts or {})}
+        # The scraper's timeout also bounds its pooled stay_open requests
+        self.exif_scraper = exif_scraper or MetadataScraper(timeout=self.timeouts.get("exiftool"))
+        self.steghide_scraper = steghide_scraper or SteghideScraper()
+        self.binwalk_scraper = binwalk_scraper or BinwalkScraper()
+
+    # How often a run waiting for a tool slot tries again
+    SLOT_POLL = 0.05
+
+    @classmethod
+    async def _acquire(cls, slot):
+        # The slot is shared with other threads and event loops, so an
+        # asyncio primitive cannot guard it; polling keeps the loop free
+        # and leaves nothing to clean up when the waiting run is cancelled
+        while not slot.acquire(False):  # threading or multiprocessing semaphore
+            await asyncio.sleep(cls.SLOT_POLL)
+
+    async def run(self, tool: str, cmd: list, input: str = None) -> ToolResult:
+        """
+        Run one tool invocation.
+
+        Raises:
+            FileNotFoundError: If the executable does not exist.
+        """
+        timeout = self.timeouts.get(tool)
+        slot = tool_slot(tool)
+        if slot is None:
+            with span(f"spawn.{tool}", cat="subprocess"):
+                return await self._spawn(cmd, input, timeout)
+        await self._acquire(slot)
+        try:
+            with span(f"spawn.{tool}", cat="subprocess"):
+                return await self._spawn(cmd, input, timeout)
+        finally:
+            slot.release()
+
+    async def _spawn(self, cmd: list, input: str, timeout: float) -> ToolResult:
+        """Start cmd in its own process group and collect its output."""
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            **process_group_kwargs(),
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input.encode() if input is not None else None),
+                timeout,
+            )
+        except asyncio.TimeoutError:
+            kill_group(proc)
+            await proc.wait()
+            return ToolResult(None, "", "", True)
+        except asyncio.CancelledError:
+            kill_group(proc)
+            # Reap the child so a cancelled run leaves no zombie behind
+            await proc.wait()
+            raise
+        return ToolResult(
+            proc.returncode,
+            stdout.decode("utf-8", errors="replace"),
+            stderr.decode("utf-8", errors="replace"),
+            False,
+        )
+
+    async def _cached(self, context, scraper: str, version: str, options: dict,
+                      produce, should_store=None):
+        """Look a result up in the shared cache, producing and storing it on a miss."""
+        cache = get_cache()
+        if not cache.enabled:
+            return await produce()
+        key = cache.make_key(context.sha256, scraper, version, options)
+        hit = cache.get(key)
+        if hit is not None:
+            return hit
+        result = await produce()
+        if should_store is None or should_store(result):
+            cache.set(key, result, scraper)
+        return result
+
+    async def _version(self, fn) -> str:
+        # tool_version() spawns the tool once per process; keep it off the loop
+        return await asyncio.get_running_loop().run_in_executor(None, fn)
+
+    # --- stages -----------------------------------------------------------
+
+    async def exif(self, context) -> dict:
+        if context.has("exif"):
+            return context.get("exif")
+        scraper = self.exif_scraper
+        path = context.file_path
+        if scraper.persistent:
+            # stay_open sessions are synchronous; give them a worker thread
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: scraper.scrape(path, context=context)
+            )
+
+        async def produce():
+            cmd = scraper.build_command(path)
+            try:
+                result = await self.run("exiftool", cmd)
+            except FileNotFoundError as e:
+                return scraper.parse_result(path, None, error=str(e))
+            if result.timed_out:
+                return scraper.parse_result(
+                    path, None, error=f"ExifTool timed out after {self.timeouts.get('exiftool')}s"
+                )
+            if result.returncode != 0:
+                error = str(subprocess.CalledProcessError(result.returncode, cmd))
+                return scraper.parse_result(path, None, error=error)
+            return scraper.parse_result(path, result.stdout)
+
+        if scraper.use_cache:
+            data = await self._cached(
+                context, "exiftool", await self._version(scraper._version),
+                scraper._CACHE_OPTIONS, produce, scraper._cacheable,
+            )
+        else:
+            data = await produce()
+        context.set("exif", data)
+        return data
+
+    async def steghide(self, context, exif_task) -> dict:
+        if context.has("steghide"):
+            return dict(context.get("steghide"))
+        scraper = self.steghide_scraper
+        path = context.file_path
+        passphrase, derived = scraper.derive_passphrase(await exif_task)
+
+        async def produce():
+            try:
+                result = await self.run(
+                    "steghide", scraper.build_command(path, passphrase), input="\n"
+                )
+            except FileNotFoundError as e:
+                return {"Error": f"steghide not available: {e}"}
+            if result.timed_out:
+                return {"Error": f"steghide timed out after {self.timeouts.get('steghide')}s"}
+            return scraper.parse_result(result.stdout, result.stderr, result.returncode)
+
+        if scraper.use_cache:
+            parsed = await self._cached(
+                context, "steghide", await self._version(scraper.version),
+                scraper.cache_options(passphrase), produce,
+                lambda result: "Error" not in result,
+            )
+        else:
+            parsed = await produce()
+        parsed.update(derived)
+        context.set("steghide", parsed)
+        return dict(parsed)
+
+    async def binwalk(self, context) -> dict:
+        if context.has("binwalk"):
+            return context.get("binwalk")
+        scraper = self.binwalk_scraper
+        path = context.file_path
+        if scraper.engine == "native":
+            # In-process scan (large files fan out to their own process pool)
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: scraper.scrape(path, context=context)
+            )
+
+        async def produce():
+            try:
+                result = await self.run("binwalk", scraper.build_command(path))
+            except FileNotFoundError as e:
+                return {"Signatures": [], "RawOutput": "",
+                        "Error": f"binwalk not available: {e}"}
+            if result.timed_out:
+                return {"Signatures": [], "RawOutput": "",
+                        "Error": f"binwalk timed out after {self.timeouts.get('binwalk')}s"}
+            return scraper.parse_result(result.stdout, result.stderr, result.returncode, path)
+
+        if scraper.use_cache:
+            data = await self._cached(
+                context, "binwalk", await self._version(scraper.version),
+                {"extract": False}, produce, lambda result: "Error" not in result,
+            )
+        else:
+            data = await produce()
+        context.set("binwalk", data)
+        return data
+
+    async def zsteg(self, context, engine: str = None) -> str:
+        if context.has("zsteg"):
+            return context.get("zsteg")
+        path = context.file_path
+        engine = engine or tool_engines()["zsteg"]
+        if engine == "native":
+            # In-process NumPy scan; NumPy releases the GIL for the heavy parts
+            return await asyncio.get_running_loop().run_in_executor(
+                None, lambda: run_zsteg(path, context=context, engine=engine)
+            )
+
+        async def produce():
+            try:
+                result = await self.run("zsteg", build_zsteg_command(path))
+            except FileNotFoundError as e:
+                return f"❌ Error: {e}"
+            if result.timed_out:
+                return "❌ Error: zsteg analysis timed out. Try a smaller image or check WSL status."
+            return format_zsteg_result(result.returncode, result.stdout, result.stderr)
+
+        output = await self._cached(
+            context, "zsteg", await self._version(zsteg_version), ZSTEG_CACHE_OPTIONS,
+            produce, lambda result: not result.startswith("❌"),
+        )
+        context.set("zsteg", output)
+        return output
+
+    async def analyze(self, context, include_zsteg: bool = False, on_result=None) -> dict:
+        """
+        Run every tool for one file concurrently.
+
+        Args:
+            context (AnalysisContext): File under analysis.
+            include_zsteg (bool): Also run the LSB stage.
+            on_result (callable): Called as on_result(stage, result) the
+                moment each stage finishes, e.g. to stream it out.
+
+        Returns:
+            dict: {"exif": ..., "steghide": ..., "binwalk": ...[, "zsteg": ...]}
+            holding exactly what the corresponding scrape() calls return.
+        """
+        async def reported(stage, awaitable):
+            with span(f"stage.{stage}", cat="pipeline"):
+                result = await awaitable
+            if on_result is not None:
+                on_result(stage, result)
+            return result
+
+        exif_task = asyncio.ensure_future(self.exif(context))
+        stages = {
+            "exif": exif_task,
+            "steghide": asyncio.ensure_future(self.steghide(context, exif_task)),
+            "binwalk": asyncio.ensure_future(self.binwalk(context)),
+        }
+        if include_zsteg:
+            stages["zsteg"] = asyncio.ensure_future(self.zsteg(context))
+        reports = [asyncio.ensure_future(reported(name, task)) for name, task in stages.items()]
+        try:
+            await asyncio.gather(*reports)
+        except BaseException:
+            for task in [*stages.values(), *reports]:
+                task.cancel()
+            raise
+        return {name: task.result() for name, task in stages.items()}
+
+
+def run_tools(context, timeouts: dict = None, include_zsteg: bool = False,
+              on_result=None) -> dict:
+    """Synchronous entry point: run ToolRunner.analyze() on its own event loop."""
+    return asyncio.run(ToolRunner(timeouts).analyze(context, include_zsteg, on_result))
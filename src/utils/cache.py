@@ -0,0 +1,354 @@
+"""
+cache.py
+
+Content-addressed, disk-backed result cache shared by all scrapers.
+
+Entries are keyed by the SHA-256 of the analysed file plus the scraper
+name, the tool version and the options that influence the output, so a
+re-run on identical bytes (even under another name) never re-executes
+exiftool, steghide, binwalk, zsteg or tesseract. The store is a small
+SQLite database with size-bounded LRU eviction.
+
+Lookups only read the database. Access times and hit/miss counters are
+kept in memory and written in one transaction with the next set(), at
+most every FLUSH_INTERVAL seconds otherwise, and at exit, so parallel
+readers do not queue on SQLite's write lock.
+
+Environment:
+    BIGSISTER_CACHE_DIR     Cache location (default ~/.cache/bigsister)
+    BIGSISTER_CACHE_MAX_MB  Size bound in MiB (default 512)
+    BIGSISTER_NO_CACHE      Set to any non-empty value to bypass the cache
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+import atexit
+import subprocess
+from collections import OrderedDict
+from functools import lru_cache
+from pathlib import Path
+
+from utils.file_handler import file_sha256
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key      TEXT PRIMARY KEY,
+    scraper  TEXT NOT NULL,
+    value    TEXT NOT NULL,
+    size     INTEGER NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed);
+CREATE TABLE IF NOT EXISTS counters (
+    name  TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+"""
+
+
+@lru_cache(maxsize=None)
+def tool_version(*cmd: str) -> str:
+    """
+    Return the first line a tool prints for its version command, e.g.
+    tool_version("exiftool", "-ver"). Memoized per process; "unknown" if
+    the tool is missing or silent.
+    """
+    try:
+        result = subprocess.run(
+            list(cmd), capture_output=True, text=True, timeout=15
+        )
+    except (OSError, subprocess.SubprocessError):
+        return "unknown"
+    for line in (result.stdout + "\n" + result.stderr).splitlines():
+        if line.strip():
+            return line.strip()
+    return "unknown"
+
+
+class ResultCache:
+    """
+    Size-bounded LRU cache of scraper results stored in SQLite.
+
+    All failures of the cache itself (locked database, disk full,
+    unserializable value) are swallowed: the cache must never be the
+    reason an analysis fails.
+    """
+
+    # Seconds between writes of buffered access times and counters
+    FLUSH_INTERVAL = 5.0
+    # Buffered accesses that force a write regardless of the interval
+    FLUSH_BATCH = 512
+    # (path, size, mtime) -> SHA-256 memo entries kept by file_hash()
+    HASH_MEMO_SIZE = 4096
+
+    def __init__(self, cache_dir: str = None, max_bytes: int = None, enabled: bool = None):
+        """
+        Args:
+            cache_dir (str): Directory holding results.sqlite3.
+            max_bytes (int): Upper bound on the stored payload size.
+            enabled (bool): False bypasses the cache entirely. Defaults to
+                True unless BIGSISTER_NO_CACHE is set.
+        """
+        if cache_dir is None:
+            cache_dir = os.environ.get("BIGSISTER_CACHE_DIR") or (
+                Path.home() / ".cache" / "bigsister"
+            )
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("BIGSISTER_CACHE_MAX_MB", "512")) * 1024 * 1024
+        if enabled is None:
+            enabled = not os.environ.get("BIGSISTER_NO_CACHE")
+
+        self.cache_dir = Path(cache_dir)
+        self.db_path = self.cache_dir / "results.sqlite3"
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._hashes = OrderedDict()
+        self._hash_lock = threading.Lock()
+        self._reset_pending()
+
+    # --- keys -----------------------------------------------------------
+
+    def file_hash(self, file_path: str) -> str:
+        """SHA-256 of a file, memoized on (path, size, mtime) for this process."""
+        st = os.stat(file_path)
+        memo_key = (os.path.abspath(file_path), st.st_size, st.st_mtime_ns)
+        with self._hash_lock:
+            digest = self._hashes.get(memo_key)
+            if digest is not None:
+                self._hashes.move_to_end(memo_key)
+                return digest
+        digest = file_sha256(file_path)
+        with self._hash_lock:
+            self._hashes[memo_key] = digest
+            while len(self._hashes) > self.HASH_MEMO_SIZE:
+                self._hashes.popitem(last=False)
+        return digest
+
+    def make_key(self, content_hash: str, scraper: str, version: str, options: dict = None) -> str:
+        """Combine content hash, scraper, tool version and options into a key."""
+        material = json.dumps(
+            [content_hash, scraper, version, options or {}],
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # --- storage --------------------------------------------------------
+
+    def _connection(self):
+        # SQLite handles must not cross a fork; reopen in child processes
+        if self._conn is None or self._pid != os.getpid():
+            if self._pid is not None and self._pid != os.getpid():
+                self._reset_pending()  # the parent writes its own
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(_SCHEMA)
+            self._conn = conn
+            self._pid = os.getpid()
+        return self._conn
+
+    def _reset_pending(self):
+        self._touched = {}  # key -> last access time not yet written
+        self._counts = {"hits": 0, "misses": 0}
+        self._last_flush = time.monotonic()
+
+    def _write_pending(self, conn):
+        """Write buffered access times and counters (inside a transaction)."""
+        if self._touched:
+            conn.executemany(
+                "UPDATE entries SET accessed = ? WHERE key = ?",
+                [(accessed, key) for key, accessed in self._touched.items()],
+            )
+        conn.executemany(
+            "INSERT INTO counters (name, value) VALUES (?, ?) "
+            "ON CONFLICT(name) DO UPDATE SET value = value + excluded.value",
+            [(name, count) for name, count in self._counts.items() if count],
+        )
+        self._reset_pending()
+
+    def flush(self):
+        """Write buffered access times and counters now."""
+        if not self._touched and not any(self._counts.values()):
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    self._write_pending(conn)
+        except sqlite3.Error:
+            pass
+
+    def get(self, key: str):
+        """Return the cached value for key, or None on a miss."""
+        if not self.enabled:
+            return None
+        try:
+            with self._lock:
+                row = self._connection().execute(
+                    "SELECT value FROM entries WHERE key = ?", (key,)
+                ).fetchone()
+                if row:
+                    self._touched[key] = time.time()
+                self._counts["hits" if row else "misses"] += 1
+                due = (len(self._touched) >= self.FLUSH_BATCH
+                       or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL)
+        except sqlite3.Error:
+            row, due = None, False
+        if due:
+            self.flush()
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value, scraper: str = ""):
+        """Store a JSON-serializable value and evict LRU entries over the bound."""
+        if not self.enabled:
+            return
+        try:
+            payload = json.dumps(value, default=str)
+        except (TypeError, ValueError):
+            return
+        size = len(payload.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO entries (key, scraper, value, size, accessed) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (key, scraper, payload, size, time.time()),
+                    )
+                    self._touched.pop(key, None)
+                    self._write_pending(conn)
+                    self._evict(conn)
+        except sqlite3.Error:
+            pass
+
+    def _evict(self, conn):
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM entries ORDER BY accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM entries WHERE key = ?", victims)
+
+    def fetch(self, file_path: str, scraper: str, version: str, options: dict,
+              compute, should_store=None, content_hash: str = None):
+        """
+        Return the cached result for this file/scraper/version/options, or
+        run compute() and store its result.
+
+        Args:
+            file_path (str): File being analysed (hashed for the key).
+            scraper (str): Scraper name, e.g. "binwalk".
+            version (str): Tool version string.
+            options (dict): Options that change the output.
+            compute (callable): Produces the result on a miss.
+            should_store (callable): Optional predicate; results for which
+                it returns False (errors, timeouts) are not cached.
+            content_hash (str): Precomputed SHA-256 of the file, if known.
+        """
+        if not self.enabled:
+            return compute()
+        try:
+            digest = content_hash or self.file_hash(file_path)
+        except OSError:
+            return compute()
+
+        key = self.make_key(digest, scraper, version, options)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        result = compute()
+        if should_store is None or should_store(result):
+            self.set(key, result, scraper)
+        return result
+
+    def stats(self) -> dict:
+        """Hit/miss counters for this process plus persisted totals."""
+        info = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "location": str(self.db_path),
+        }
+        self.flush()
+        try:
+            with self._lock:
+                conn = self._connection()
+                entries, size = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+                ).fetchone()
+                totals = dict(conn.execute("SELECT name, value FROM counters"))
+            info.update({
+                "entries": entries,
+                "bytes": size,
+                "total_hits": totals.get("hits", 0),
+                "total_misses": totals.get("misses", 0),
+            })
+        except sqlite3.Error:
+            pass
+        return info
+
+    def clear(self):
+        """Remove every entry and reset the persisted counters."""
+        try:
+            with self._lock:
+                conn = self._connection()
+                with conn:
+                    conn.execute("DELETE FROM entries")
+                    conn.execute("DELETE FROM counters")
+                self._reset_pending()
+        except sqlite3.Error:
+            pass
+        self.hits = self.misses = 0
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_cache() -> ResultCache:
+    """Return the process-wide ResultCache (flushed at interpreter exit)."""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResultCache()
+            atexit.register(_default_cache.flush)
+        return _default_cache
+
+
+def set_cache_enabled(enabled: bool):
+    """
+    Globally enable or bypass the cache. Also exported through the
+    environment so process-pool workers inherit the choice.
+    """
+    if enabled:
+        os.environ.pop("BIGSISTER_NO_CACHE", None)
+    else:
+        os.environ["BIGSISTER_NO_CACHE"] = "1"
+    get_cache().enabled = enabled
+
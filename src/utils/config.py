@@ -0,0 +1,63 @@
+"""
+config.py
+
+Loads the project-level config.json (one directory above src/), or the
+file named by the BIGSISTER_CONFIG environment variable. Missing files
+or sections fall back to built-in defaults.
+"""
+
+import os
+import json
+from functools import lru_cache
+from pathlib import Path
+
+CONFIG_PATH = Path(
+    os.environ.get("BIGSISTER_CONFIG") or Path(__file__).resolve().parents[2] / "config.json"
+)
+
+DEFAULT_TOOL_TIMEOUTS = {
+    "exiftool": 30,
+    "steghide": 30,
+    "binwalk": 120,
+    "zsteg": 120,
+    "tesseract": 60,
+}
+
+DEFAULT_TOOL_CONCURRENCY = {
+    "exiftool": 4,
+    "steghide": 4,
+    "binwalk": 2,
+    "zsteg": 2,
+    "tesseract": 4,
+}
+
+# "native" uses the in-process engines; the tool name runs its CLI
+DEFAULT_TOOL_ENGINES = {
+    "binwalk": "native",
+    "zsteg": "native",
+}
+
+
+@lru_cache(maxsize=None)
+def load_config(path: str = None) -> dict:
+    """Return the parsed config.json, or {} if it is missing or invalid."""
+    try:
+        with open(path or CONFIG_PATH, encoding="utf-8") as fh:
+            return json.load(fh)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def tool_timeouts() -> dict:
+    """Per-tool timeouts in seconds (config.json "tool_timeouts" over defaults)."""
+    return {**DEFAULT_TOOL_TIMEOUTS, **load_config().get("tool_timeouts", {})}
+
+
+def tool_concurrency() -> dict:
+    """Per-tool process limits (config.json "tool_concurrency" over defaults)."""
+    return {**DEFAULT_TOOL_CONCURRENCY, **load_config().get("tool_concurrency", {})}
+
+
+def tool_engines() -> dict:
+    """Signature/LSB engine per tool (config.json "tool_engines" over defaults)."""
+    return {**DEFAULT_TOOL_ENGINES, **load_config().get("tool_engines", {})}
@@ -22,4 +22,13 @@ def create_directory(directory_path):
     """Creates a directory if it does not exist."""
     import os
     if not os.path.exists(directory_path):
-        os.makedirs(directory_path)
\ No newline at end of file
+        os.makedirs(directory_path)
+
+def file_sha256(file_path, chunk_size=1024 * 1024):
+    """Returns the hex SHA-256 digest of a file's contents, read in chunks."""
+    import hashlib
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as file:
+        for chunk in iter(lambda: file.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
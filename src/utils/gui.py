@@ -1,8 +1,12 @@
+import time
+import queue
 import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
-from PIL import Image, ImageTk
-import os, subprocess, shutil
+from functools import partial
+from concurrent.futures import ThreadPoolExecutor
+from PIL import ImageTk
+import os
 
 from metadata.parser import MetadataParser
 from metadata.iris_parser import IrisParser
@@ -10,12 +14,35 @@ from metadata.exiftool_scraper import MetadataScraper
 from steganography.steghide_scraper import SteghideScraper
 from steganography.binwalk_scraper import BinwalkScraper
 from iris.image_search import ImageSearchIRIS
+from iris.browser_pool import get_browser_pool
 from steganography.zsteg_scraper import run_zsteg, parse_and_group_zsteg
 
 from ocr.ocr_engine import OCREngine
+from utils.analysis_context import AnalysisContext
+from utils.processes import cancel_scope, ToolCancelled
+from utils.tracing import span
+from utils.thumbnails import get_thumbnail_cache
+from utils.output_view import OutputView
+
+
+class _Job:
+    """One scraper action running on BigSisterGUI's executor."""
+
+    def __init__(self, label, context):
+        self.label = label
+        self.context = context
+        self.cancelled = threading.Event()
+        self.started = time.perf_counter()
+        self.future = None
 
 
 class BigSisterGUI(tk.Tk):
+    # Scraper actions run on a shared pool; results come back through a
+    # queue the Tk thread drains every POLL_MS (Tk is not thread-safe)
+    MAX_WORKERS = 6  # every "Analyze All" stage at once
+    POLL_MS = 50
+    PREVIEW_SIZE = (800, 500)
+
     def __init__(self):
         super().__init__()
         self.title("🕵️‍♀️ Big Sister – OSINT Image Toolkit")
@@ -23,13 +50,25 @@ class BigSisterGUI(tk.Tk):
         self.minsize(950, 600)
         self.current_file = None
         self.is_dark_mode = False  # Track dark mode state
-        self.iris = None  # Initialize IRIS attribute
+        self.iris = None  # ImageSearchIRIS of the search in progress
+        self.search_future = None
+        self.photo = None  # PhotoImage on the Image View canvas; survives layout rebuilds
+        self.context = None  # AnalysisContext for current_file, shared by all actions
+        self.executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS,
+                                           thread_name_prefix="gui-worker")
+        self._results = queue.Queue()  # callables to run on the Tk thread
+        self._jobs = {}  # tab attribute -> _Job currently shown in that tab
+        self._live_jobs = set()  # jobs whose worker has not finished
+        self._retired_contexts = []  # closed once no live job uses them
+        self.tab_status = {}
         self._set_theme()  # Apply the initial theme
         self._build_layout()
         
         # Ensure Contributors button is enabled by default
-        if hasattr(self, 'action_buttons') and len(self.action_buttons) > 7:
-            self.action_buttons[7].state(["!disabled"])  # Contributors button
+        if hasattr(self, 'action_buttons') and self.action_buttons:
+            self.action_buttons[-1].state(["!disabled"])  # Contributors button
+
+        self._poll_id = self.after(self.POLL_MS, self._poll_results)
 
     def _set_theme(self):
         style = ttk.Style(self)
@@ -102,6 +141,7 @@ class BigSisterGUI(tk.Tk):
 
         buttons = [
             ("🖼 View Image", self._view_image),
+            ("⚡ Analyze All", self._analyze_all),
             ("🔍 Analyze Metadata", self._show_metadata),
             ("🎯 IRIS Analysis", self._show_iris_analysis),
             ("🔐 Steghide Scan", self._show_steghide),
@@ -127,25 +167,224 @@ class BigSisterGUI(tk.Tk):
 
         # Create all tabs for the notebook
         self._add_text_tab("Metadata", "txt_meta")
+        self._add_text_tab("IRIS", "txt_iris")
         self._add_image_tab()
         self._add_text_tab("Steghide", "txt_steg")
-        self._add_text_tab("Binwalk", "txt_binwalk")
-        self._add_text_tab("Zsteg", "txt_zsteg")
+        # Output of these two can run to tens of thousands of lines
+        self._add_text_tab("Binwalk", "txt_binwalk", virtual=True)
+        self._add_text_tab("Zsteg", "txt_zsteg", virtual=True)
         self._add_image_search_tab()
         self._add_text_tab("OCR Output", "txt_ocr")
         self._add_text_tab("Contributors", "txt_contributors")
 
-    def _add_text_tab(self, label, attr_name):
+    def _add_text_tab(self, label, attr_name, virtual=False):
         frame = ttk.Frame(self.notebook)
-        textbox = tk.Text(frame, wrap="word", bg=self.textbox_bg, relief="flat", font=("Consolas", 10), fg=self.textbox_fg)
-        textbox.pack(fill="both", expand=True, padx=10, pady=10)
+        if attr_name != "txt_contributors":
+            self._add_status_bar(frame, attr_name)
+        if virtual:
+            textbox = OutputView(frame, bg=self.textbox_bg, fg=self.textbox_fg)
+            textbox.pack(fill="both", expand=True)
+        else:
+            textbox = tk.Text(frame, wrap="word", bg=self.textbox_bg, relief="flat", font=("Consolas", 10), fg=self.textbox_fg)
+            textbox.pack(fill="both", expand=True, padx=10, pady=10)
         setattr(self, attr_name, textbox)
         self.notebook.add(frame, text=label)
 
+    def _add_status_bar(self, frame, attr_name):
+        """Progress bar, status text and Cancel button for a tab's job."""
+        bar = ttk.Frame(frame)
+        bar.pack(fill="x", padx=10, pady=(10, 0))
+        btn_cancel = ttk.Button(bar, text="🛑 Cancel", state="disabled",
+                                command=lambda: self._cancel_job(attr_name))
+        btn_cancel.pack(side="right")
+        progress = ttk.Progressbar(bar, mode="indeterminate", length=120)
+        progress.pack(side="right", padx=10)
+        status = ttk.Label(bar, text="Idle", foreground="#7f8c8d")
+        status.pack(side="left")
+        self.tab_status[attr_name] = (status, progress, btn_cancel)
+
+    def _set_status(self, tab, text, busy=False):
+        status, progress, btn_cancel = self.tab_status[tab]
+        status.config(text=text)
+        if busy:
+            progress.start(15)
+            btn_cancel.state(["!disabled"])
+        else:
+            progress.stop()
+            btn_cancel.state(["disabled"])
+
+    # --- background jobs ------------------------------------------------
+
+    def _run_job(self, tab, label, work, render, select=True, stream=False):
+        """
+        Run work() on the executor and render(result) on the Tk thread.
+
+        work must not touch Tk; anything it needs from the window
+        (current_file, the AnalysisContext) is read before submitting.
+        It runs inside a cancel_scope() tied to the job, so cancelling the
+        job kills the tool process it is waiting on. A new job for a tab
+        replaces the one still running there.
+
+        Args:
+            tab (str): Attribute name of the tab's Text widget.
+            label (str): What the job does, for the status bar.
+            work (callable): Blocking part, run on a worker thread.
+            render (callable): Called with work()'s result on the Tk thread.
+            select (bool): Bring the tab to the front.
+            stream (bool): Call work(emit) instead; text passed to emit from
+                the worker is appended to the tab while the job runs (see
+                _stream_output()).
+        """
+        self._cancel_job(tab, quiet=True)
+        job = _Job(label, self.context)
+        self._jobs[tab] = job
+        self._live_jobs.add(job)
+        self._set_status(tab, f"⏳ {label}...", busy=True)
+        if select:
+            self.notebook.select(getattr(self, tab).master)
+        if stream:
+            emit = self._stream_output(tab, job)
+            work = partial(work, emit)
+
+        def run():
+            try:
+                if job.cancelled.is_set():
+                    outcome = None
+                else:
+                    with cancel_scope(job.cancelled):
+                        outcome = (True, work())
+            except ToolCancelled:
+                outcome = None
+            except Exception as e:
+                outcome = (False, e)
+            self._call_soon(lambda: self._finish_job(tab, job, outcome, render))
+
+        job.future = self.executor.submit(run)
+
+    def _stream_output(self, tab, job):
+        """
+        emit(text) for a streaming job: text from the worker is collected
+        and appended to the tab in one batch per Tk poll, and dropped once
+        the job is cancelled or replaced.
+        """
+        pending = []
+        lock = threading.Lock()
+
+        def flush():
+            with lock:
+                text = "".join(pending)
+                pending.clear()
+            if self._jobs.get(tab) is job and not job.cancelled.is_set():
+                self._write(getattr(self, tab), text)
+
+        def emit(text):
+            with lock:
+                pending.append(text)
+                first = len(pending) == 1
+            if first:
+                self._call_soon(flush)
+
+        return emit
+
+    def _finish_job(self, tab, job, outcome, render):
+        self._live_jobs.discard(job)
+        if self._jobs.get(tab) is not job or job.cancelled.is_set() or outcome is None:
+            return  # superseded or cancelled: the result is stale
+        del self._jobs[tab]
+        elapsed = time.perf_counter() - job.started
+        ok, value = outcome
+        if ok:
+            try:
+                render(value)
+            except Exception as e:
+                ok, value = False, e
+        if ok:
+            self._set_status(tab, f"✅ {job.label} finished in {elapsed:.1f}s")
+        else:
+            widget = getattr(self, tab)
+            if isinstance(widget, (tk.Text, OutputView)):
+                self._set_status(tab, f"❌ {job.label} failed")
+                self._write(widget, f"❌ {job.label} failed:\n{value}\n", clear=True)
+            else:
+                self._set_status(tab, f"❌ {job.label} failed: {value}")
+
+    def _cancel_job(self, tab, quiet=False):
+        """
+        Cancel the job shown in a tab. A job still queued never starts; the
+        process group of a running external tool (exiftool, steghide,
+        binwalk, zsteg or tesseract) is killed, which frees its worker at
+        once. Work in the in-process engines runs to completion and its
+        result is dropped.
+        """
+        job = self._jobs.pop(tab, None)
+        if job is None:
+            return
+        job.cancelled.set()
+        if job.future.cancel():
+            self._live_jobs.discard(job)
+        if not quiet:
+            self._set_status(tab, f"🛑 {job.label} cancelled")
+
+    def _cancel_all_jobs(self):
+        for tab in list(self._jobs):
+            self._cancel_job(tab)
+
+    def has_pending_jobs(self) -> bool:
+        """True while any tab is waiting for a job's result."""
+        return bool(self._jobs)
+
+    def _call_soon(self, callback):
+        """Run callback on the Tk thread; safe to call from any thread."""
+        self._results.put(callback)
+
+    def _poll_results(self):
+        while True:
+            try:
+                callback = self._results.get_nowait()
+            except queue.Empty:
+                break
+            callback()
+        self._close_retired_contexts()
+        self._poll_id = self.after(self.POLL_MS, self._poll_results)
+
+    def _retire_context(self):
+        """Drop the current AnalysisContext, closing it once no job uses it."""
+        if self.context is not None:
+            self._retired_contexts.append(self.context)
+            self.context = None
+        self._close_retired_contexts()
+
+    def _close_retired_contexts(self):
+        in_use = {id(job.context) for job in self._live_jobs}
+        keep = []
+        for context in self._retired_contexts:
+            if id(context) in in_use:
+                keep.append(context)
+            else:
+                context.close()
+        self._retired_contexts = keep
+
+    @staticmethod
+    def _write(textbox, text, clear=False):
+        if isinstance(textbox, OutputView):
+            if clear:
+                textbox.clear()
+            textbox.append(text)
+            return
+        textbox.config(state="normal")
+        if clear:
+            textbox.delete("1.0", "end")
+        textbox.insert("end", text)
+        textbox.config(state="disabled")
+
     def _add_image_tab(self):
         frame = ttk.Frame(self.notebook)
+        self._add_status_bar(frame, "canvas")
         self.canvas = tk.Canvas(frame, background=self.textbox_bg, relief="flat")
         self.canvas.pack(fill="both", expand=True, padx=10, pady=10)
+        # Keep the preview centred however the canvas is resized
+        self.canvas.bind("<Configure>", lambda e: self.canvas.coords(
+            "preview", e.width // 2, e.height // 2))
         self.notebook.add(frame, text="Image View")
 
     def _browse_file(self):
@@ -154,10 +393,14 @@ class BigSisterGUI(tk.Tk):
             return
         self.current_file = path
         self.lbl_file.config(text=os.path.basename(path))
+        # Results still coming for the previous file would land in the wrong tabs
+        self._cancel_all_jobs()
+        # Re-selecting a file starts a fresh analysis, even for the same path
+        self._retire_context()
         
         # Enable all buttons except keep Contributors always enabled
         for i, btn in enumerate(self.action_buttons):
-            if i == 7:  # Contributors button index (0-based, counting from 0)
+            if i == len(self.action_buttons) - 1:  # Contributors button (always last)
                 btn.state(["!disabled"])  # Keep enabled
             else:
                 btn.state(["!disabled"])  # Enable when file is selected
@@ -165,91 +408,141 @@ class BigSisterGUI(tk.Tk):
         # Display image immediately after selecting
         self._view_image()
 
+    def _analysis_context(self):
+        """Return the AnalysisContext of current_file, replacing a stale one."""
+        if self.context is None or self.context.file_path != self.current_file:
+            self._retire_context()
+            self.context = AnalysisContext(self.current_file)
+        return self.context
+
     def _view_image(self):
         if not self.current_file:
             return
-        img = Image.open(self.current_file)
-        img.thumbnail((800, 500), Image.Resampling.LANCZOS)
-        self.photo = ImageTk.PhotoImage(img)
+        thumbnails = get_thumbnail_cache()
+        cached = thumbnails.peek(self.current_file, self.PREVIEW_SIZE)
+        if cached is not None:
+            self._cancel_job("canvas", quiet=True)
+            self._show_preview(cached)
+            self._set_status("canvas", "Idle")
+            self.notebook.select(self.canvas.master)
+            return
+        # Decoding a 100 MP TIFF takes seconds: do it (at reduced size) off the Tk thread
+        path = self.current_file
+        self.canvas.delete("all")
+        self._run_job("canvas", "Loading preview",
+                      lambda: thumbnails.get(path, self.PREVIEW_SIZE), self._show_preview)
+
+    def _show_preview(self, img):
+        with span("gui.render.image", cat="gui"):
+            self.photo = ImageTk.PhotoImage(img)
+            self._draw_preview()
+
+    def _draw_preview(self):
         self.canvas.delete("all")
+        if self.photo is None:
+            return
         self.canvas.create_image(
             self.canvas.winfo_width() // 2,
             self.canvas.winfo_height() // 2,
             image=self.photo,
-            anchor="center"
+            anchor="center",
+            tags="preview",
         )
-        self.notebook.select(self.canvas.master)
 
-    def _show_metadata(self):
-        scraper = MetadataScraper()
-        data = scraper.scrape(self.current_file)
-        parsed = MetadataParser().parse_exif(data)
+    def _show_metadata(self, select=True):
+        path, context = self.current_file, self._analysis_context()
+
+        def work():
+            scraper = MetadataScraper()
+            data = scraper.scrape(path, context=context)
+            parsed = MetadataParser().parse_exif(data)
+            return parsed, scraper.check_timestamp_anomaly(path, data)
+
+        def render(result):
+            parsed, anomalies = result
+            with span("gui.render.metadata", cat="gui"):
+                self.txt_meta.config(state="normal")
+                self.txt_meta.delete("1.0", "end")
+
+                for k, v in parsed.items():
+                    self.txt_meta.insert("end", f"{k:25}: {v}\n")
+
+                #print anomalies if there are any
+                if anomalies:
+                    self.txt_meta.insert("end", "\n⚠️  ANOMALIES DETECTED\n")
+                    self.txt_meta.insert("end", "=" * 50 + "\n")
+                    for k, v in anomalies.items():
+                        self.txt_meta.insert("end", f"🚨 {k}: {v}\n")
+                else:
+                    self.txt_meta.insert("end", "\n✅ No timestamp anomalies detected.\n")
 
-        anomalies = scraper.check_timestamp_anomaly(self.current_file, data)
+                self.txt_meta.config(state="disabled")
 
-        self.txt_meta.config(state="normal")
-        self.txt_meta.delete("1.0", "end")
+        self._run_job("txt_meta", "Metadata analysis", work, render, select)
 
-        for k, v in parsed.items():
-            self.txt_meta.insert("end", f"{k:25}: {v}\n")
+    def _show_steghide(self, select=True):
+        path, context = self.current_file, self._analysis_context()
 
-        #print anomalies if there are any
-        if anomalies:
-            self.txt_meta.insert("end", "\n⚠️  ANOMALIES DETECTED\n")
-            self.txt_meta.insert("end", "=" * 50 + "\n")
-            for k, v in anomalies.items():
-                self.txt_meta.insert("end", f"🚨 {k}: {v}\n")
-        else:
-            self.txt_meta.insert("end", "\n✅ No timestamp anomalies detected.\n")
-
-        self.txt_meta.config(state="disabled")
-        self.notebook.select(self.txt_meta.master)
-
-    def _show_steghide(self):
-        scraper = SteghideScraper()
-        data = scraper.scrape(self.current_file)
-        self.txt_steg.config(state="normal")
-        self.txt_steg.delete("1.0", "end")
-        if "RawOutput" in data:
-            if "DerivedPassphrase" in data:
-                self.txt_steg.insert("end", f"Used passphrase: {list(data['DerivedPassphrase'].values())[0]}\n")
-            self.txt_steg.insert("end", data["RawOutput"])
-        else:
-            for k, v in data.items():
-                self.txt_steg.insert("end", f"{k}: {v}\n")
-        self.txt_steg.config(state="disabled")
-        self.notebook.select(self.txt_steg.master)
-
-    def _show_binwalk(self):
-        scraper = BinwalkScraper()
-        data = scraper.scrape(self.current_file)
-        self.txt_binwalk.config(state="normal")
-        self.txt_binwalk.delete("1.0", "end")
-        if "RawOutput" in data:
-            self.txt_binwalk.insert("end", data["RawOutput"])
-        else:
-            self.txt_binwalk.insert("end", "No binwalk data found.")
-        self.txt_binwalk.config(state="disabled")
-        self.notebook.select(self.txt_binwalk.master)
-
-    def _show_zsteg(self):
-        def zsteg_worker():
-            self.txt_zsteg.config(state="normal")
-            self.txt_zsteg.delete("1.0", "end")
-            self.txt_zsteg.insert("end", "🧬 Running Zsteg scan...\nPlease wait...\n\n")
-            self.txt_zsteg.config(state="disabled")
-            self.notebook.select(self.txt_zsteg.master)
+        def render(data):
+            with span("gui.render.steghide", cat="gui"):
+                self.txt_steg.config(state="normal")
+                self.txt_steg.delete("1.0", "end")
+                if "RawOutput" in data:
+                    if "DerivedPassphrase" in data:
+                        self.txt_steg.insert("end", f"Used passphrase: {list(data['DerivedPassphrase'].values())[0]}\n")
+                    self.txt_steg.insert("end", data["RawOutput"])
+                else:
+                    for k, v in data.items():
+                        self.txt_steg.insert("end", f"{k}: {v}\n")
+                self.txt_steg.config(state="disabled")
 
-            output = run_zsteg(self.current_file)
+        self._run_job("txt_steg", "Steghide scan",
+                      lambda: SteghideScraper().scrape(path, context=context), render, select)
 
-            self.txt_zsteg.config(state="normal")
-            self.txt_zsteg.delete("1.0", "end")
-            parsed_output = parse_and_group_zsteg(output)
-            self.txt_zsteg.insert("end", parsed_output)
-            self.txt_zsteg.config(state="disabled")
+    def _show_binwalk(self, select=True):
+        path, context = self.current_file, self._analysis_context()
 
-    # Run the Zsteg scan in a background thread
-        threading.Thread(target=zsteg_worker, daemon=True).start()
+        def render(data):
+            with span("gui.render.binwalk", cat="gui"):
+                if "RawOutput" in data:
+                    self._write(self.txt_binwalk, data["RawOutput"], clear=True)
+                else:
+                    self._write(self.txt_binwalk, "No binwalk data found.", clear=True)
+
+        self._write(self.txt_binwalk, "", clear=True)
+        self._run_job("txt_binwalk", "Binwalk scan",
+                      lambda emit: BinwalkScraper().scrape(path, context=context, on_output=emit),
+                      render, select, stream=True)
+
+    def _show_zsteg(self, select=True):
+        path, context = self.current_file, self._analysis_context()
+
+        def work(emit):
+            # Raw lines stream in while zsteg runs; render() swaps in the summary
+            return parse_and_group_zsteg(run_zsteg(path, context=context, on_output=emit))
+
+        def render(parsed_output):
+            with span("gui.render.zsteg", cat="gui"):
+                self._write(self.txt_zsteg, parsed_output, clear=True)
+
+        self._write(self.txt_zsteg, "🧬 Running Zsteg scan...\nPlease wait...\n\n", clear=True)
+        self._run_job("txt_zsteg", "Zsteg scan", work, render, select, stream=True)
+
+    def _analyze_all(self):
+        """
+        Run metadata, IRIS, steghide, binwalk, zsteg and OCR for
+        current_file at once; each tab fills in as its stage finishes.
+        The stages share one AnalysisContext, so exiftool runs once (for
+        metadata, IRIS and the steghide passphrase) and the image is
+        decoded once (for zsteg and OCR).
+        """
+        if not self.current_file:
+            return
+        self._analysis_context()
+        for action in (self._show_metadata, self._show_iris_analysis, self._show_steghide,
+                       self._show_binwalk, self._show_zsteg, self._show_ocr):
+            action(select=False)
+        self.notebook.select(self.txt_meta.master)
 
     def _add_image_search_tab(self):
         """Add a tab for reverse image search functionality"""
@@ -294,6 +587,8 @@ class BigSisterGUI(tk.Tk):
         if self.current_file:
             self.btn_start_search.state(["!disabled"])
             self.search_status.config(text=f"Ready to search: {os.path.basename(self.current_file)}")
+            # Start a browser now so the first search does not wait for it
+            self.executor.submit(get_browser_pool().warm)
         self.notebook.select(self.txt_search.master)
 
     def _start_image_search(self):
@@ -313,59 +608,76 @@ class BigSisterGUI(tk.Tk):
         self.txt_search.delete("1.0", "end")
         self.txt_search.insert("end", "🔍 Starting reverse image search...\n")
         self.txt_search.insert("end", f"📁 Image: {os.path.basename(self.current_file)}\n")
-        self.txt_search.insert("end", "⏳ Opening browser and performing search...\n\n")
+        self.txt_search.insert("end", "⏳ Uploading and waiting for results...\n\n")
         self.txt_search.config(state="disabled")
         
-        # Start search in a separate thread
-        self.search_thread = threading.Thread(target=self._perform_image_search, daemon=True)
-        self.search_thread.start()
+        # Start search on the worker pool; each search has its own IRIS,
+        # whose close() stops it
+        iris = self.iris = ImageSearchIRIS()
+        self.search_future = self.executor.submit(self._perform_image_search, iris,
+                                                  self.current_file)
+
+    def _perform_image_search(self, iris, path):
+        """Perform the actual image search (runs on a worker thread)"""
+        def report(callback, *args):
+            # A stopped or superseded search must not touch the pane
+            def apply():
+                if self.iris is iris:
+                    callback(*args)
+            self._call_soon(apply)
 
-    def _perform_image_search(self):
-        """Perform the actual image search (runs in separate thread)"""
         try:
-            # Initialize IRIS
-            self.iris = ImageSearchIRIS()
-            
             # Update status in main thread
-            self.after(0, lambda: self.search_status.config(text="Setting up browser..."))
+            report(lambda: self.search_status.config(text="Searching..."))
             
             # Perform the search
-            success = self.iris.reverse_image_search(self.current_file)
+            results = iris.search_image(path)
             
-            if success:
+            if results["success"]:
                 # Update UI in main thread
-                self.after(0, self._search_completed_successfully)
+                report(self._search_completed_successfully, results)
             else:
                 # Update UI in main thread
-                self.after(0, self._search_failed)
+                report(self._search_failed)
                 
         except Exception as e:
             # Update UI in main thread
-            self.after(0, lambda: self._search_error(str(e)))
+            report(self._search_error, str(e))
 
-    def _search_completed_successfully(self):
+    def _search_completed_successfully(self, results):
         """Handle successful search completion (runs in main thread)"""
+        self.iris = self.search_future = None
         self.search_progress.stop()
-        self.search_status.config(text="✅ Search completed! Browser opened with results.")
+        self.search_status.config(text="✅ Search completed!")
         
         self.txt_search.config(state="normal")
         self.txt_search.insert("end", "✅ REVERSE IMAGE SEARCH COMPLETED!\n")
         self.txt_search.insert("end", "=" * 50 + "\n")
-        self.txt_search.insert("end", "🌐 The search results are now displayed in your browser.\n\n")
-        self.txt_search.insert("end", "🔍 You can:\n")
-        self.txt_search.insert("end", "   • Browse through visually similar images\n")
-        self.txt_search.insert("end", "   • Check pages that contain matching images\n")
-        self.txt_search.insert("end", "   • Click on any result to explore further\n")
-        self.txt_search.insert("end", "   • Use browser tools to save or analyze results\n\n")
-        self.txt_search.insert("end", "💡 The browser window will remain open for your analysis.\n")
-        self.txt_search.insert("end", "   Use the 'Stop Search' button to close it when done.\n")
+        for name, engine in results["engines"].items():
+            if engine["success"]:
+                source = "cached" if engine["cached"] else f"{engine['elapsed']:.1f}s"
+                self.txt_search.insert(
+                    "end", f"✅ {name}: {len(engine['results'])} result(s) ({source})\n")
+                self.txt_search.insert("end", f"   🌐 {engine['results_url']}\n")
+            else:
+                self.txt_search.insert("end", f"❌ {name}: {engine.get('error')}\n")
+        self.txt_search.insert("end", "\n")
+        several = len(results["engines"]) > 1
+        for n, record in enumerate(results["results"], 1):
+            size = f" [{record['width']}x{record['height']}]" if record["width"] else ""
+            found = f" ({', '.join(record['engines'])})" if several else ""
+            self.txt_search.insert(
+                "end", f"{n:2}. {record['title'] or '(untitled)'}{size}{found}\n")
+            self.txt_search.insert("end", f"    {record['page_url']}\n")
         self.txt_search.config(state="disabled")
         
         # Reset button states
         self.btn_start_search.state(["!disabled"])
+        self.btn_stop_search.state(["disabled"])
 
     def _search_failed(self):
         """Handle search failure (runs in main thread)"""
+        self.iris = self.search_future = None
         self.search_progress.stop()
         self.search_status.config(text="❌ Search failed. Check the results for details.")
         
@@ -380,6 +692,7 @@ class BigSisterGUI(tk.Tk):
 
     def _search_error(self, error_msg):
         """Handle search error (runs in main thread)"""
+        self.iris = self.search_future = None
         self.search_progress.stop()
         self.search_status.config(text="❌ Error occurred during search.")
         
@@ -396,15 +709,16 @@ class BigSisterGUI(tk.Tk):
         if self.iris:
             try:
                 self.iris.close()
-                self.iris = None
             except Exception as e:
                 print(f"Error closing IRIS: {e}")
+        # The stopped search's late callbacks are dropped from here on
+        self.iris = self.search_future = None
         
         self.search_progress.stop()
-        self.search_status.config(text="🛑 Search stopped. Browser closed.")
+        self.search_status.config(text="🛑 Search stopped.")
         
         self.txt_search.config(state="normal")
-        self.txt_search.insert("end", "\n🛑 Search stopped by user. Browser closed.\n")
+        self.txt_search.insert("end", "\n🛑 Search stopped by user.\n")
         self.txt_search.config(state="disabled")
         
         # Reset button states
@@ -443,7 +757,7 @@ class BigSisterGUI(tk.Tk):
             self.lbl_file.config(text="No file selected")
             # Keep only Contributors button enabled when no file is selected
             for i, btn in enumerate(self.action_buttons):
-                if i == 7:  # Contributors button index
+                if i == len(self.action_buttons) - 1:  # Contributors button (always last)
                     btn.state(["!disabled"])  # Keep enabled
                 else:
                     btn.state(["disabled"])  # Disable others
@@ -452,11 +766,16 @@ class BigSisterGUI(tk.Tk):
 
     def destroy(self):
         """Override destroy to clean up resources"""
+        self.after_cancel(self._poll_id)
+        self._cancel_all_jobs()
+        self.executor.shutdown(wait=False, cancel_futures=True)
         if self.iris:
             try:
                 self.iris.close()
             except:
                 pass
+        if self.context is not None:
+            self.context.close()
         super().destroy()
 
     def toggle_dark_mode(self):
@@ -485,85 +804,98 @@ class BigSisterGUI(tk.Tk):
         else:
             self.lbl_file.config(text="No file selected")  # Set default text if no file is selected
 
+        # Jobs still running render into the new widgets; show them as busy
+        for tab, job in self._jobs.items():
+            self._set_status(tab, f"⏳ {job.label}...", busy=True)
+        # Reuse the decoded preview instead of loading the image again
+        self._draw_preview()
+
         self.notebook.select(selected_tab)  # Restore the selected tab
 
-    def _show_iris_analysis(self):
+    def _show_iris_analysis(self, select=True):
         """Show IRIS categorization analysis"""
         print("=" * 50)
         print("CALLING IRIS ANALYSIS FROM DEDICATED BUTTON")
         print("=" * 50)
-        
-        scraper = MetadataScraper()
-        data = scraper.scrape(self.current_file)
-        
-        # Use MetadataParser to parse the EXIF data first
-        metadata_parser = MetadataParser()
-        parsed = metadata_parser.parse_exif(data)
-        
-        # Then use IrisParser for categorization and search terms
-        iris_parser = IrisParser()
-        categorized = iris_parser.categorize_exif_for_iris(parsed)
-        search_terms = iris_parser.get_iris_search_terms(categorized)
-        
-        # Display in a new tab or reuse existing metadata tab
-        self.txt_meta.config(state="normal")
-        self.txt_meta.delete("1.0", "end")
-        
-        self.txt_meta.insert("end", "🎯 IRIS METADATA ANALYSIS\n")
-        self.txt_meta.insert("end", "=" * 50 + "\n\n")
-        
-        self.txt_meta.insert("end", f"📊 Overall Confidence Score: {categorized['confidence_score']:.2f}\n\n")
-        
-        # Show each category
-        categories = [
-            ("📷 Device Information", categorized['device_info']),
-            ("📍 Location Data", categorized['location_data']),
-            ("🕒 Temporal Data", categorized['temporal_data']),
-            ("⚙️ Technical Specifications", categorized['technical_specs'])
-        ]
-        
-        for title, data_dict in categories:
-            if data_dict:
-                self.txt_meta.insert("end", f"{title}:\n")
-                for k, v in data_dict.items():
-                    self.txt_meta.insert("end", f"  • {k}: {v}\n")
-                self.txt_meta.insert("end", "\n")
-        
-        if categorized['search_keywords']:
-            self.txt_meta.insert("end", "🔍 All Generated Keywords:\n")
-            for keyword in categorized['search_keywords']:
-                self.txt_meta.insert("end", f"  • {keyword}\n")
-            self.txt_meta.insert("end", "\n")
-        
-        if search_terms:
-            self.txt_meta.insert("end", "🎯 Priority Search Terms for IRIS:\n")
-            for i, term in enumerate(search_terms, 1):
-                self.txt_meta.insert("end", f"  {i}. {term}\n")
-        
-        self.txt_meta.config(state="disabled")
-        self.notebook.select(self.txt_meta.master)
 
-    def _show_ocr(self):
+        path, context = self.current_file, self._analysis_context()
+
+        def work():
+            data = MetadataScraper().scrape(path, context=context)
+
+            # Use MetadataParser to parse the EXIF data first
+            parsed = MetadataParser().parse_exif(data)
+
+            # Then use IrisParser for categorization and search terms
+            iris_parser = IrisParser()
+            categorized = iris_parser.categorize_exif_for_iris(parsed)
+            return categorized, iris_parser.get_iris_search_terms(categorized)
+
+        def render(result):
+            categorized, search_terms = result
+            # Display in the IRIS tab
+            with span("gui.render.iris", cat="gui"):
+                self.txt_iris.config(state="normal")
+                self.txt_iris.delete("1.0", "end")
+
+                self.txt_iris.insert("end", "🎯 IRIS METADATA ANALYSIS\n")
+                self.txt_iris.insert("end", "=" * 50 + "\n\n")
+
+                self.txt_iris.insert("end", f"📊 Overall Confidence Score: {categorized['confidence_score']:.2f}\n\n")
+
+                # Show each category
+                categories = [
+                    ("📷 Device Information", categorized['device_info']),
+                    ("📍 Location Data", categorized['location_data']),
+                    ("🕒 Temporal Data", categorized['temporal_data']),
+                    ("⚙️ Technical Specifications", categorized['technical_specs'])
+                ]
+
+                for title, data_dict in categories:
+                    if data_dict:
+                        self.txt_iris.insert("end", f"{title}:\n")
+                        for k, v in data_dict.items():
+                            self.txt_iris.insert("end", f"  • {k}: {v}\n")
+                        self.txt_iris.insert("end", "\n")
+
+                if categorized['search_keywords']:
+                    self.txt_iris.insert("end", "🔍 All Generated Keywords:\n")
+                    for keyword in categorized['search_keywords']:
+                        self.txt_iris.insert("end", f"  • {keyword}\n")
+                    self.txt_iris.insert("end", "\n")
+
+                if search_terms:
+                    self.txt_iris.insert("end", "🎯 Priority Search Terms for IRIS:\n")
+                    for i, term in enumerate(search_terms, 1):
+                        self.txt_iris.insert("end", f"  {i}. {term}\n")
+
+                self.txt_iris.config(state="disabled")
+
+        self._run_job("txt_iris", "IRIS analysis", work, render, select)
+
+    def _show_ocr(self, select=True):
         if not self.current_file:
             messagebox.showwarning("No File", "Please select an image file first.")
             return
 
         # Instantiate the OCR engine (optional: set tesseract_cmd)
         ocr_engine = OCREngine(tesseract_cmd=r"C:\Program Files\Tesseract-OCR\tesseract.exe")  # Update if needed
+        path, context = self.current_file, self._analysis_context()
 
-        # Run OCR
-        result = ocr_engine.extract_text_from_image(self.current_file, return_data=False)
-
-        # Display result
-        self.txt_ocr.config(state="normal")
-        self.txt_ocr.delete("1.0", "end")
-        if result["success"]:
-            self.txt_ocr.insert("end", f"🧠 OCR Result (in {result['time']}s):\n\n{result['text']}")
-        else:
-            self.txt_ocr.insert("end", f"❌ OCR Failed:\n{result['error']}")
-        self.txt_ocr.config(state="disabled")
+        def render(result):
+            # Display result
+            with span("gui.render.ocr", cat="gui"):
+                if result["success"]:
+                    self._write(self.txt_ocr, f"🧠 OCR Result (in {result['time']}s):\n\n{result['text']}", clear=True)
+                else:
+                    self._write(self.txt_ocr, f"❌ OCR Failed:\n{result['error']}", clear=True)
 
-        self.notebook.select(self.txt_ocr.master)
+        # Run OCR
+        self._run_job(
+            "txt_ocr", "OCR",
+            lambda: ocr_engine.extract_text_from_image(path, return_data=False, context=context),
+            render, select,
+        )
 
 
     def _show_contributors(self):
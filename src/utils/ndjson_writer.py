@@ -0,0 +1,56 @@
+"""
+ndjson_writer.py
+
+Newline-delimited JSON output for terminal_mode's `--format ndjson`.
+
+Every record is one JSON object on its own line, written and flushed as
+soon as it is produced, so a consumer can index results while a batch is
+still running. Records always carry "file" and "stage"; the remaining
+fields depend on the stage:
+
+    {"file": ..., "stage": "exif",     "raw": {...}, "parsed": {...}, "anomalies": {...}}
+    {"file": ..., "stage": "steghide", "raw": {...}, "parsed": {...}}
+    {"file": ..., "stage": "binwalk",  "raw": {...}, "parsed": {...}}
+    {"file": ..., "stage": "summary",  "combined": {...}}
+    {"file": ..., "stage": "error",    "error": "..."}
+
+Stage and summary records also carry "elapsed": seconds from the start
+of that file's analysis until the record was produced.
+
+Single-file runs may add "binwalk_extract" ({"raw": ...}), "similar"
+({"matches": [...]}) and "crack" ({"result": ...}) records.
+"""
+
+import sys
+import json
+import threading
+
+
+class NDJSONWriter:
+    """
+    Thread-safe line writer; one instance is shared by every producer.
+    """
+
+    def __init__(self, stream=None):
+        """
+        Args:
+            stream: Text stream to write to (default: sys.stdout).
+        """
+        self.stream = stream or sys.stdout
+        self.records = 0
+        self._lock = threading.Lock()
+
+    def write(self, record: dict):
+        """Serialize one record and flush it immediately."""
+        line = json.dumps(record, default=str, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            self.stream.flush()
+            self.records += 1
+
+    __call__ = write
+
+
+def stage_record(file_path: str, stage: str, **fields) -> dict:
+    """Build a record for one stage of one file."""
+    return {"file": file_path, "stage": stage, **fields}
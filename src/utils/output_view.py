@@ -0,0 +1,232 @@
+"""
+output_view.py
+
+Virtualized output pane for long tool output (zsteg -a, binwalk).
+
+A Tk Text widget slows down with every line it holds: a single insert of
+50 000 lines freezes the window, and so does every scroll afterwards.
+OutputView keeps the output as a list of lines and gives its Text widget
+only the lines that fit on screen, re-rendering that window whenever it
+scrolls. Appends are cheap (the window is redrawn at most once per idle
+cycle), the view follows the tail while scrolled to the bottom, and the
+search bar finds or filters lines over the list rather than the widget.
+"""
+
+import re
+import bisect
+import tkinter as tk
+import tkinter.font as tkfont
+from tkinter import ttk
+
+
+class OutputView(ttk.Frame):
+    """Scrollable, searchable read-only view that renders only visible lines."""
+
+    def __init__(self, master, bg="#ffffff", fg="#2c3e50", font=("Consolas", 10)):
+        """
+        Args:
+            master: Parent widget.
+            bg (str): Text background colour.
+            fg (str): Text foreground colour.
+            font (tuple): Text font; rows are measured with it.
+        """
+        super().__init__(master)
+        self.lines = [""]  # the last line is open for appends
+        self.top = 0  # first shown row (index into the current view)
+        self.view = None  # indices of lines matching the filter, None = all
+        self.query = ""
+        self.hit = None  # line index of the current search hit
+        self._render_id = None
+        self._filter_id = None
+        self._linespace = tkfont.Font(font=font).metrics("linespace")
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x", padx=10, pady=(10, 0))
+        ttk.Label(bar, text="🔍").pack(side="left")
+        self.search_var = tk.StringVar()
+        entry = ttk.Entry(bar, textvariable=self.search_var, width=30)
+        entry.pack(side="left", padx=5)
+        entry.bind("<Return>", lambda e: self.find(1))
+        entry.bind("<Shift-Return>", lambda e: self.find(-1))
+        entry.bind("<KeyRelease>", self._on_query_changed)
+        ttk.Button(bar, text="▲", width=3, command=lambda: self.find(-1)).pack(side="left")
+        ttk.Button(bar, text="▼", width=3, command=lambda: self.find(1)).pack(side="left")
+        self.filter_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(bar, text="Only matching lines", variable=self.filter_var,
+                        command=self._apply_filter).pack(side="left", padx=10)
+        self.lbl_count = ttk.Label(bar, text="", foreground="#7f8c8d")
+        self.lbl_count.pack(side="right")
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, padx=10, pady=10)
+        self.text = tk.Text(body, wrap="none", bg=bg, fg=fg, relief="flat", font=font,
+                            state="disabled")
+        self.vbar = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        hbar = ttk.Scrollbar(body, orient="horizontal", command=self.text.xview)
+        self.text.configure(xscrollcommand=hbar.set)
+        self.vbar.pack(side="right", fill="y")
+        hbar.pack(side="bottom", fill="x")
+        self.text.pack(side="left", fill="both", expand=True)
+        self.text.tag_configure("match", background="#f9e79f", foreground="#2c3e50")
+        self.text.tag_configure("current", background="#f5b041", foreground="#2c3e50")
+
+        self.text.bind("<Configure>", lambda e: self._schedule_render())
+        self.text.bind("<MouseWheel>", lambda e: self.scroll(-3 if e.delta > 0 else 3))
+        self.text.bind("<Button-4>", lambda e: self.scroll(-3))
+        self.text.bind("<Button-5>", lambda e: self.scroll(3))
+        self.text.bind("<Prior>", lambda e: self.scroll(-self._rows()))
+        self.text.bind("<Next>", lambda e: self.scroll(self._rows()))
+        self.text.bind("<Control-Home>", lambda e: self.scroll_to(0))
+        self.text.bind("<Control-End>", lambda e: self.scroll_to(self._total()))
+
+    # --- content --------------------------------------------------------
+
+    def clear(self):
+        self.lines = [""]
+        self.top = 0
+        self.hit = None
+        self.view = [] if self.view is not None else None
+        self._schedule_render()
+
+    def set_text(self, text: str):
+        self.clear()
+        self.append(text)
+
+    def append(self, text: str):
+        """Add text (may hold partial lines) at the end of the output."""
+        if not text:
+            return
+        follow = self.top + self._rows() >= self._total()
+        first_changed = len(self.lines) - 1
+        parts = text.split("\n")
+        self.lines[-1] += parts[0]
+        self.lines.extend(parts[1:])
+        if self.view is not None:
+            # The open line may have changed; re-match it with the new lines
+            if self.view and self.view[-1] == first_changed:
+                self.view.pop()
+            self.view.extend(i for i in range(first_changed, len(self.lines))
+                             if self._matches(self.lines[i]))
+        if follow:
+            self.top = max(0, self._total() - self._rows())
+        self._schedule_render()
+
+    def get_text(self) -> str:
+        return "\n".join(self.lines)
+
+    # --- scrolling ------------------------------------------------------
+
+    def _total(self) -> int:
+        return len(self.view) if self.view is not None else len(self.lines)
+
+    def _rows(self) -> int:
+        return max(1, self.text.winfo_height() // self._linespace)
+
+    def scroll(self, rows: int):
+        self.scroll_to(self.top + rows)
+
+    def scroll_to(self, row: int):
+        self.top = max(0, min(row, self._total() - self._rows()))
+        self._schedule_render()
+
+    def _on_scrollbar(self, action, value, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(value) * self._total()))
+        elif action == "scroll":
+            step = self._rows() if unit == "pages" else 1
+            self.scroll(int(value) * step)
+
+    # --- search / filter ------------------------------------------------
+
+    def _matches(self, line: str) -> bool:
+        return self.query in line.lower()
+
+    def _on_query_changed(self, event=None):
+        if event is not None and event.keysym in ("Return", "Shift_L", "Shift_R"):
+            return
+        query = self.search_var.get().lower()
+        if query == self.query:
+            return
+        self.query = query
+        self.hit = None
+        # Refilter once typing pauses rather than on every keystroke
+        if self._filter_id is not None:
+            self.after_cancel(self._filter_id)
+        self._filter_id = self.after(150, self._apply_filter)
+
+    def _apply_filter(self):
+        self._filter_id = None
+        anchor = self._line_at(self.top)
+        if self.filter_var.get() and self.query:
+            self.view = [i for i, line in enumerate(self.lines) if self._matches(line)]
+        else:
+            self.view = None
+        # Keep roughly the same place in the output
+        self.top = self._row_of(anchor) if anchor is not None else 0
+        self.scroll_to(self.top)
+
+    def _line_at(self, row: int):
+        if self.view is None:
+            return row if row < len(self.lines) else None
+        return self.view[row] if row < len(self.view) else None
+
+    def _row_of(self, line: int) -> int:
+        if self.view is None:
+            return line
+        # First shown row at or after line
+        return bisect.bisect_left(self.view, line)
+
+    def find(self, direction: int = 1):
+        """Move to the next (1) or previous (-1) line containing the query."""
+        if self._filter_id is not None:
+            # Typed but not yet filtered: filter for the current query first
+            self.after_cancel(self._filter_id)
+            self._apply_filter()
+        self.query = self.search_var.get().lower()
+        if not self.query:
+            return
+        n = len(self.lines)
+        start = self.hit if self.hit is not None else self._line_at(self.top) or 0
+        if self.hit is None and direction > 0:
+            start -= 1
+        for step in range(1, n + 1):
+            i = (start + step * direction) % n
+            if self._matches(self.lines[i]):
+                self.hit = i
+                self.scroll_to(self._row_of(i) - self._rows() // 3)
+                return
+        self.hit = None
+        self._schedule_render()
+
+    # --- rendering ------------------------------------------------------
+
+    def _schedule_render(self):
+        if self._render_id is None:
+            self._render_id = self.after_idle(self._render)
+
+    def _render(self):
+        self._render_id = None
+        rows = self._rows()
+        total = self._total()
+        shown = [self._line_at(r) for r in range(self.top, min(total, self.top + rows))]
+
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.insert("end", "\n".join(self.lines[i] for i in shown))
+        if self.query:
+            pattern = re.escape(self.query)
+            for row, i in enumerate(shown, 1):
+                if i == self.hit:
+                    self.text.tag_add("current", f"{row}.0", f"{row}.end")
+                for m in re.finditer(pattern, self.lines[i].lower()):
+                    self.text.tag_add("match", f"{row}.{m.start()}", f"{row}.{m.end()}")
+        self.text.config(state="disabled")
+
+        if total:
+            self.vbar.set(self.top / total, min(1.0, (self.top + rows) / total))
+        else:
+            self.vbar.set(0, 1)
+        count = f"{len(self.lines):,} lines"
+        if self.view is not None:
+            count = f"{len(self.view):,} of {count}"
+        self.lbl_count.config(text=count)
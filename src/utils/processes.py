@@ -0,0 +1,234 @@
+"""
+processes.py
+
+Process-wide limits and process-group handling for external tool runs.
+
+tool_slot() hands out one multiprocessing BoundedSemaphore per tool,
+sized from config.json "tool_concurrency". Every run of that tool takes
+a slot first, whichever thread, event loop or GUI job starts it, so the
+limit holds for the whole run (not per file, ToolRunner or event loop).
+Process pools pass shared_slots() to install_slots() in each worker's
+initializer, so their workers draw from the same slots as the parent.
+Tools without a configured limit are not throttled.
+
+run_tool() is the blocking counterpart of ToolRunner.run(): it starts
+the command in its own process group under the tool's slot, so a
+timeout kills the whole tree (e.g. `wsl` plus the real binary). Inside
+`with cancel_scope(event):` setting the event from any thread kills the
+running tool the same way (or stops it from starting) and run_tool()
+raises ToolCancelled; this is how the GUI cancels a tab's job. With
+on_output, stdout is also handed over line by line while the tool runs.
+"""
+
+import os
+import time
+import signal
+import threading
+import subprocess
+import contextvars
+import multiprocessing
+from contextlib import contextmanager
+
+from utils.config import tool_concurrency
+
+_slots = {}
+_slots_lock = threading.Lock()
+_cancel_event = contextvars.ContextVar("tool_cancel_event", default=None)
+# Seconds between checks of the cancel event while a tool waits or runs
+_CANCEL_POLL = 0.1
+
+
+class ToolCancelled(Exception):
+    """A run_tool() call was cancelled through its cancel_scope()."""
+
+
+@contextmanager
+def cancel_scope(event: threading.Event):
+    """
+    Cancel every run_tool() call made in this block (on this thread) once
+    event is set.
+    """
+    token = _cancel_event.set(event)
+    try:
+        yield event
+    finally:
+        _cancel_event.reset(token)
+
+
+def raise_if_cancelled(what: str):
+    """
+    Raise ToolCancelled if the enclosing cancel_scope() was cancelled; for
+    work that waits on tools run elsewhere (worker threads or processes).
+    """
+    cancelled = _cancel_event.get()
+    if cancelled is not None and cancelled.is_set():
+        raise ToolCancelled(f"{what} cancelled")
+
+
+def tool_slot(tool: str):
+    """
+    The semaphore limiting concurrent runs of tool.
+
+    Returns:
+        multiprocessing.BoundedSemaphore or None: None if tool has no limit.
+    """
+    with _slots_lock:
+        if tool not in _slots:
+            limit = tool_concurrency().get(tool)
+            _slots[tool] = multiprocessing.BoundedSemaphore(max(1, int(limit))) if limit else None
+        return _slots[tool]
+
+
+def shared_slots() -> dict:
+    """
+    This process's slots for every tool with a limit, to hand to
+    process-pool workers (see install_slots()).
+
+    Returns:
+        dict: {tool: multiprocessing.BoundedSemaphore}.
+    """
+    slots = {tool: tool_slot(tool) for tool in tool_concurrency()}
+    return {tool: slot for tool, slot in slots.items() if slot is not None}
+
+
+def install_slots(slots: dict):
+    """Make tool_slot() return these semaphores (from the parent's shared_slots())."""
+    with _slots_lock:
+        _slots.update(slots)
+
+
+def process_group_kwargs() -> dict:
+    """Popen keyword arguments that start the child in its own process group."""
+    if os.name == "nt":
+        return {"creationflags": subprocess.CREATE_NEW_PROCESS_GROUP}
+    return {"start_new_session": True}
+
+
+def kill_group(proc):
+    """Kill a child started with process_group_kwargs() and everything it spawned."""
+    if proc.returncode is not None:
+        return
+    if os.name == "nt":
+        subprocess.run(["taskkill", "/F", "/T", "/PID", str(proc.pid)], capture_output=True)
+    else:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+
+def _pump_output(proc, on_output):
+    """
+    Drain proc's stdout (passing each line to on_output) and stderr on
+    helper threads. Returns a function that waits for both pipes to close
+    and returns (stdout, stderr).
+    """
+    chunks = {"stdout": [], "stderr": []}
+
+    def pump(stream, sink, forward):
+        empty = stream.read(0)  # "" or b"", matching the pipe's mode
+        for line in iter(stream.readline, empty):
+            sink.append(line)
+            if forward:
+                on_output(line)
+        stream.close()
+
+    threads = [
+        threading.Thread(target=pump, args=(proc.stdout, chunks["stdout"], True), daemon=True),
+        threading.Thread(target=pump, args=(proc.stderr, chunks["stderr"], False), daemon=True),
+    ]
+    for thread in threads:
+        thread.start()
+
+    def collect():
+        for thread in threads:
+            thread.join()
+        empty = "" if proc.text_mode else b""
+        return empty.join(chunks["stdout"]), empty.join(chunks["stderr"])
+
+    return collect
+
+
+def run_tool(tool: str, cmd: list, input=None, timeout: float = None,
+             text: bool = True, on_output=None) -> subprocess.CompletedProcess:
+    """
+    Run cmd to completion under tool's concurrency slot.
+
+    Args:
+        tool (str): Tool name, as in config.json "tool_concurrency".
+        cmd (list): Command line.
+        input (str or bytes): Data for stdin (stdin is /dev/null if None).
+        timeout (float): Seconds before the process group is killed.
+        text (bool): Decode stdout and stderr as UTF-8 text.
+        on_output (callable): Called from a helper thread with each line
+            of stdout as the tool writes it; the result still holds all
+            of stdout.
+
+    Returns:
+        subprocess.CompletedProcess: With stdout and stderr captured.
+
+    Raises:
+        FileNotFoundError: If the executable does not exist.
+        subprocess.TimeoutExpired: If the run took longer than timeout.
+        ToolCancelled: If the enclosing cancel_scope() was cancelled.
+    """
+    cancelled = _cancel_event.get()
+    slot = tool_slot(tool)
+    if slot is not None:
+        while not slot.acquire(timeout=_CANCEL_POLL if cancelled is not None else None):
+            if cancelled.is_set():
+                raise ToolCancelled(f"{tool} cancelled")
+    try:
+        if cancelled is not None and cancelled.is_set():
+            raise ToolCancelled(f"{tool} cancelled")
+        proc = subprocess.Popen(
+            cmd,
+            stdin=subprocess.PIPE if input is not None else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            text=text,
+            errors="replace" if text else None,
+            **process_group_kwargs(),
+        )
+        deadline = None if timeout is None else time.monotonic() + timeout
+        collect = None
+        try:
+            if on_output is not None:
+                collect = _pump_output(proc, on_output)
+                if input is not None:
+                    try:
+                        proc.stdin.write(input)
+                        proc.stdin.close()
+                    except BrokenPipeError:
+                        pass
+            while True:
+                wait = None if deadline is None else max(0.0, deadline - time.monotonic())
+                if cancelled is not None:
+                    wait = _CANCEL_POLL if wait is None else min(wait, _CANCEL_POLL)
+                try:
+                    if collect is not None:
+                        proc.wait(timeout=wait)
+                        stdout, stderr = collect()
+                    else:
+                        # Safe to call again after a timeout, but input may
+                        # only be passed on the first call
+                        stdout, stderr = proc.communicate(input, timeout=wait)
+                    break
+                except subprocess.TimeoutExpired:
+                    input = None
+                    if deadline is not None and time.monotonic() >= deadline:
+                        raise subprocess.TimeoutExpired(cmd, timeout)
+                    if cancelled is not None and cancelled.is_set():
+                        raise ToolCancelled(f"{tool} cancelled")
+        except BaseException:
+            kill_group(proc)
+            if collect is not None:
+                proc.wait()
+                collect()
+            else:
+                proc.communicate()
+            raise
+        return subprocess.CompletedProcess(cmd, proc.returncode, stdout, stderr)
+    finally:
+        if slot is not None:
+            slot.release()
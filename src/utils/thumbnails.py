@@ -0,0 +1,196 @@
+"""
+thumbnails.py
+
+Preview thumbnails for the GUI, decoded cheaply and cached.
+
+Thumbnails are decoded at reduced size where the format allows it: JPEG
+via draft mode (the DCT is decoded at 1/2, 1/4 or 1/8 scale), everything
+else with Image.reduce() box-downscaling before the final LANCZOS pass.
+Results are kept in a small in-memory LRU and as PNGs under
+<cache dir>/thumbnails, keyed by the file's SHA-256 and the requested
+size, so reopening a file (or the same bytes under another name) skips
+decoding entirely.
+
+Environment:
+    BIGSISTER_CACHE_DIR     Cache location (shared with the result cache)
+    BIGSISTER_THUMB_MAX_MB  Disk bound for thumbnails in MiB (default 64)
+    BIGSISTER_NO_CACHE      Keeps thumbnails in memory only
+"""
+
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image
+
+from utils.cache import get_cache
+from utils.tracing import span
+
+# Bump when the way thumbnails are produced changes
+THUMBNAIL_VERSION = 1
+
+
+def make_thumbnail(file_path: str, size: tuple) -> Image.Image:
+    """
+    Decode file_path at (roughly) the resolution needed for size.
+
+    Args:
+        file_path (str): Image file.
+        size (tuple): (max width, max height) of the thumbnail.
+
+    Returns:
+        PIL.Image: RGB or RGBA image fitting within size.
+    """
+    with Image.open(file_path) as img:
+        # JPEG only: decode straight to the smallest DCT scale >= 2x size
+        img.draft("RGB", (size[0] * 2, size[1] * 2))
+        factor = min(img.width // (size[0] * 2), img.height // (size[1] * 2))
+        target = "RGBA" if "A" in img.getbands() or "transparency" in img.info else "RGB"
+        if factor > 1:
+            try:
+                # Integer box reduction first: LANCZOS then only sees ~2x size
+                img = img.reduce(factor)
+            except ValueError:
+                # Modes reduce() does not handle (palette, ...): subsample,
+                # then convert the small copy rather than the full image
+                img = img.resize((img.width // factor, img.height // factor),
+                                 Image.Resampling.NEAREST)
+        else:
+            img.load()
+        img = img.copy() if img.mode in ("RGB", "RGBA", "L") else img.convert(target)
+    img.thumbnail(size, Image.Resampling.LANCZOS)
+    return img
+
+
+class ThumbnailCache:
+    """In-memory LRU in front of an on-disk PNG store of thumbnails."""
+
+    def __init__(self, cache_dir: str = None, max_items: int = 32, max_bytes: int = None,
+                 persist: bool = None):
+        """
+        Args:
+            cache_dir (str): Directory for thumbnail PNGs (default
+                <result cache dir>/thumbnails).
+            max_items (int): Thumbnails kept in memory.
+            max_bytes (int): Disk bound, oldest files are removed beyond it.
+            persist (bool): Write thumbnails to disk. Defaults to whether
+                the result cache is enabled.
+        """
+        cache = get_cache()
+        self.cache_dir = cache_dir or os.path.join(cache.cache_dir, "thumbnails")
+        self.max_items = max_items
+        if max_bytes is None:
+            max_bytes = int(os.environ.get("BIGSISTER_THUMB_MAX_MB", "64")) * 1024 * 1024
+        self.max_bytes = max_bytes
+        self.persist = cache.enabled if persist is None else persist
+        self._memory = OrderedDict()
+        # (path, file size, mtime, thumbnail size) -> key, so peek() can
+        # find a thumbnail without hashing the file
+        self._aliases = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stat_key(file_path: str, size: tuple) -> tuple:
+        st = os.stat(file_path)
+        return os.path.abspath(file_path), st.st_size, st.st_mtime_ns, tuple(size)
+
+    def _key(self, file_path: str, size: tuple) -> str:
+        digest = get_cache().file_hash(file_path)
+        return f"{digest}_{size[0]}x{size[1]}_v{THUMBNAIL_VERSION}"
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, key[:2], key + ".png")
+
+    def peek(self, file_path: str, size: tuple):
+        """
+        The thumbnail if it is already in memory, else None. Cheap enough
+        for the Tk thread: it never decodes or hashes the file.
+        """
+        try:
+            stat_key = self._stat_key(file_path, size)
+        except OSError:
+            return None
+        with self._lock:
+            key = self._aliases.get(stat_key)
+            img = self._memory.get(key) if key else None
+            if img is not None:
+                self._memory.move_to_end(key)
+            return img
+
+    def get(self, file_path: str, size: tuple) -> Image.Image:
+        """
+        Return the thumbnail of file_path, from memory, disk or a fresh
+        decode (which is then cached).
+
+        Raises:
+            OSError, PIL.UnidentifiedImageError: If the file cannot be read.
+        """
+        img = self.peek(file_path, size)
+        if img is not None:
+            return img
+        stat_key = self._stat_key(file_path, size)
+        key = self._key(file_path, size)
+        with self._lock:
+            img = self._memory.get(key)
+
+        path = self._disk_path(key)
+        if img is None and self.persist and os.path.isfile(path):
+            try:
+                with Image.open(path) as stored:
+                    stored.load()
+                    img = stored.copy()
+                os.utime(path)  # recency for pruning
+            except OSError:
+                img = None
+        if img is None:
+            with span("thumbnail.decode", cat="gui"):
+                img = make_thumbnail(file_path, size)
+            if self.persist:
+                self._store(path, img)
+
+        with self._lock:
+            self._aliases[stat_key] = key
+            self._memory[key] = img
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+        return img
+
+    def _store(self, path: str, img: Image.Image):
+        # Failures only cost a re-decode next time
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            img.save(tmp, format="PNG")
+            os.replace(tmp, path)
+            self._prune()
+        except OSError:
+            pass
+
+    def _prune(self):
+        files = []
+        for root, _, names in os.walk(self.cache_dir):
+            for name in names:
+                if name.endswith(".png"):
+                    full = os.path.join(root, name)
+                    st = os.stat(full)
+                    files.append((st.st_mtime, st.st_size, full))
+        total = sum(size for _, size, _ in files)
+        for _, size, full in sorted(files):
+            if total <= self.max_bytes:
+                break
+            os.remove(full)
+            total -= size
+
+
+_default_thumbnails = None
+_default_lock = threading.Lock()
+
+
+def get_thumbnail_cache() -> ThumbnailCache:
+    """Return the process-wide ThumbnailCache."""
+    global _default_thumbnails
+    with _default_lock:
+        if _default_thumbnails is None:
+            _default_thumbnails = ThumbnailCache()
+        return _default_thumbnails
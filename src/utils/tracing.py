@@ -0,0 +1,389 @@
+"""
+tracing.py
+
+Lightweight timing spans for every stage of an analysis.
+
+Wrap a piece of work in `with span("name", cat="..."):` (or decorate a
+function with @traced) and, when tracing is enabled, the tracer records
+for it:
+
+    wall_ms        elapsed wall-clock time
+    cpu_ms         CPU time of the calling thread
+    subprocess_ms  user+system time of child processes reaped meanwhile
+    mem_peak_kb    tracemalloc peak above the span's starting point
+                   (only when memory tracing is on; it slows Python down)
+
+Categories in use: "scraper", "subprocess", "parse", "engine", "iris",
+"ocr", "gui" and "pipeline".
+
+CPU, child-process and memory figures are process-wide measurements
+taken at span boundaries, so spans that overlap in time (asyncio tasks,
+threads) may include a share of each other's work; wall time is always
+exact.
+
+Spans export as Chrome trace-event JSON (chrome://tracing, Perfetto) and
+as a per-name summary table. When disabled, span() costs one attribute
+check.
+
+Environment:
+    BIGSISTER_TRACE         Set to any non-empty value to record spans
+    BIGSISTER_TRACE_MEMORY  Also track tracemalloc peaks
+    BIGSISTER_TRACE_FILE    Read by main.py (CLI and GUI): record spans and
+                            export them here at exit, like `--trace FILE`
+"""
+
+import os
+import sys
+import json
+import atexit
+import time
+import threading
+import functools
+import contextvars
+import tracemalloc
+
+try:
+    import resource
+except ImportError:     # Windows
+    resource = None
+
+
+# Open spans of the current thread / asyncio task (a tuple, so tasks that
+# copy the context never share a mutable stack)
+_open_spans = contextvars.ContextVar("bigsister_open_spans", default=())
+
+
+def _children_cpu() -> float:
+    if resource is None:
+        return 0.0
+    usage = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return usage.ru_utime + usage.ru_stime
+
+
+def _track_key():
+    """(thread id, asyncio task id or None) of the caller."""
+    task = None
+    try:
+        import asyncio
+        task = asyncio.current_task()
+    except RuntimeError:
+        pass
+    return threading.get_ident(), id(task) if task is not None else None
+
+
+class _Frame:
+    __slots__ = ("name", "cat", "args", "start", "cpu", "children_cpu",
+                 "mem_start", "mem_peak")
+
+    def __init__(self, name, cat, args):
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def set(self, **args):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.frame = _Frame(name, cat, args)
+        self._token = None
+
+    def __enter__(self):
+        self._token = _open_spans.set(_open_spans.get() + (self.frame,))
+        self.tracer._begin(self.frame)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is not None:
+                self.frame.args["error"] = exc_type.__name__
+            self.tracer._end(self.frame)
+        finally:
+            _open_spans.reset(self._token)
+        return False
+
+    def set(self, **args):
+        """Attach extra fields (e.g. sizes known only after the work) to the span."""
+        self.frame.args.update(args)
+
+
+class Tracer:
+    """
+    Process-wide span recorder. Use get_tracer() rather than instantiating.
+    """
+
+    def __init__(self, enabled: bool = False, memory: bool = False):
+        """
+        Args:
+            enabled (bool): Record spans.
+            memory (bool): Track tracemalloc peaks per span.
+        """
+        self.enabled = enabled
+        self.memory = False
+        self.spans = []
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+        self._tracks = {}
+        if enabled and memory:
+            self.enable_memory()
+
+    def enable_memory(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.memory = True
+
+    def span(self, name: str, cat: str = "stage", **args):
+        """Context manager timing one unit of work."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name, cat, args)
+
+    # --- recording ------------------------------------------------------
+
+    def _begin(self, frame):
+        if self.memory:
+            current, peak = tracemalloc.get_traced_memory()
+            # Fold the peak reached so far into the enclosing span first
+            parents = _open_spans.get()[:-1]
+            if parents:
+                parents[-1].mem_peak = max(parents[-1].mem_peak, peak)
+            tracemalloc.reset_peak()
+            frame.mem_start = current
+            frame.mem_peak = current
+        frame.children_cpu = _children_cpu()
+        frame.cpu = time.thread_time()
+        frame.start = time.perf_counter()
+
+    def _end(self, frame):
+        end = time.perf_counter()
+        cpu = time.thread_time() - frame.cpu
+        children = _children_cpu() - frame.children_cpu
+        record = {
+            "name": frame.name,
+            "cat": frame.cat,
+            "ts": (frame.start - self._origin) * 1e6,
+            "wall_ms": (end - frame.start) * 1000,
+            "cpu_ms": cpu * 1000,
+            "subprocess_ms": children * 1000,
+            "pid": os.getpid(),
+            "track": self._track_id(),
+            "args": frame.args,
+        }
+        if self.memory:
+            peak = max(frame.mem_peak, tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+            parents = _open_spans.get()[:-1]
+            if parents:
+                parents[-1].mem_peak = max(parents[-1].mem_peak, peak)
+            record["mem_peak_kb"] = max(peak - frame.mem_start, 0) / 1024
+        with self._lock:
+            self.spans.append(record)
+
+    def _track_id(self) -> int:
+        """Small stable id per thread/task, so overlapping tasks get their own row."""
+        key = _track_key()
+        with self._lock:
+            track = self._tracks.get(key)
+            if track is None:
+                thread = threading.current_thread().name
+                track = self._tracks[key] = (len(self._tracks) + 1,
+                                             thread if key[1] is None else f"{thread} (task)")
+        return track[0]
+
+    def track_names(self) -> dict:
+        with self._lock:
+            return {track: name for track, name in self._tracks.values()}
+
+    # --- collection -----------------------------------------------------
+
+    def drain(self) -> dict:
+        """
+        Remove and return everything recorded so far, in a picklable form
+        that extend() in another process accepts.
+        """
+        with self._lock:
+            spans, self.spans = self.spans, []
+            tracks = {track: name for track, name in self._tracks.values()}
+        return {"pid": os.getpid(), "origin": time.time() - (time.perf_counter() - self._origin),
+                "spans": spans, "tracks": tracks}
+
+    def extend(self, batch: dict):
+        """Merge spans drained from another process (e.g. a pool worker)."""
+        if not batch or not batch.get("spans"):
+            return
+        local_origin = time.time() - (time.perf_counter() - self._origin)
+        shift = (batch["origin"] - local_origin) * 1e6
+        with self._lock:
+            for record in batch["spans"]:
+                record = dict(record, ts=record["ts"] + shift)
+                record["track_name"] = batch["tracks"].get(record["track"])
+                self.spans.append(record)
+
+    # --- export ---------------------------------------------------------
+
+    def chrome_trace(self) -> dict:
+        """The recorded spans as a Chrome trace-event document."""
+        with self._lock:
+            spans = list(self.spans)
+        local_tracks = self.track_names()
+        events = []
+        names = {}
+        for s in spans:
+            args = dict(s["args"])
+            args.update({k: round(s[k], 3) for k in ("cpu_ms", "subprocess_ms", "mem_peak_kb")
+                         if k in s})
+            events.append({
+                "name": s["name"], "cat": s["cat"], "ph": "X",
+                "ts": round(s["ts"], 3), "dur": round(s["wall_ms"] * 1000, 3),
+                "pid": s["pid"], "tid": s["track"], "args": args,
+            })
+            names[(s["pid"], s["track"])] = s.get("track_name") or local_tracks.get(s["track"])
+        for (pid, tid), name in names.items():
+            if name:
+                events.append({"name": "thread_name", "ph": "M", "pid": pid, "tid": tid,
+                               "args": {"name": name}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.chrome_trace(), fh, default=str)
+
+    def summary(self) -> dict:
+        """
+        Aggregate spans by name.
+
+        Returns:
+            dict: {name: {"cat", "count", "wall_ms", "mean_ms", "max_ms",
+                   "cpu_ms", "subprocess_ms"[, "mem_peak_kb"]}}, slowest total first.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        table = {}
+        for s in spans:
+            row = table.setdefault(s["name"], {
+                "cat": s["cat"], "count": 0, "wall_ms": 0.0, "max_ms": 0.0,
+                "cpu_ms": 0.0, "subprocess_ms": 0.0,
+            })
+            row["count"] += 1
+            row["wall_ms"] += s["wall_ms"]
+            row["max_ms"] = max(row["max_ms"], s["wall_ms"])
+            row["cpu_ms"] += s["cpu_ms"]
+            row["subprocess_ms"] += s["subprocess_ms"]
+            if "mem_peak_kb" in s:
+                row["mem_peak_kb"] = max(row.get("mem_peak_kb", 0.0), s["mem_peak_kb"])
+        for row in table.values():
+            row["mean_ms"] = row["wall_ms"] / row["count"]
+        return dict(sorted(table.items(), key=lambda kv: -kv[1]["wall_ms"]))
+
+    def print_summary(self, stream=None):
+        """Print summary() as a table (default: stderr)."""
+        stream = stream or sys.stderr
+        rows = self.summary()
+        if not rows:
+            print("No spans recorded.", file=stream)
+            return
+        width = max(len(n) for n in rows) + 2
+        line = width + 72
+        print("\n" + "=" * line, file=stream)
+        print("Trace Summary".center(line), file=stream)
+        print("=" * line, file=stream)
+        print(f"{'span':{width}}{'cat':>11}{'count':>7}{'total ms':>11}{'mean ms':>10}"
+              f"{'max ms':>10}{'cpu ms':>10}{'child ms':>10}{'peak KB':>10}",
+              file=stream)
+        print("-" * line, file=stream)
+        for name, r in rows.items():
+            mem = f"{r['mem_peak_kb']:.0f}" if "mem_peak_kb" in r else "-"
+            print(f"{name:{width}}{r['cat']:>11}{r['count']:>7}{r['wall_ms']:>11.1f}"
+                  f"{r['mean_ms']:>10.2f}{r['max_ms']:>10.1f}{r['cpu_ms']:>10.1f}"
+                  f"{r['subprocess_ms']:>10.1f}{mem:>10}", file=stream)
+        print("=" * line, file=stream)
+
+
+_default_tracer = None
+_default_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide Tracer (configured from the environment)."""
+    global _default_tracer
+    if _default_tracer is None:
+        with _default_lock:
+            if _default_tracer is None:
+                _default_tracer = Tracer(
+                    enabled=bool(os.environ.get("BIGSISTER_TRACE")),
+                    memory=bool(os.environ.get("BIGSISTER_TRACE_MEMORY")),
+                )
+    return _default_tracer
+
+
+def set_tracing_enabled(enabled: bool, memory: bool = False):
+    """
+    Globally start or stop recording spans. Also exported through the
+    environment so process-pool workers inherit the choice.
+    """
+    for var, on in (("BIGSISTER_TRACE", enabled), ("BIGSISTER_TRACE_MEMORY", enabled and memory)):
+        if on:
+            os.environ[var] = "1"
+        else:
+            os.environ.pop(var, None)
+    tracer = get_tracer()
+    tracer.enabled = enabled
+    if enabled and memory:
+        tracer.enable_memory()
+
+
+def export_on_exit(path: str, memory: bool = False):
+    """
+    Start recording now; at interpreter exit write the Chrome trace to
+    path and print the summary table to stderr.
+    """
+    set_tracing_enabled(True, memory)
+
+    def export():
+        tracer = get_tracer()
+        try:
+            tracer.write_chrome_trace(path)
+        except OSError as e:
+            print(f"Could not write trace to {path}: {e}", file=sys.stderr)
+            return
+        tracer.print_summary()
+        print(f"Trace written to {path}", file=sys.stderr)
+
+    atexit.register(export)
+
+
+def span(name: str, cat: str = "stage", **args):
+    """Time a block with the process-wide tracer: `with span("parse.exif", cat="parse"):`."""
+    tracer = _default_tracer or get_tracer()
+    if not tracer.enabled:
+        return _NULL_SPAN
+    return _Span(tracer, name, cat, args)
+
+
+def traced(name: str = None, cat: str = "stage"):
+    """Decorator form of span(); the name defaults to the function's qualified name."""
+    def decorate(fn):
+        label = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*a, **kw):
+            tracer = _default_tracer or get_tracer()
+            if not tracer.enabled:
+                return fn(*a, **kw)
+            with _Span(tracer, label, cat, {}):
+                return fn(*a, **kw)
+        return wrapper
+    return decorate